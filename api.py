@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+from cache import loan_key
+from schedule import KOLOM
+
+# Naikkan bila format JSON atau angka hasil berubah, supaya ETag lama tidak valid
+# (book jadwal tersimpan juga dicap versi ini, lihat store.BookWriter)
+API_VERSION = "2"
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def schedule_etag(loan) -> str:
+    """ETag kuat dari parameter ternormalisasi; bisa dihitung tanpa menghitung jadwal."""
+    raw = repr((API_VERSION,) + loan_key(loan)).encode()
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def _rows(kolom) -> list:
+    return list(
+        map(
+            list,
+            zip(
+                kolom["Bulan"].tolist(),
+                kolom["Tanggal"],
+                kolom["Angsuran Pokok"].tolist(),
+                kolom["Bunga"].tolist(),
+                kolom["Total Angsuran"].tolist(),
+                kolom["Sisa Pokok"].tolist(),
+            ),
+        )
+    )
+
+
+def _params(loan) -> dict:
+    return {
+        "namecstm": loan["namecstm"],
+        "pokok": loan["pokok"],
+        "bunga_tahunan": loan["bunga_tahunan"],
+        "tenor": loan["tenor"],
+        "metode": loan["metode"],
+        "start_date": loan["start_date"].strftime("%Y-%m-%d"),
+        "first_due_date": loan["first_due_date"].strftime("%Y-%m-%d"),
+        "engine": loan["engine"],
+    }
+
+
+def schedule_json(loan, kolom, penjelasan, summary, events=None) -> str:
+    """Serialisasi langsung dari kolom NumPy (tanpa DataFrame).
+
+    Baris dikirim sebagai list (urutan sesuai `columns`) agar payload ringkas.
+    `events` (opsional) ikut dikirim apa adanya, dipakai /api/simulate.
+    """
+    payload = {
+        "params": _params(loan),
+        "summary": {k: int(v) for k, v in summary.items()},
+        "penjelasan": penjelasan,
+        "columns": KOLOM,
+        "rows": _rows(kolom),
+    }
+    if events is not None:
+        payload["events"] = events
+    return _encoder.encode(payload)
+
+
+def compare_json(loan, hasil) -> str:
+    """Beberapa metode untuk input yang sama (hasil `compute_methods`)."""
+    params = _params(loan)
+    params["metode"] = list(hasil)
+    payload = {
+        "params": params,
+        "columns": KOLOM,
+        "methods": {
+            metode: {
+                "summary": {k: int(v) for k, v in summary.items()},
+                "penjelasan": penjelasan,
+                "rows": _rows(kolom),
+            }
+            for metode, (kolom, penjelasan, summary) in hasil.items()
+        },
+    }
+    return _encoder.encode(payload)
@@ -1,418 +1,836 @@
-from flask import Flask, render_template, request, session, send_file, redirect, url_for
-import pandas as pd
+from flask import (
+    Flask,
+    abort,
+    Response,
+    g,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    session,
+    stream_template,
+    url_for,
+)
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
-from decimal import Decimal, ROUND_HALF_UP
 import io
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
+import json
+import os
+import secrets
+import time
+import warnings
+
+import numpy as np
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from api import compare_json, schedule_etag, schedule_json
+from bulk import iter_schedules, parse_dates, parse_loan, read_loans, run_bulk
+from cache import cached_schedule, schedule_cache, use_book
+from cashflow import project_cashflow
+from grid import FIELDS, MAX_CELLS, sensitivity_grid
+from jobs import job_queue
+from metrics import end_request, exposition, request_seconds, stage, start_request
+from metrics import server_timing, timed_iter
+from pdfcache import pdf_cache, pdf_key
+from profiler import SamplingProfiler, profile_path, save
+from rates import effective_to_flat, flat_rata_to_effective, flat_to_effective
+from restructure import LoanSchedule
+from schedule import ENGINE_EKSAK, KOLOM, METHODS, compute_methods
+from store import Book
+
+# reportlab dan openpyxl sengaja di-import di dalam route ekspor yang memakainya,
+# pandas tidak dipakai route sama sekali (lihat tools/import_budget.py).
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
 app = Flask(__name__)
-app.secret_key = "random-secret"
-
-
-def fmt(x: float) -> str:
-    if abs(x) < 0.5:  # toleransi setengah rupiah
-        x = 0
-    return f"{x:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
+# Secret untuk session dan link export bertanda tangan; wajib di-set di
+# produksi. Tanpa SECRET_KEY dipakai secret acak per proses (link export
+# dan session tidak berlaku lintas worker/restart).
+app.secret_key = os.environ.get("SECRET_KEY")
+if not app.secret_key:
+    warnings.warn("SECRET_KEY tidak di-set; memakai secret acak per proses")
+    app.secret_key = secrets.token_hex(32)
+
+# Token export deterministik (tanpa timestamp): parameter sama → URL sama
+_export_signer = URLSafeSerializer(app.secret_key, salt="export-pdf")
+
+# Profiler sampling per request: aktif hanya bila PROFILE_TOKEN di-set dan
+# request membawa header "X-Profile: <token>"
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+
+# Book jadwal tersimpan (tools/book.py build); dibuka dengan mmap dan
+# dipakai sebelum menghitung ulang
+if os.environ.get("SCHEDULE_BOOK"):
+    use_book(Book(os.environ["SCHEDULE_BOOK"]))
+
+# Renderer tabel PDF: "canvas" (cepat, default) atau "platypus" (layout lama)
+PDF_RENDERER = os.environ.get("PDF_RENDERER", "canvas")
+
+
+@app.before_request
+def _mulai_timing():
+    start_request()
+    g.t0 = time.perf_counter()
+    if PROFILE_TOKEN and request.headers.get("X-Profile") == PROFILE_TOKEN:
+        g.profiler = SamplingProfiler().start()
+
+
+@app.after_request
+def _server_timing(response):
+    durasi = time.perf_counter() - g.t0
+    request_seconds.observe(request.endpoint or "404", durasi)
+    timings = end_request()
+    timings["app"] = [durasi, 1]
+    # Halaman yang di-stream (POST /) dirender setelah header terkirim:
+    # waktu render hanya masuk ke /metrics (tahap "render").
+    response.headers["Server-Timing"] = server_timing(timings)
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        path = profile_path(request.endpoint)
+        response.headers["X-Profile-File"] = os.path.basename(path)
+        if response.direct_passthrough:
+            # send_file: body sudah jadi, dan werkzeug tidak memanggil
+            # callback close untuk response passthrough
+            save(profiler, path)
+        else:
+            # Simpan setelah body selesai dikirim supaya render ikut ter-sample
+            response.call_on_close(lambda: save(profiler, path))
+    return response
 
-def rupiah_round(x: float) -> int:
-    """Pembulatan ke rupiah (0 desimal) dengan ROUND_HALF_UP (gaya Excel)."""
-    return int(Decimal(str(x)).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
 
+def _buffered(chunks, size=16384):
+    """Gabungkan potongan kecil dari Jinja menjadi blok ±`size` byte."""
+    buf, n = [], 0
+    for chunk in chunks:
+        buf.append(chunk)
+        n += len(chunk)
+        if n >= size:
+            yield "".join(buf)
+            buf, n = [], 0
+    if buf:
+        yield "".join(buf)
 
-def build_schedule(
-    pokok: float,
-    bunga_tahunan: float,
-    tenor: int,
-    metode: str,
-    start_date: datetime,
-    first_due_date: datetime,
-):
-    i_bulanan = bunga_tahunan / 12.0
 
-    # --- bunga prorata untuk periode pertama ---
-    if start_date.day == first_due_date.day:
-        # Sama tanggal → pakai 30/360 (anggap 1 bulan penuh)
-        selisih_hari = 30
-        bunga1_actual = pokok * bunga_tahunan * (30 / 360.0)
-    else:
-        # Beda tanggal → pakai selisih aktual
-        selisih_hari = max(0, (first_due_date - start_date).days)
-        bunga1_actual = pokok * bunga_tahunan * (selisih_hari / 360.0)
-
-    data = []
-    data.append([0, start_date.strftime("%d %b %Y"), 0, 0, 0, rupiah_round(pokok)])
-    sisa = pokok
-    penjelasan = ""
-
-    # ----------------------
-    # PERHITUNGAN ANGSURAN
-    # ----------------------
-    if metode == "efektif":
-        pmt = (
-            pokok
-            * (i_bulanan * (1 + i_bulanan) ** tenor)
-            / ((1 + i_bulanan) ** tenor - 1)
-        )
-        bunga1_std = sisa * i_bulanan
-        pokok1 = pmt - bunga1_std
-        tambahan_bunga = bunga1_actual - bunga1_std
-        total1 = pmt + tambahan_bunga
-        jatuh1 = first_due_date.strftime("%d %b %Y")
-        sisa -= pokok1
-        data.append([1, jatuh1, pokok1, bunga1_actual, total1, sisa])
-
-        for bulan in range(2, tenor + 1):
-            jatuh = (first_due_date + relativedelta(months=bulan - 1)).strftime(
-                "%d %b %Y"
+@app.route("/", methods=["GET", "POST"])
+def index():
+    if request.method == "POST":
+        # ambil input
+        try:
+            with stage("parse"):
+                loan = parse_loan(request.form)
+            with stage("compute"):
+                hasil = cached_schedule(
+                    loan["pokok"],
+                    loan["bunga_tahunan"],
+                    loan["tenor"],
+                    loan["metode"],
+                    loan["start_date"],
+                    loan["first_due_date"],
+                    loan["engine"],
+                )
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            abort(400, description=f"{type(e).__name__}: {e}")
+
+        # Session hanya diisi input yang valid (dipakai lagi oleh export)
+        params = _loan_params(loan)
+        session["params"] = params
+        # Link PDF stateless, lihat export_pdf_signed
+        pdf_url = _export_url(loan, params)
+
+        # Tabel diformat baris per baris saat template di-stream, jadi byte
+        # pertama terkirim sebelum baris terakhir selesai diformat
+        return Response(
+            timed_iter(
+                "render",
+                _buffered(
+                    stream_template(
+                        "result.html",
+                        columns=KOLOM,
+                        rows=hasil.iter_formatted_rows(),
+                        title="Hasil Simulasi",
+                        summary=hasil.formatted_summary,
+                        pdf_url=pdf_url,
+                    )
+                ),
             )
-            bunga = sisa * i_bulanan
-            pokok_bayar = pmt - bunga
-            sisa -= pokok_bayar
-            data.append([bulan, jatuh, pokok_bayar, bunga, pmt, sisa])
-
-        penjelasan = (
-            "🔹 Metode Anuitas\n"
-            f"i bulanan = {bunga_tahunan:.2%} / 12 = {i_bulanan:.6f}\n"
-            f"PMT = P × [ i(1+i)^n / ((1+i)^n - 1) ] = {fmt(pmt)}\n\n"
-            f"Periode pertama (selisih {selisih_hari} hari):\n"
-            f" Bunga actual = {fmt(pokok)} × {bunga_tahunan:.2%} × ({selisih_hari}/360) = {fmt(bunga1_actual)}\n"
-            f" Bunga standar = {fmt(pokok)} × {i_bulanan:.6f} = {fmt(bunga1_std)}\n"
-            f" Pokok dibayar = PMT − Bunga standar = {fmt(pmt)} − {fmt(bunga1_std)} = {fmt(pokok1)}\n"
-            f" Tambahan (penyesuaian hari) = {fmt(bunga1_actual)} − {fmt(bunga1_std)} = {fmt(tambahan_bunga)}\n"
-            f" Total angsuran bln-1 = PMT + Tambahan = {fmt(pmt)} + {fmt(tambahan_bunga)} = {fmt(total1)}\n"
         )
 
-    elif metode == "flat":
-        # Pokok dicicil rata; bunga flat per bulan konstan
-        cicilan_pokok = pokok / tenor
-        bunga_bulanan = pokok * (bunga_tahunan / 12.0)
+    return render_template("index.html")
 
-        # Penyesuaian (bagi hasil prorata) untuk periode pertama
-        if start_date.day == first_due_date.day:
-            selisih_hari = 30  # 30/360 jika tanggal sama
-        else:
-            selisih_hari = max(0, (first_due_date - start_date).days)  # actual/360
-        adj = pokok * bunga_tahunan * (selisih_hari / 360.0)  # penyesuaian bunga
-
-        sisa = pokok
-
-        # --- Bulan 1: total lebih besar karena + adj; adj ditaruh ke POKOK ---
-        jatuh1 = first_due_date.strftime("%d %b %Y")
-        pokok1 = cicilan_pokok + adj
-        bunga1 = bunga_bulanan
-        total1 = pokok1 + bunga1
-        sisa -= pokok1
-        data.append([1, jatuh1, pokok1, bunga1, total1, sisa])
-
-        # --- Bulan 2..(n-1): konstan ---
-        for bulan in range(2, tenor):
-            jatuh = (first_due_date + relativedelta(months=bulan - 1)).strftime(
-                "%d %b %Y"
-            )
-            sisa -= cicilan_pokok
-            total = cicilan_pokok + bunga_bulanan
-            data.append([bulan, jatuh, cicilan_pokok, bunga_bulanan, total, sisa])
-
-        # --- Bulan n (terakhir): pokok dikurangi adj, bunga ditambah adj; total kembali konstan ---
-        jatuhN = (first_due_date + relativedelta(months=tenor - 1)).strftime("%d %b %Y")
-        pokokN = max(0.0, cicilan_pokok - adj)
-        bungaN = bunga_bulanan + adj
-        totalN = cicilan_pokok + bunga_bulanan
-        sisa -= pokokN
-        data.append([tenor, jatuhN, pokokN, bungaN, totalN, sisa])
 
-    else:
-        raise ValueError("Metode tidak dikenal")
-
-    # ----------------------
-    # DataFrame awal
-    # ----------------------
-    df = pd.DataFrame(
-        data,
-        columns=[
-            "Bulan",
-            "Tanggal",
-            "Angsuran Pokok",
-            "Bunga",
-            "Total Angsuran",
-            "Sisa Pokok",
-        ],
+def _bulk_loans():
+    """Daftar pinjaman mentah + flag `full` dari upload CSV, body CSV atau JSON."""
+    full = request.args.get("full", "0").lower() in ("1", "true", "yes")
+    upload = request.files.get("file")
+    if upload is not None:
+        return read_loans(upload.read(), "csv"), full
+    if request.mimetype == "text/csv":
+        return read_loans(request.get_data(), "csv"), full
+    payload = request.get_json(silent=True)
+    if payload is None:
+        raise ValueError("Body harus CSV atau JSON")
+    if isinstance(payload, dict):
+        full = bool(payload.get("full", full))
+    return read_loans(payload, "json"), full
+
+
+@app.route("/bulk_schedule", methods=["POST"])
+def bulk_schedule():
+    """Jadwal banyak pinjaman sekaligus (upload CSV atau body JSON)."""
+    try:
+        loans, full = _bulk_loans()
+    except (UnicodeDecodeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    with stage("bulk"):
+        results = run_bulk(loans, full=full)
+    return jsonify(
+        {
+            "count": len(results),
+            "errors": sum(1 for r in results if "error" in r),
+            "results": results,
+        }
     )
 
-    # ==========================================================
-    # ADJUSTMENT 1: Sisa pokok dibulatkan ke bunga terakhir
-    # ==========================================================
-    last_idx = len(df) - 1
-    residu_pokok = df.at[last_idx, "Sisa Pokok"]
-    if abs(residu_pokok) > 0.000001:
-        tambah = residu_pokok
-        df.at[last_idx, "Bunga"] += tambah
-        df.at[last_idx, "Total Angsuran"] += tambah
-        df.at[last_idx, "Sisa Pokok"] = 0.0
-
-    # ==========================================================
-    # ADJUSTMENT 2: Sesuaikan agar konsisten dengan Excel rounding
-    # ==========================================================
-    total_angsuran_rounded = df["Total Angsuran"].apply(rupiah_round).sum()
-    total_bunga_rounded = df["Bunga"].apply(rupiah_round).sum()
-    target_bunga = total_angsuran_rounded - rupiah_round(pokok)
-    selisih = target_bunga - total_bunga_rounded
-
-    if selisih != 0:
-        df.at[last_idx, "Bunga"] += selisih
-        df.at[last_idx, "Total Angsuran"] += selisih
-        # Sisa Pokok tetap 0
-
-    # ----------------------
-    # Summary (pakai angka rounded)
-    # ----------------------
-    summary = {
-        "total_pokok": df["Angsuran Pokok"].apply(rupiah_round).sum(),
-        "total_bunga": df["Bunga"].apply(rupiah_round).sum(),
-        "total_angsuran": df["Total Angsuran"].apply(rupiah_round).sum(),
-    }
 
-    return df, penjelasan, summary
+@app.route("/bulk_export_xlsx", methods=["POST"])
+def bulk_export_xlsx():
+    """Satu workbook untuk banyak customer (input sama dengan /bulk_schedule)."""
+    try:
+        loans, _ = _bulk_loans()
+    except (UnicodeDecodeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
 
+    with stage("import"):
+        from xlsx import XLSX_MAX_SHEETS, write_workbook
 
-@app.route("/", methods=["GET", "POST"])
-def index():
-    if request.method == "POST":
-        # ambil input
-        pokok_str = request.form["pokok"]
-        pokok = float(pokok_str.replace(".", "").replace(",", ""))
-
-        bunga_tahunan = float(request.form["bunga"]) / 100.0
-        tenor = int(request.form["tenor"])
-        metode = request.form["metode"]
-        namecstm = request.form.get("namecstm", "Customer")
-
-        # tanggal
-        start_date_str = request.form.get("start_date")
-        start_date = (
-            datetime.strptime(start_date_str, "%Y-%m-%d")
-            if start_date_str
-            else datetime.today()
-        )
+    try:
+        with stage("xlsx"):
+            output = write_workbook(
+                iter_schedules(loans),
+                io.BytesIO(),
+                gabung=len(loans) > XLSX_MAX_SHEETS,
+            )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    output.seek(0)
+    return send_file(
+        output,
+        download_name="TABEL_ANGSURAN_BULK.xlsx",
+        as_attachment=True,
+        mimetype=XLSX_MIMETYPE,
+    )
 
-        first_due_date_str = request.form.get("first_due_date")
-        first_due_date = (
-            datetime.strptime(first_due_date_str, "%Y-%m-%d")
-            if first_due_date_str
-            else start_date + relativedelta(months=1)
-        )
 
-        session["params"] = {
-            "pokok": pokok,
-            "bunga_tahunan": bunga_tahunan,
-            "tenor": tenor,
-            "metode": metode,
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "first_due_date": first_due_date.strftime("%Y-%m-%d"),
-            "namecstm": namecstm,
+@app.route("/cashflow_projection", methods=["POST"])
+def cashflow_projection():
+    """Proyeksi arus kas masuk per bulan kalender untuk seluruh portofolio.
+
+    Input sama dengan /bulk_schedule; hanya total per bulan yang dikembalikan.
+    """
+    try:
+        loans, _ = _bulk_loans()
+    except (UnicodeDecodeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    with stage("cashflow"):
+        proyeksi = project_cashflow(loans)
+    return jsonify(
+        {
+            "count": proyeksi.loans + proyeksi.error_count,
+            "errors": proyeksi.error_count,
+            "error_details": [
+                {"index": idx, "error": pesan} for idx, pesan in proyeksi.errors
+            ],
+            "totals": proyeksi.totals,
+            "months": proyeksi.rows(),
+        }
+    )
+
+
+@app.route("/api/schedule", methods=["GET", "POST"])
+def api_schedule():
+    """Jadwal sebagai JSON; parameter sama dengan form (query string atau JSON)."""
+    data = request.get_json(silent=True) if request.method == "POST" else None
+    try:
+        loan = parse_loan(data if isinstance(data, dict) else request.values)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"{type(e).__name__}: {e}"}), 400
+
+    # Hasil hanya bergantung pada input: cek If-None-Match sebelum menghitung
+    etag = schedule_etag(loan)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        try:
+            with stage("compute"):
+                kolom, penjelasan, summary = cached_schedule(
+                    loan["pokok"],
+                    loan["bunga_tahunan"],
+                    loan["tenor"],
+                    loan["metode"],
+                    loan["start_date"],
+                    loan["first_due_date"],
+                    loan["engine"],
+                )
+        except (ValueError, ZeroDivisionError) as e:
+            return jsonify({"error": f"{type(e).__name__}: {e}"}), 400
+        with stage("json"):
+            body = schedule_json(loan, kolom, penjelasan, summary)
+        resp = Response(body, mimetype="application/json")
+
+    resp.set_etag(etag)
+    if request.values.get("start_date") or (data or {}).get("start_date"):
+        resp.cache_control.public = True
+        resp.cache_control.max_age = 86400
+    else:
+        # Tanpa start_date hasil bergantung pada tanggal hari ini
+        resp.cache_control.no_cache = True
+    return resp
+
+
+@app.route("/api/compare", methods=["GET", "POST"])
+def api_compare():
+    """Beberapa metode untuk input yang sama, dihitung dalam satu pass.
+
+    Parameter sama dengan /api/schedule; `metode` berisi list (JSON) atau
+    daftar dipisah koma, default semua metode terdaftar.
+    GET /api/compare?pokok=100000000&bunga=10&tenor=24&metode=flat,flat_rata
+    """
+    data = request.get_json(silent=True) if request.method == "POST" else None
+    sumber = data if isinstance(data, dict) else request.values
+    metodes = sumber.get("metode") or list(METHODS)
+    if isinstance(metodes, str):
+        metodes = [m.strip() for m in metodes.split(",") if m.strip()]
+    try:
+        loan = parse_loan(dict(sumber, metode=metodes[0]))
+        with stage("compute"):
+            hasil = compute_methods(
+                loan["pokok"],
+                loan["bunga_tahunan"],
+                loan["tenor"],
+                metodes,
+                loan["start_date"],
+                loan["first_due_date"],
+                loan["engine"],
+            )
+    except (IndexError, KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        return jsonify({"error": f"{type(e).__name__}: {e}"}), 400
+    with stage("json"):
+        body = compare_json(loan, hasil)
+    return Response(body, mimetype="application/json")
+
+
+@app.route("/api/convert_rate", methods=["GET", "POST"])
+def api_convert_rate():
+    """Konversi rate flat ↔ efektif (persen p.a) untuk satu atau banyak tenor.
+
+    `from=flat_rata` membaca rate sebagai bunga per tenor (metode
+    flat_rata) dan mengembalikan rate efektif p.a.
+
+    GET  ?from=flat&rate=10&tenor=36
+    POST {"from": "flat", "pairs": [[10, 36], ...]} atau {"rates": [...], "tenors": [...]}
+    """
+    data = request.get_json(silent=True) if request.method == "POST" else None
+    try:
+        if isinstance(data, dict):
+            asal = data.get("from", "flat")
+            if "pairs" in data:
+                rates, tenors = zip(*data["pairs"]) if data["pairs"] else ((), ())
+            else:
+                rates, tenors = data["rates"], data["tenors"]
+        else:
+            asal = request.args.get("from", "flat")
+            rates, tenors = float(request.args["rate"]), int(request.args["tenor"])
+        rates = np.asarray(rates, dtype=np.float64) / 100.0
+        tenors = np.asarray(tenors, dtype=np.int64)
+        if asal == "flat":
+            hasil, tujuan = flat_to_effective(rates, tenors), "efektif"
+        elif asal == "efektif":
+            hasil, tujuan = effective_to_flat(rates, tenors), "flat"
+        elif asal == "flat_rata":
+            hasil, tujuan = flat_rata_to_effective(rates, tenors), "efektif"
+        else:
+            raise ValueError("from harus 'flat', 'flat_rata' atau 'efektif'")
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"{type(e).__name__}: {e}"}), 400
+
+    hasil = np.round(np.asarray(hasil) * 100.0, 10)
+    return jsonify(
+        {
+            "from": asal,
+            "to": tujuan,
+            "rate": hasil.tolist() if hasil.ndim else float(hasil),
         }
+    )
+
 
-        df, penjelasan, summary = build_schedule(
-            pokok, bunga_tahunan, tenor, metode, start_date, first_due_date
+@app.route("/api/simulate", methods=["POST"])
+def api_simulate():
+    """Jadwal setelah event di tengah tenor (what-if pelunasan / restrukturisasi).
+
+    POST {...parameter seperti /api/schedule..., "events": [
+        {"bulan": 12, "extra": 10000000},
+        {"bulan": 24, "bunga": 9.5, "tenor": 48}
+    ]}  — event diterapkan berurutan; `bunga` dalam persen p.a.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body harus berupa objek JSON"}), 400
+    try:
+        loan = parse_loan(data)
+        if loan["engine"] in ENGINE_EKSAK:
+            raise ValueError("Simulasi event hanya untuk engine float")
+        jadwal = LoanSchedule(
+            loan["pokok"],
+            loan["bunga_tahunan"],
+            loan["tenor"],
+            loan["metode"],
+            loan["start_date"],
+            loan["first_due_date"],
         )
+        events = data.get("events") or []
+        if not isinstance(events, list):
+            raise TypeError("events harus berupa list")
+        for event in events:
+            if not isinstance(event, dict):
+                raise TypeError("Setiap event harus berupa objek")
+            bunga = event.get("bunga")
+            jadwal = jadwal.apply(
+                event["bulan"],
+                extra=event.get("extra") or 0.0,
+                bunga_tahunan=None if bunga is None else float(bunga) / 100.0,
+                tenor=event.get("tenor"),
+            )
+        kolom, penjelasan, summary = jadwal.result()
+    except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        return jsonify({"error": f"{type(e).__name__}: {e}"}), 400
 
-        # format angka untuk HTML
-        df_show = df.copy()
-        for col in ["Angsuran Pokok", "Bunga", "Total Angsuran", "Sisa Pokok"]:
-            df_show[col] = df_show[col].map(fmt)
+    return Response(
+        schedule_json(loan, kolom, penjelasan, summary, events),
+        mimetype="application/json",
+    )
 
-        summary_fmt = {k: fmt(v) for k, v in summary.items()}
 
-        return render_template(
-            "result.html",
-            tables=[
-                df_show.to_html(
-                    classes="table table-striped table-bordered",
-                    index=False,
-                    escape=False,
-                )
-            ],
-            title="Hasil Simulasi",
-            penjelasan=penjelasan,
-            summary=summary_fmt,
+def _rentang(data, nama, tipe, batas):
+    """Nilai grid dari list `nama`s atau rentang `nama`_min/_max/_step (inklusif).
+
+    Jumlah nilai dicek terhadap `batas` sebelum list dibuat.
+    """
+    if data.get(nama + "s") is not None:
+        nilai = data[nama + "s"]
+        nilai = nilai.split(",") if isinstance(nilai, str) else nilai
+        if len(nilai) > batas:
+            raise ValueError(f"Grid maksimal {MAX_CELLS} sel")
+        return [tipe(v) for v in nilai]
+    mulai, akhir = tipe(data[nama + "_min"]), tipe(data[nama + "_max"])
+    langkah = tipe(data.get(nama + "_step") or 1)
+    if langkah <= 0 or akhir < mulai:
+        raise ValueError(f"Rentang {nama} tidak valid")
+    jumlah = (akhir - mulai) / langkah
+    if not jumlah < batas:  # NaN/inf ikut ditolak
+        raise ValueError(f"Grid maksimal {MAX_CELLS} sel")
+    jumlah = int(round(jumlah + 1e-9)) + 1
+    if jumlah > batas:
+        raise ValueError(f"Grid maksimal {MAX_CELLS} sel")
+    return [tipe(round(mulai + k * langkah, 10)) for k in range(jumlah)]
+
+
+@app.route("/api/grid", methods=["GET", "POST"])
+def api_grid():
+    """Tabel sensitivitas rate × tenor (persen p.a, bulan) untuk satu pokok.
+
+    GET  ?pokok=100000000&rate_min=9&rate_max=14&rate_step=0.5&tenor_min=12&tenor_max=60&tenor_step=12
+    POST {"pokok": ..., "rates": [9, 10.5], "tenors": [12, 24], "metode": ["flat"]}
+    """
+    data = request.get_json(silent=True) if request.method == "POST" else None
+    data = data if isinstance(data, dict) else request.values
+    try:
+        pokok = data["pokok"]
+        if isinstance(pokok, str):
+            pokok = pokok.replace(".", "").replace(",", "")
+        pokok = float(pokok)
+        rates = _rentang(data, "rate", float, MAX_CELLS)
+        tenors = _rentang(data, "tenor", int, MAX_CELLS // max(len(rates), 1))
+        metode = data.get("metode") or ("efektif", "flat")
+        if isinstance(metode, str):
+            metode = metode.split(",")
+        start_date, first_due_date = parse_dates(data)
+        hasil = sensitivity_grid(
+            pokok,
+            np.asarray(rates) / 100.0,
+            tenors,
+            start_date,
+            first_due_date,
+            tuple(metode),
         )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"{type(e).__name__}: {e}"}), 400
 
-    return render_template("index.html")
+    return jsonify(
+        {
+            "pokok": pokok,
+            "rates": rates,
+            "tenors": tenors,
+            "fields": FIELDS,
+            "grid": {
+                m: {f: v.tolist() for f, v in kolom.items()}
+                for m, kolom in hasil.items()
+            },
+        }
+    )
 
 
-def format_number(val, is_bulan=False):
-    if is_bulan:
-        return str(int(val))
-    if isinstance(val, (int, float)):
-        if abs(val) < 0.5:
-            val = 0
-        return f"{val:,.0f}"  # tanpa desimal
-    return str(val)
+@app.route("/cache_stats")
+def cache_stats():
+    return jsonify(schedule_cache.stats())
+
+
+@app.route("/metrics")
+def metrics():
+    """Histogram durasi per tahap & per endpoint (format teks Prometheus)."""
+    stats = schedule_cache.stats()
+    extra = ["# TYPE loan_app_schedule_cache_size gauge"]
+    extra.append(f"loan_app_schedule_cache_size {stats['size']}")
+    for nama in ("hits", "misses", "evictions"):
+        extra.append(f"# TYPE loan_app_schedule_cache_{nama}_total counter")
+        extra.append(f"loan_app_schedule_cache_{nama}_total {stats[nama]}")
+
+    stats = pdf_cache.stats()
+    extra.append("# TYPE loan_app_pdf_cache_bytes gauge")
+    extra.append(f"loan_app_pdf_cache_bytes {stats['size_bytes']}")
+    for nama in ("hits", "misses", "evictions"):
+        extra.append(f"# TYPE loan_app_pdf_cache_{nama}_total counter")
+        extra.append(f"loan_app_pdf_cache_{nama}_total {stats[nama]}")
+    return Response(exposition(extra), mimetype="text/plain; version=0.0.4")
+
+
+def _loan_params(loan) -> dict:
+    """Parameter pinjaman yang JSON-able (untuk session dan URL export)."""
+    return {
+        "pokok": loan["pokok"],
+        "bunga_tahunan": loan["bunga_tahunan"],
+        "tenor": loan["tenor"],
+        "metode": loan["metode"],
+        "start_date": loan["start_date"].strftime("%Y-%m-%d"),
+        "first_due_date": loan["first_due_date"].strftime("%Y-%m-%d"),
+        "namecstm": loan["namecstm"],
+        "engine": loan["engine"],
+    }
 
 
-@app.route("/export_pdf")
-def export_pdf():
+def _session_loan():
+    """Parameter simulasi terakhir dari session (diisi oleh POST index)."""
     params = session.get("params")
     if not params:
-        return redirect(url_for("index"))
+        return None
+    return _loan_from_params(params)
 
-    pokok = float(params["pokok"])
-    bunga_tahunan = float(params["bunga_tahunan"])
-    tenor = int(params["tenor"])
-    metode = params["metode"]
-    start_date = datetime.strptime(params["start_date"], "%Y-%m-%d")
-    first_due_date = datetime.strptime(params["first_due_date"], "%Y-%m-%d")
-    namecstm = params.get("namecstm", "Customer")
-
-    # Ambil data schedule
-    df, _, _ = build_schedule(
-        pokok, bunga_tahunan, tenor, metode, start_date, first_due_date
-    )
 
-    # Rename kolom
-    df = df.rename(
-        columns={
-            "No": "Bulan",
-            "Tanggal": "Tanggal",
-            "Jumlah Pokok": "Angsuran Pokok",
-            "Jumlah Tingkat Pengembalian": "Bunga",
-            "Jumlah Pembayaran": "Total Angsuran",
-            "Saldo Pembiayaan": "Sisa Pokok",
-        }
-    )
+def _loan_from_params(params) -> dict:
+    """Kebalikan `_loan_params`, divalidasi ulang lewat `parse_loan`."""
+    if not isinstance(params, dict):
+        raise TypeError("Parameter pinjaman harus objek")
+    return parse_loan(params)
 
-    # Format isi tabel
-    data = [df.columns.tolist()]
-    for _, row in df.iterrows():
-        formatted_row = []
-        for col, v in zip(df.columns, row.values):
-            if col == "Bulan":
-                formatted_row.append(format_number(v, is_bulan=True))
-            else:
-                formatted_row.append(format_number(v))
-        data.append(formatted_row)
-
-    # Tambah baris total
-    total_row = ["T o t a l", ""]
-    for col in df.columns[2:]:
-        if col == "Sisa Pokok":
-            total_row.append("")
-        elif pd.api.types.is_numeric_dtype(df[col]):
-            total_row.append(format_number(df[col].sum()))
-        else:
-            total_row.append("")
-    data.append(total_row)
 
-    # === PDF ===
-    output = io.BytesIO()
+def _export_versi(loan) -> str:
+    """Versi isi PDF untuk path export: awalan `pdf_key` (TEMPLATE_VERSION,
+    renderer, engine dan parameter), jadi output baru mendapat URL baru."""
+    return pdf_key(loan, PDF_RENDERER)[:16]
 
-    col_widths = [40, 100, 100, 100, 100, 100]
-    table_total_width = sum(col_widths)
 
-    # Atur margin kiri supaya tabel dan header rata kiri
-    doc = SimpleDocTemplate(
-        output,
-        pagesize=A4,
-        leftMargin=20,
-        rightMargin=30,
-        topMargin=20,
-        bottomMargin=18,
+def _export_url(loan, params):
+    return url_for(
+        "export_pdf_signed",
+        versi=_export_versi(loan),
+        token=_export_signer.dumps(params),
     )
 
-    elements = []
-    styles = getSampleStyleSheet()
-    header_style_big = ParagraphStyle(
-        "header_big",
-        parent=styles["Normal"],
-        fontSize=12,  # ukuran font
-        leading=14,  # jarak antar baris
-        spaceAfter=6,  # jarak bawah tiap paragraf
-        fontName="Helvetica-Bold",
-    )
 
-    header_bold = ParagraphStyle(
-        "header_bold",
-        parent=styles["Normal"],
-        fontSize=12,
-        leading=14,
-        spaceAfter=6,
-        fontName="Helvetica-Bold",
+def _safe_name(namecstm):
+    return "".join(c if c.isalnum() else "_" for c in namecstm)
+
+
+def _render_pdf(loan, key) -> bytes:
+    """Render PDF satu pinjaman lalu simpan ke cache disk."""
+    with stage("compute"):
+        kolom = cached_schedule(
+            loan["pokok"],
+            loan["bunga_tahunan"],
+            loan["tenor"],
+            loan["metode"],
+            loan["start_date"],
+            loan["first_due_date"],
+            loan["engine"],
+        ).columns
+
+    with stage("import"):
+        from pdf import build_pdf
+
+    data = build_pdf(
+        kolom,
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        loan["namecstm"],
+        renderer=PDF_RENDERER,
+    ).getvalue()
+    pdf_cache.put(key, data)
+    return data
+
+
+def _pdf_response(loan):
+    """PDF dari cache disk (content-addressed), dirender bila belum ada."""
+    key = pdf_key(loan, PDF_RENDERER)
+    path = pdf_cache.get(key)
+    try:
+        body = open(path, "rb") if path else None
+    except FileNotFoundError:  # baru saja di-evict worker lain
+        body = None
+
+    if body is None:
+        body = io.BytesIO(_render_pdf(loan, key))
+
+    return send_file(
+        body,
+        download_name=f"TABEL_ANGSURAN_{_safe_name(loan['namecstm'])}.pdf",
+        as_attachment=True,
+        mimetype="application/pdf",
+        etag=key[:32],
     )
 
-    # HEADER pakai Table biar sejajar dengan tabel utama
-    header_data = [
-        [Paragraph("<b>Perhitungan Tabel Angsuran</b>", header_bold)],
-        [Paragraph(f"{namecstm}", header_style_big)],
-        [
-            Paragraph(
-                "Pembayaran Pokok Pembiayaan dan Tingkat Pengembalian", header_style_big
-            )
-        ],
-        [Paragraph(f"Jumlah Pembiayaan : Rp. {pokok:,.2f}", header_style_big)],
-        [
-            Paragraph(
-                f"Tingkat Pengembalian : {bunga_tahunan*100:.2f} % {'effective p.a' if metode=='efektif' else 'flat p.a'}",
-                header_style_big,
+
+@app.route("/export_pdf")
+def export_pdf():
+    loan = _session_loan()
+    if loan is None:
+        return redirect(url_for("index"))
+    return _pdf_response(loan)
+
+
+@app.route("/export/<token>.pdf", defaults={"versi": None})
+@app.route("/export/<versi>/<token>.pdf")
+def export_pdf_signed(versi, token):
+    """Export tanpa session: parameter ada di URL, ditandatangani secret_key.
+
+    URL untuk parameter dan versi output yang sama selalu sama dan isinya
+    tidak berubah, jadi boleh di-cache CDN/browser dalam waktu lama. Link
+    dengan versi lama (atau tanpa versi) dialihkan ke URL versi sekarang.
+    """
+    try:
+        params = _export_signer.loads(token)
+    except BadSignature:
+        return Response("Link export tidak valid", status=404, mimetype="text/plain")
+    try:
+        loan = _loan_from_params(params)
+        sekarang = _export_versi(loan)
+        if versi != sekarang:
+            return redirect(
+                url_for("export_pdf_signed", versi=sekarang, token=token)
             )
-        ],
-        [Paragraph(f"Periode Pembiayaan : {tenor} bulan", header_style_big)],
-    ]
-
-    header_table = Table(header_data, colWidths=[table_total_width])
-    header_table.setStyle(
-        TableStyle(
-            [
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 0),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-                ("TOPPADDING", (0, 0), (-1, -1), 0),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ]
+        resp = _pdf_response(loan)
+    except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        return Response(
+            f"Parameter tidak valid: {e}", status=400, mimetype="text/plain"
         )
-    )
-    elements.append(header_table)
-    elements.append(Spacer(1, 12))
-
-    # TABEL utama
-    table = Table(data, repeatRows=1, colWidths=col_widths)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),  # header
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                ("ALIGN", (0, 0), (-1, 0), "CENTER"),  # header rata tengah
-                ("VALIGN", (0, 0), (-1, 0), "MIDDLE"),
-                ("ALIGN", (0, 0), (0, -1), "CENTER"),  # kolom bulan center
-                ("ALIGN", (1, 0), (1, -1), "CENTER"),  # kolom tanggal kiri
-                ("ALIGN", (2, 0), (-1, -1), "RIGHT"),  # angka kanan
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                # Style khusus baris total
-                ("BACKGROUND", (0, -1), (-1, -1), colors.whitesmoke),
-                ("SPAN", (0, -1), (1, -1)),
-                ("ALIGN", (0, -1), (1, -1), "CENTER"),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ]
+
+    resp.cache_control.no_cache = None
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 30 * 86400
+    resp.cache_control.immutable = True
+    return resp
+
+
+@app.route("/export_xlsx")
+def export_xlsx():
+    loan = _session_loan()
+    if loan is None:
+        return redirect(url_for("index"))
+
+    with stage("compute"):
+        hasil = cached_schedule(
+            loan["pokok"],
+            loan["bunga_tahunan"],
+            loan["tenor"],
+            loan["metode"],
+            loan["start_date"],
+            loan["first_due_date"],
+            loan["engine"],
         )
-    )
 
-    elements.append(table)
-    doc.build(elements)
-    output.seek(0)
+    with stage("import"):
+        from xlsx import write_workbook
 
-    safe_name = "".join(c if c.isalnum() else "_" for c in namecstm)
+    with stage("xlsx"):
+        output = write_workbook(
+            [(loan, hasil.columns, hasil.summary, None)], io.BytesIO()
+        )
+    output.seek(0)
     return send_file(
         output,
-        download_name=f"TABEL_ANGSURAN_{safe_name}.pdf",
+        download_name=f"TABEL_ANGSURAN_{_safe_name(loan['namecstm'])}.xlsx",
         as_attachment=True,
-        mimetype="application/pdf",
+        mimetype=XLSX_MIMETYPE,
+    )
+
+
+# ==========================================================
+# JOB LATAR: ekspor berat dijalankan di luar request (lihat jobs.py).
+# Client menerima id job, lalu polling status dan mengunduh hasilnya.
+# ==========================================================
+_BULK_CHUNK = 1000
+
+
+def _job_pdf(params, path, progress):
+    loan = _loan_from_params(params)
+    key = pdf_key(loan, PDF_RENDERER)
+    path_cache = pdf_cache.get(key)  # None bila cache mati atau miss
+    data = None
+    if path_cache is not None:
+        try:
+            with open(path_cache, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:  # baru saja di-evict worker lain
+            pass
+    if data is None:
+        data = _render_pdf(loan, key)
+    with open(path, "wb") as f:
+        f.write(data)
+    progress(1, 1)
+
+
+def _job_bulk_schedule(params, path, progress):
+    loans, full = params["loans"], params["full"]
+    results = []
+    for mulai in range(0, len(loans), _BULK_CHUNK):
+        for r in run_bulk(loans[mulai : mulai + _BULK_CHUNK], full=full):
+            r["index"] += mulai
+            results.append(r)
+        progress(len(results), len(loans))
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "count": len(results),
+                "errors": sum(1 for r in results if "error" in r),
+                "results": results,
+            },
+            f,
+            default=str,
+        )
+
+
+def _job_bulk_xlsx(params, path, progress):
+    from xlsx import XLSX_MAX_SHEETS, write_workbook
+
+    loans = params["loans"]
+
+    def items():
+        for n, item in enumerate(iter_schedules(loans), 1):
+            yield item
+            progress(n, len(loans))
+
+    with open(path, "wb") as f:
+        write_workbook(items(), f, gabung=len(loans) > XLSX_MAX_SHEETS)
+
+
+job_queue.register("export_pdf", _job_pdf)
+job_queue.register("bulk_schedule", _job_bulk_schedule)
+job_queue.register("bulk_export_xlsx", _job_bulk_xlsx)
+# Sekali per proses saat app dimuat: lanjutkan job tertunda dari run
+# sebelumnya dan sapu job kedaluwarsa
+job_queue.start()
+
+
+def _job_accepted(job_id):
+    resp = jsonify(
+        {
+            "id": job_id,
+            "status": "queued",
+            "status_url": url_for("job_status", job_id=job_id),
+            "download_url": url_for("job_download", job_id=job_id),
+        }
+    )
+    resp.status_code = 202
+    resp.headers["Location"] = url_for("job_status", job_id=job_id)
+    return resp
+
+
+@app.route("/jobs/export_pdf", methods=["POST"])
+def job_export_pdf():
+    """Versi job dari /export_pdf: parameter dari body JSON atau session."""
+    data = request.get_json(silent=True)
+    try:
+        loan = parse_loan(data) if data else _session_loan()
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Parameter tidak valid: {e}"}), 400
+    if loan is None:
+        return jsonify({"error": "Belum ada simulasi"}), 400
+
+    job_id = job_queue.submit(
+        "export_pdf",
+        _loan_params(loan),
+        f"TABEL_ANGSURAN_{_safe_name(loan['namecstm'])}.pdf",
+        "application/pdf",
+    )
+    return _job_accepted(job_id)
+
+
+@app.route("/jobs/bulk_schedule", methods=["POST"])
+def job_bulk_schedule():
+    try:
+        loans, full = _bulk_loans()
+    except (UnicodeDecodeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    job_id = job_queue.submit(
+        "bulk_schedule",
+        {"loans": loans, "full": full},
+        "JADWAL_BULK.json",
+        "application/json",
+    )
+    return _job_accepted(job_id)
+
+
+@app.route("/jobs/bulk_export_xlsx", methods=["POST"])
+def job_bulk_export_xlsx():
+    try:
+        loans, _ = _bulk_loans()
+    except (UnicodeDecodeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    job_id = job_queue.submit(
+        "bulk_export_xlsx",
+        {"loans": loans},
+        "TABEL_ANGSURAN_BULK.xlsx",
+        XLSX_MIMETYPE,
+    )
+    return _job_accepted(job_id)
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job tidak ditemukan"}), 404
+    if job["status"] == "done":
+        job["download_url"] = url_for("job_download", job_id=job_id)
+    return jsonify(job)
+
+
+@app.route("/jobs/<job_id>/download")
+def job_download(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job tidak ditemukan"}), 404
+    if job["status"] != "done":
+        return jsonify({"error": "Job belum selesai", "status": job["status"]}), 409
+    return send_file(
+        job_queue.result_path(job_id),
+        download_name=job["filename"],
+        as_attachment=True,
+        mimetype=job["mimetype"],
     )
 
 
@@ -0,0 +1,213 @@
+import csv
+import io
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
+
+from schedule import MAX_TENOR, compute_schedule
+
+# Di bawah jumlah ini pool proses lebih mahal daripada hitung langsung
+BULK_MIN_PARALLEL = 32
+BULK_MAX_LOANS = 100_000
+
+_pool = None
+
+
+def _parse_tanggal(value, default):
+    if isinstance(value, datetime):
+        return value
+    if value:
+        return datetime.strptime(str(value).strip(), "%Y-%m-%d")
+    return default
+
+
+def parse_dates(data) -> tuple:
+    """(start_date, first_due_date) dari input; default hari ini dan +1 bulan."""
+    # Default hari ini tanpa jam, supaya sama dengan yang disimpan di session
+    hari_ini = datetime.combine(date.today(), datetime.min.time())
+    start_date = _parse_tanggal(data.get("start_date"), hari_ini)
+    first_due_date = _parse_tanggal(
+        data.get("first_due_date"), start_date + relativedelta(months=1)
+    )
+    return start_date, first_due_date
+
+
+def parse_loan(data) -> dict:
+    """Normalisasi satu input pinjaman (form, baris CSV atau objek JSON).
+
+    `bunga` dalam persen per tahun seperti di form (atau `bunga_tahunan`
+    sebagai pecahan, bentuk yang disimpan di session/link export);
+    `pokok` boleh angka atau string bergaya Indonesia ("100.000.000"). `engine` opsional
+    (lihat `schedule.ENGINES`), default dari SCHEDULE_ENGINE. ValueError
+    bila pokok ≤ 0, tenor di luar 1..MAX_TENOR (600 bulan, batas yang sama
+    dengan grid) atau angka tidak valid.
+    """
+    pokok = data["pokok"]
+    if isinstance(pokok, str):
+        pokok = pokok.replace(".", "").replace(",", "")
+    pokok = float(pokok)
+    if not 0 < pokok < math.inf:
+        raise ValueError("Pokok harus lebih dari 0")
+
+    if "bunga_tahunan" in data:
+        bunga_tahunan = float(data["bunga_tahunan"])
+    else:
+        bunga_tahunan = float(data["bunga"]) / 100.0
+    if not math.isfinite(bunga_tahunan):
+        raise ValueError("Bunga tidak valid")
+    tenor = int(data["tenor"])
+    if tenor < 1:
+        raise ValueError("Tenor minimal 1 bulan")
+    if tenor > MAX_TENOR:
+        raise ValueError(f"Tenor maksimal {MAX_TENOR} bulan")
+    metode = str(data["metode"]).strip()
+    namecstm = data.get("namecstm") or "Customer"
+
+    start_date, first_due_date = parse_dates(data)
+
+    return {
+        "engine": data.get("engine") or None,
+        "pokok": pokok,
+        "bunga_tahunan": bunga_tahunan,
+        "tenor": tenor,
+        "metode": metode,
+        "start_date": start_date,
+        "first_due_date": first_due_date,
+        "namecstm": namecstm,
+    }
+
+
+def read_loans(payload, content_type: str = "json") -> list:
+    """Baca daftar pinjaman mentah dari CSV (teks/bytes) atau JSON (list/dict)."""
+    if content_type == "csv":
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8-sig")
+        loans = list(csv.DictReader(io.StringIO(payload)))
+    else:
+        loans = payload.get("loans") if isinstance(payload, dict) else payload
+    if not isinstance(loans, list):
+        raise ValueError("Daftar pinjaman harus berupa list")
+    if len(loans) > BULK_MAX_LOANS:
+        raise ValueError(f"Maksimal {BULK_MAX_LOANS} pinjaman per permintaan")
+    return loans
+
+
+def _schedule_records(kolom) -> list:
+    baris = zip(
+        kolom["Bulan"].tolist(),
+        kolom["Tanggal"],
+        kolom["Angsuran Pokok"].tolist(),
+        kolom["Bunga"].tolist(),
+        kolom["Total Angsuran"].tolist(),
+        kolom["Sisa Pokok"].tolist(),
+    )
+    return [
+        {
+            "bulan": b,
+            "tanggal": t,
+            "angsuran_pokok": p,
+            "bunga": i,
+            "total_angsuran": a,
+            "sisa_pokok": s,
+        }
+        for b, t, p, i, a, s in baris
+    ]
+
+
+def _hitung_satu(args):
+    idx, raw, full = args
+    hasil = {"index": idx}
+    try:
+        loan = parse_loan(raw)
+        hasil["namecstm"] = loan["namecstm"]
+        jadwal = compute_schedule(
+            loan["pokok"],
+            loan["bunga_tahunan"],
+            loan["tenor"],
+            loan["metode"],
+            loan["start_date"],
+            loan["first_due_date"],
+            engine=loan["engine"],
+        )
+    except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        hasil["error"] = f"{type(e).__name__}: {e}"
+        return hasil
+
+    # Mode ringkas tidak membuat kolom Tanggal maupun teks penjelasan
+    hasil["summary"] = {k: int(v) for k, v in jadwal.summary.items()}
+    hasil["angsuran_pertama"] = jadwal.values["Total Angsuran"][1].item()
+    if full:
+        hasil["schedule"] = _schedule_records(jadwal.columns)
+    return hasil
+
+
+def iter_schedules(loans):
+    """Generator (loan, kolom, summary, error) per pinjaman, dihitung satu per satu.
+
+    Dipakai untuk ekspor yang ditulis bertahap sehingga hanya satu jadwal
+    yang ada di memori pada satu waktu.
+    """
+    for raw in loans:
+        try:
+            loan = parse_loan(raw)
+            jadwal = compute_schedule(
+                loan["pokok"],
+                loan["bunga_tahunan"],
+                loan["tenor"],
+                loan["metode"],
+                loan["start_date"],
+                loan["first_due_date"],
+                engine=loan["engine"],
+            )
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            loan = raw if isinstance(raw, dict) else {}
+            yield loan, None, None, f"{type(e).__name__}: {e}"
+            continue
+        yield loan, jadwal.columns, jadwal.summary, None
+
+
+def worker_count() -> int:
+    return int(os.environ.get("BULK_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=worker_count())
+    return _pool
+
+
+def map_chunks(fn, chunks):
+    """`fn(chunk)` untuk setiap potongan, hasil berurutan sesuai input.
+
+    Potongan dikirim ke pool proses dengan jumlah tugas berjalan dibatasi
+    (2 × worker), jadi iterable panjang tidak dibaca sekaligus ke memori.
+    Dengan satu worker semuanya dihitung langsung tanpa pool.
+    """
+    if worker_count() == 1:
+        yield from map(fn, chunks)
+        return
+    pool = get_pool()
+    berjalan = deque()
+    for chunk in chunks:
+        berjalan.append(pool.submit(fn, chunk))
+        if len(berjalan) >= worker_count() * 2:
+            yield berjalan.popleft().result()
+    while berjalan:
+        yield berjalan.popleft().result()
+
+
+def run_bulk(loans: list, full: bool = False) -> list:
+    """Hitung jadwal untuk banyak pinjaman; hasil berurutan sesuai input.
+
+    Kegagalan per pinjaman dilaporkan di field `error`, tidak menggagalkan batch.
+    """
+    tugas = [(i, raw, full) for i, raw in enumerate(loans)]
+    if len(tugas) < BULK_MIN_PARALLEL:
+        return [_hitung_satu(t) for t in tugas]
+
+    chunksize = max(1, len(tugas) // (worker_count() * 4))
+    return list(get_pool().map(_hitung_satu, tugas, chunksize=chunksize))
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
+
+from schedule import (
+    DEFAULT_ENGINE,
+    ScheduleResult,
+    compute_schedule,
+    selisih_hari_prorata,
+)
+
+# Book jadwal tersimpan (store.Book) yang dibaca sebelum menghitung ulang;
+# dipasang lewat `use_book`
+_book = None
+
+
+class ScheduleCache:
+    """Cache LRU + TTL untuk hasil `compute_schedule`.
+
+    Nilai yang disimpan (`ScheduleResult`) dipakai bersama oleh semua
+    route, jadi pemanggil tidak boleh memodifikasi array kolom hasil secara
+    in-place. Tabel/teks yang sudah dibuat malas ikut tersimpan, jadi
+    request berikutnya untuk pinjaman yang sama tidak membuatnya lagi.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+schedule_cache = ScheduleCache(
+    maxsize=int(os.environ.get("SCHEDULE_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("SCHEDULE_CACHE_TTL", 600)),
+)
+
+
+def schedule_key(
+    pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, engine=None
+):
+    """Tuple parameter ternormalisasi sebagai kunci cache."""
+    return (
+        engine or DEFAULT_ENGINE,
+        float(pokok),
+        float(bunga_tahunan),
+        int(tenor),
+        str(metode),
+        start_date.isoformat(),
+        first_due_date.isoformat(),
+    )
+
+
+def loan_key(loan) -> tuple:
+    """`schedule_key` untuk dict hasil `parse_loan`, ditambah nama customer."""
+    return schedule_key(
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        loan["start_date"],
+        loan["first_due_date"],
+        loan["engine"],
+    ) + (loan["namecstm"],)
+
+
+def use_book(book):
+    """Pakai `book` (store.Book, atau None) sebagai sumber jadwal tersimpan.
+
+    Book dengan versi output lain (`book.stale`) tidak dipakai: angkanya
+    dihitung sebelum perubahan kernel terakhir dan harus di-build ulang.
+    """
+    global _book
+    if book is not None and book.stale:
+        warnings.warn(
+            f"Book {book.path} versi output {book.output_version!r}, bukan "
+            "versi sekarang; diabaikan (build ulang dengan tools/book.py)"
+        )
+        book = None
+    _book = book
+    schedule_cache.clear()
+
+
+def _from_book(key, pokok, bunga_tahunan, tenor, metode, start_date, first_due_date):
+    from store import store_key
+
+    jadwal = _book.get(store_key(key))
+    if jadwal is None:
+        return None
+    return ScheduleResult(
+        (pokok, bunga_tahunan, tenor, metode, start_date, first_due_date),
+        selisih_hari_prorata(start_date, first_due_date),
+        jadwal.bulan[1:],
+        (
+            jadwal.angsuran_pokok,
+            jadwal.bunga,
+            jadwal.total_angsuran,
+            jadwal.sisa_pokok,
+        ),
+        jadwal.summary,
+    )
+
+
+def cached_schedule(
+    pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, engine=None
+):
+    """Sama seperti `compute_schedule`, tapi membaca/menyimpan ke `schedule_cache`.
+
+    Bila book dipasang (`use_book`), jadwal yang ada di book dipakai
+    langsung tanpa dihitung ulang.
+    """
+    key = schedule_key(
+        pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, engine
+    )
+    result = schedule_cache.get(key)
+    if result is None:
+        if _book is not None:
+            result = _from_book(
+                key, pokok, bunga_tahunan, tenor, metode, start_date, first_due_date
+            )
+        if result is None:
+            result = compute_schedule(
+                pokok,
+                bunga_tahunan,
+                tenor,
+                metode,
+                start_date,
+                first_due_date,
+                engine=engine,
+            )
+        schedule_cache.put(key, result)
+    return result
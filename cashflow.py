@@ -0,0 +1,159 @@
+from itertools import islice
+
+import numpy as np
+
+from bulk import BULK_MIN_PARALLEL, map_chunks, parse_loan, worker_count
+from schedule import Schedule, rupiah_round_array
+
+# Pinjaman per tugas worker; hasil tiap tugas hanya total per bulan
+CASHFLOW_CHUNK = 2000
+MAX_ERRORS = 100
+_NILAI = ("pokok", "bunga", "total")
+
+
+class CashflowProjection:
+    """Total angsuran jatuh tempo per bulan kalender untuk banyak pinjaman.
+
+    Jadwal ditambahkan satu per satu lalu dibuang; yang disimpan hanya
+    total berjalan per bulan, jadi memori sebanding dengan rentang bulan,
+    bukan jumlah pinjaman. Nilai per baris dibulatkan dengan
+    `rupiah_round_array` seperti summary jadwal, sehingga jumlah semua
+    bulan sama dengan jumlah summary masing-masing pinjaman.
+    """
+
+    def __init__(self):
+        self.awal = None  # datetime64[M] bulan pertama
+        self.pokok = np.zeros(0, dtype=np.int64)
+        self.bunga = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0, dtype=np.int64)
+        self.angsuran = np.zeros(0, dtype=np.int64)  # jumlah angsuran jatuh tempo
+        self.loans = 0
+        self.error_count = 0
+        self.errors = []  # (index, pesan), maksimal MAX_ERRORS
+
+    def _perluas(self, awal, akhir):
+        """Pastikan bulan [awal, akhir] ada di array total."""
+        if self.awal is None:
+            self.awal = awal
+        depan = max(0, int((self.awal - awal).astype(np.int64)))
+        panjang = int((akhir - min(self.awal, awal)).astype(np.int64)) + 1
+        belakang = panjang - depan - len(self.total)
+        if depan or belakang > 0:
+            tambah = (depan, max(belakang, 0))
+            for nama in _NILAI + ("angsuran",):
+                setattr(self, nama, np.pad(getattr(self, nama), tambah))
+            self.awal = min(self.awal, awal)
+
+    def add(self, jadwal: Schedule):
+        self.add_rows(
+            jadwal.tanggal[1:],
+            jadwal.angsuran_pokok[1:],
+            jadwal.bunga[1:],
+            jadwal.total_angsuran[1:],
+        )
+        self.loans += 1
+
+    def add_rows(self, tanggal, pokok, bunga, total):
+        """Tambahkan baris angsuran (tanpa baris pencairan) dari satu atau
+        banyak pinjaman sekaligus; `loans` tidak ikut bertambah."""
+        bulan = np.asarray(tanggal).astype("datetime64[M]")
+        if not len(bulan):
+            return
+        self._perluas(bulan.min(), bulan.max())
+        offset = (bulan - self.awal).astype(np.int64)
+        # Dijumlah langsung di int64: bincount berbobot memakai float64 yang
+        # hanya eksak sampai 2^53 rupiah per bulan
+        for nama, nilai in zip(_NILAI, (pokok, bunga, total)):
+            np.add.at(getattr(self, nama), offset, rupiah_round_array(nilai))
+        self.angsuran += np.bincount(offset, minlength=len(self.total))
+
+    def add_error(self, index, pesan):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((index, pesan))
+
+    def merge(self, other):
+        """Gabungkan hasil parsial (mis. dari worker lain) ke proyeksi ini."""
+        if other.awal is not None:
+            akhir = other.awal + (len(other.total) - 1)
+            self._perluas(other.awal, akhir)
+            mulai = int((other.awal - self.awal).astype(np.int64))
+            for nama in _NILAI + ("angsuran",):
+                getattr(self, nama)[mulai : mulai + len(other.total)] += getattr(
+                    other, nama
+                )
+        self.loans += other.loans
+        self.error_count += other.error_count
+        self.errors.extend(other.errors[: MAX_ERRORS - len(self.errors)])
+        return self
+
+    @property
+    def totals(self) -> dict:
+        return {nama: int(getattr(self, nama).sum()) for nama in _NILAI}
+
+    def rows(self) -> list:
+        """Baris per bulan: {"bulan": "YYYY-MM", "pokok", "bunga", "total", "angsuran"}."""
+        if self.awal is None:
+            return []
+        bulan = (self.awal + np.arange(len(self.total))).astype(str).tolist()
+        return [
+            {"bulan": b, "pokok": p, "bunga": i, "total": t, "angsuran": n}
+            for b, p, i, t, n in zip(
+                bulan,
+                self.pokok.tolist(),
+                self.bunga.tolist(),
+                self.total.tolist(),
+                self.angsuran.tolist(),
+            )
+        ]
+
+
+def _proyeksi_potongan(items) -> CashflowProjection:
+    proyeksi = CashflowProjection()
+    for idx, raw in items:
+        try:
+            loan = parse_loan(raw)
+            jadwal = Schedule.compute(
+                loan["pokok"],
+                loan["bunga_tahunan"],
+                loan["tenor"],
+                loan["metode"],
+                loan["start_date"],
+                loan["first_due_date"],
+                engine=loan["engine"],
+            )
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            proyeksi.add_error(idx, f"{type(e).__name__}: {e}")
+            continue
+        proyeksi.add(jadwal)
+    return proyeksi
+
+
+def project_cashflow(loans, chunk: int = CASHFLOW_CHUNK) -> CashflowProjection:
+    """Proyeksi arus kas per bulan dari iterable pinjaman mentah (lihat parse_loan).
+
+    Input dibaca bertahap per `chunk`; potongan dihitung paralel lewat
+    `bulk.map_chunks`, lalu hasil parsial digabung. Input kecil dihitung
+    langsung tanpa pool.
+    """
+    it = enumerate(loans)
+    potongan = iter(lambda: list(islice(it, chunk)), [])
+    pertama = next(potongan, [])
+    if len(pertama) < min(chunk, BULK_MIN_PARALLEL):
+        return _proyeksi_potongan(pertama)
+    if len(pertama) < chunk:
+        # Semua input sudah terbaca: bagi rata ke worker
+        ukuran = max(1, len(pertama) // worker_count())
+        potongan = (pertama[i : i + ukuran] for i in range(0, len(pertama), ukuran))
+    else:
+        potongan = _dengan_awal(pertama, potongan)
+
+    hasil = CashflowProjection()
+    for parsial in map_chunks(_proyeksi_potongan, potongan):
+        hasil.merge(parsial)
+    return hasil
+
+
+def _dengan_awal(pertama, sisa):
+    yield pertama
+    yield from sisa
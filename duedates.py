@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+
+def due_dates(first_due_date, tenor: int) -> np.ndarray:
+    """Tanggal jatuh tempo bulan 1..tenor sebagai datetime64[D], sekali jalan.
+
+    Sama dengan `first_due_date + relativedelta(months=k-1)`: tanggal
+    dipotong ke akhir bulan bila bulan tujuan lebih pendek (31 Jan → 29 Feb),
+    dan selalu dihitung dari tanggal asli (bukan berantai).
+    """
+    if isinstance(first_due_date, datetime):
+        first_due_date = first_due_date.date()
+    bulan = np.datetime64(first_due_date, "M") + np.arange(tenor)
+    awal = bulan.astype("datetime64[D]")
+    panjang = ((bulan + 1).astype("datetime64[D]") - awal).astype(np.int64)
+    hari = np.minimum(first_due_date.day, panjang)
+    return awal + (hari - 1)
+
+
+@lru_cache(maxsize=1)
+def _nama_bulan() -> tuple:
+    # Ikuti locale proses seperti strftime("%b")
+    return tuple(date(2000, m, 1).strftime("%b") for m in range(1, 13))
+
+
+def format_dates(tanggal) -> list:
+    """Array datetime64[D] → string "%d %b %Y" (tanpa datetime per elemen)."""
+    tanggal = np.asarray(tanggal, dtype="datetime64[D]")
+    bulan = tanggal.astype("datetime64[M]")
+    tahun = (bulan.astype("datetime64[Y]").astype(np.int64) + 1970).tolist()
+    idx_bulan = (bulan.astype(np.int64) % 12).tolist()
+    hari = ((tanggal - bulan.astype("datetime64[D]")).astype(np.int64) + 1).tolist()
+    nama = _nama_bulan()
+    return [f"{d:02d} {nama[m]} {y}" for d, m, y in zip(hari, idx_bulan, tahun)]
+
+
+@lru_cache(maxsize=4096)
+def _due_date_strings(first_due: date, tenor: int) -> tuple:
+    return tuple(format_dates(due_dates(first_due, tenor)))
+
+
+def due_date_strings(first_due_date, tenor: int) -> tuple:
+    """Tanggal jatuh tempo terformat "%d %b %Y", di-memo per (tanggal, tenor).
+
+    Dalam bulk run banyak pinjaman berbagi kalender pencairan yang sama,
+    jadi string tanggal cukup dibuat sekali.
+    """
+    if isinstance(first_due_date, datetime):
+        first_due_date = first_due_date.date()
+    return _due_date_strings(first_due_date, tenor)
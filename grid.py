@@ -0,0 +1,190 @@
+import numpy as np
+
+from schedule import (
+    MAX_TENOR,
+    bunga_prorata,
+    rupiah_round,
+    rupiah_round_array,
+    selisih_hari_prorata,
+)
+
+# Batas sel per blok: memori kerja ≈ blok × tenor_maks × 8 byte per kolom
+_BLOK = 1024
+MAX_CELLS = 20_000
+# Batas kerja total: sel × tenor terpanjang (matriks sel × bulan yang dihitung)
+MAX_CELL_MONTHS = MAX_CELLS * 360
+
+
+def _rekonsiliasi_batch(pokok, angsuran_pokok, bunga, total, last):
+    """ADJUSTMENT 1 dan 2 untuk banyak jadwal sekaligus (baris = jadwal).
+
+    Sel di luar tenor berisi 0 sehingga tidak mempengaruhi jumlah rounded.
+    """
+    baris = np.arange(len(last))
+    sisa = np.subtract.accumulate(
+        np.concatenate((np.full((len(last), 1), pokok), angsuran_pokok), axis=1),
+        axis=1,
+    )[:, 1:]
+
+    # ADJUSTMENT 1: residu sisa pokok ke bunga terakhir
+    residu = sisa[baris, last]
+    residu = np.where(np.abs(residu) > 0.000001, residu, 0.0)
+    bunga[baris, last] += residu
+    total[baris, last] += residu
+
+    # ADJUSTMENT 2: samakan dengan pembulatan gaya Excel. Setelah
+    # penyesuaian hanya sel terakhir yang berubah, jadi jumlah rounded cukup
+    # ditambal di sel itu (tidak perlu membulatkan ulang seluruh matriks).
+    rb = rupiah_round_array(bunga)
+    rt = rupiah_round_array(total)
+    total_rounded = rt.sum(axis=1)
+    bunga_rounded = rb.sum(axis=1)
+    selisih = total_rounded - rupiah_round(pokok) - bunga_rounded
+    bunga_last = bunga[baris, last] + selisih
+    total_last = total[baris, last] + selisih
+    # Tulis balik seperti versi skalar: tenor 1 membaca sel ini sebagai
+    # angsuran pertama
+    bunga[baris, last] = bunga_last
+    total[baris, last] = total_last
+
+    return {
+        "total_pokok": rupiah_round_array(angsuran_pokok).sum(axis=1),
+        "total_bunga": bunga_rounded
+        - rb[baris, last]
+        + rupiah_round_array(bunga_last),
+        "total_angsuran": total_rounded
+        - rt[baris, last]
+        + rupiah_round_array(total_last),
+    }
+
+
+def _efektif_batch(pokok, rate, n, selisih_hari):
+    i = rate / 12.0
+    # (1+i)**n per sel dengan pow float Python: power NumPy untuk array
+    # kadang berbeda 1 ulp dari libm dan selisihnya terbawa ke rupiah
+    faktor = np.array([(1 + x) ** t for x, t in zip(i.tolist(), n.tolist())])
+    pmt = pokok * (i * faktor) / (faktor - 1)
+    bunga1_actual = bunga_prorata(pokok, rate, selisih_hari)
+    bunga1_std = pokok * i
+
+    # Rekurensi sisa dijalankan per bulan (vektor antar sel) persis seperti
+    # loop referensi; rumus tertutup (1+i)^k bisa selisih 1 rupiah
+    sisa = np.empty((len(n), n.max()))
+    s = np.full(len(n), pokok)
+    for k in range(n.max()):
+        s = s - (pmt - s * i)
+        sisa[:, k] = s
+    mask = np.arange(n.max()) < n[:, None]
+    bunga_std = np.concatenate((np.full((len(n), 1), pokok), sisa[:, :-1]), axis=1)
+    bunga_std *= i[:, None]
+    angsuran_pokok = np.where(mask, pmt[:, None] - bunga_std, 0.0)
+    bunga = np.where(mask, bunga_std, 0.0)
+    bunga[:, 0] = bunga1_actual
+    total = np.where(mask, pmt[:, None], 0.0)
+    total[:, 0] = pmt + (bunga1_actual - bunga1_std)
+
+    summary = _rekonsiliasi_batch(pokok, angsuran_pokok, bunga, total, n - 1)
+    summary["angsuran_pertama"] = rupiah_round_array(total[:, 0])
+    summary["angsuran_bulanan"] = rupiah_round_array(pmt)
+    return summary
+
+
+def _flat_batch(pokok, rate, n, selisih_hari):
+    cicilan_pokok = pokok / n
+    bunga_bulanan = pokok * (rate / 12.0)
+    adj = bunga_prorata(pokok, rate, selisih_hari)
+    m = np.maximum(n - 2, 0) + 2  # tenor 1 tetap dua baris, sama dengan kernel
+    last = m - 1
+    baris = np.arange(len(n))
+
+    k = np.arange(m.max())
+    mask = k < m[:, None]
+    angsuran_pokok = np.where(mask, cicilan_pokok[:, None], 0.0)
+    angsuran_pokok[:, 0] = cicilan_pokok + adj
+    angsuran_pokok[baris, last] = np.maximum(0.0, cicilan_pokok - adj)
+    bunga = np.where(mask, bunga_bulanan[:, None], 0.0)
+    bunga[baris, last] = bunga_bulanan + adj
+    total = np.where(mask, (cicilan_pokok + bunga_bulanan)[:, None], 0.0)
+    total[:, 0] = angsuran_pokok[:, 0] + bunga_bulanan
+
+    summary = _rekonsiliasi_batch(pokok, angsuran_pokok, bunga, total, last)
+    summary["angsuran_pertama"] = rupiah_round_array(total[:, 0])
+    summary["angsuran_bulanan"] = rupiah_round_array(cicilan_pokok + bunga_bulanan)
+    return summary
+
+
+def _flat_rata_batch(pokok, rate, n, selisih_hari):
+    cicilan_pokok = pokok / n
+    bunga_bulanan = pokok * rate / n
+    k = np.arange(n.max())
+    mask = k < n[:, None]
+    angsuran_pokok = np.where(mask, cicilan_pokok[:, None], 0.0)
+    bunga = np.where(mask, bunga_bulanan[:, None], 0.0)
+    total = np.where(mask, (cicilan_pokok + bunga_bulanan)[:, None], 0.0)
+
+    summary = _rekonsiliasi_batch(pokok, angsuran_pokok, bunga, total, n - 1)
+    summary["angsuran_pertama"] = rupiah_round_array(total[:, 0])
+    summary["angsuran_bulanan"] = rupiah_round_array(cicilan_pokok + bunga_bulanan)
+    return summary
+
+
+_KERNEL = {
+    "efektif": _efektif_batch,
+    "flat": _flat_batch,
+    "flat_rata": _flat_rata_batch,
+}
+FIELDS = (
+    "angsuran_pertama",
+    "angsuran_bulanan",
+    "total_pokok",
+    "total_bunga",
+    "total_angsuran",
+)
+
+
+def sensitivity_grid(
+    pokok, rates, tenors, start_date, first_due_date, metode=("efektif", "flat")
+):
+    """Ringkasan jadwal untuk setiap pasangan (rate, tenor) dalam satu pass batch.
+
+    Angka sama dengan `build_schedule` (prorata periode pertama dan kedua
+    ADJUSTMENT ikut dihitung), tapi semua sel dihitung sebagai matriks
+    sel × bulan, bukan satu jadwal per sel. Hasil: {metode: {field: array
+    [len(rates), len(tenors)]}}.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    tenors = np.asarray(tenors, dtype=np.int64)
+    if rates.size * tenors.size > MAX_CELLS:
+        raise ValueError(f"Grid maksimal {MAX_CELLS} sel")
+    if tenors.size and tenors.min() < 1:
+        raise ValueError("Tenor minimal 1 bulan")
+    if tenors.size and tenors.max() > MAX_TENOR:
+        raise ValueError(f"Tenor maksimal {MAX_TENOR} bulan")
+    bulan = tenors.max() if tenors.size else 0
+    if rates.size * tenors.size * bulan > MAX_CELL_MONTHS:
+        raise ValueError(f"Grid maksimal {MAX_CELL_MONTHS} sel × bulan")
+    if not np.isfinite(rates).all() or (rates < 0).any():
+        raise ValueError("Bunga tidak boleh negatif")
+    for m in metode:
+        if m not in _KERNEL:
+            raise ValueError("Metode tidak dikenal")
+    if "efektif" in metode and (rates == 0).any():
+        # Sama dengan compute_schedule: PMT anuitas tidak terdefinisi di i = 0
+        raise ValueError("Bunga efektif harus lebih dari 0")
+
+    selisih_hari = selisih_hari_prorata(start_date, first_due_date)
+    r, n = (a.ravel() for a in np.meshgrid(rates, tenors, indexing="ij"))
+    shape = (rates.size, tenors.size)
+
+    hasil = {}
+    for m in metode:
+        kolom = {f: np.empty(r.size, dtype=np.int64) for f in FIELDS}
+        # Blok diurutkan per tenor supaya matriks tidak banyak padding
+        urut = np.argsort(n, kind="stable")
+        for mulai in range(0, r.size, _BLOK):
+            idx = urut[mulai : mulai + _BLOK]
+            blok = _KERNEL[m](float(pokok), r[idx], n[idx], selisih_hari)
+            for f in FIELDS:
+                kolom[f][idx] = blok[f]
+        hasil[m] = {f: v.reshape(shape) for f, v in kolom.items()}
+    return hasil
@@ -2,7 +2,6 @@ from flask import Flask, render_template, request, session, send_file, redirect,
 import pandas as pd
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from decimal import Decimal, ROUND_HALF_UP
 import io
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
@@ -11,6 +10,8 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_LEFT
 
+import schedule
+
 app = Flask(__name__)
 app.secret_key = "random-secret"
 
@@ -20,9 +21,10 @@ def fmt(x: float) -> str:
     return f"{x:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
-def rupiah_round(x: float) -> int:
-    """Pembulatan ke rupiah (0 desimal) dengan ROUND_HALF_UP (gaya Excel)."""
-    return int(Decimal(str(x)).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+# Varian ini memakai flat "rata": pokok × bunga_tahunan dibagi rata ke semua
+# bulan tanpa penyesuaian prorata. Kernel-nya ada di registry metode
+# schedule.py (metode "flat_rata"), sama dengan yang dipakai app.py.
+METODE_FLAT = "flat_rata"
 
 
 def build_schedule(
@@ -33,129 +35,12 @@ def build_schedule(
     start_date: datetime,
     first_due_date: datetime,
 ):
-    i_bulanan = bunga_tahunan / 12.0
-
-    # --- bunga prorata untuk periode pertama ---
-    if start_date.day == first_due_date.day:
-        # Sama tanggal → pakai 30/360 (anggap 1 bulan penuh)
-        selisih_hari = 30
-        bunga1_actual = pokok * bunga_tahunan * (30 / 360.0)
-    else:
-        # Beda tanggal → pakai selisih aktual
-        selisih_hari = max(0, (first_due_date - start_date).days)
-        bunga1_actual = pokok * bunga_tahunan * (selisih_hari / 360.0)
-
-    data = []
-    data.append([0, start_date.strftime("%d %b %Y"), 0, 0, 0, rupiah_round(pokok)])
-    sisa = pokok
-    penjelasan = ""
-
-    # ----------------------
-    # PERHITUNGAN ANGSURAN
-    # ----------------------
-    if metode == "efektif":
-        pmt = (
-            pokok
-            * (i_bulanan * (1 + i_bulanan) ** tenor)
-            / ((1 + i_bulanan) ** tenor - 1)
-        )
-        bunga1_std = sisa * i_bulanan
-        pokok1 = pmt - bunga1_std
-        tambahan_bunga = bunga1_actual - bunga1_std
-        total1 = pmt + tambahan_bunga
-        jatuh1 = first_due_date.strftime("%d %b %Y")
-        sisa -= pokok1
-        data.append([1, jatuh1, pokok1, bunga1_actual, total1, sisa])
-
-        for bulan in range(2, tenor + 1):
-            jatuh = (first_due_date + relativedelta(months=bulan - 1)).strftime(
-                "%d %b %Y"
-            )
-            bunga = sisa * i_bulanan
-            pokok_bayar = pmt - bunga
-            sisa -= pokok_bayar
-            data.append([bulan, jatuh, pokok_bayar, bunga, pmt, sisa])
-
-        penjelasan = (
-            "🔹 Metode Anuitas\n"
-            f"i bulanan = {bunga_tahunan:.2%} / 12 = {i_bulanan:.6f}\n"
-            f"PMT = P × [ i(1+i)^n / ((1+i)^n - 1) ] = {fmt(pmt)}\n\n"
-            f"Periode pertama (selisih {selisih_hari} hari):\n"
-            f" Bunga actual = {fmt(pokok)} × {bunga_tahunan:.2%} × ({selisih_hari}/360) = {fmt(bunga1_actual)}\n"
-            f" Bunga standar = {fmt(pokok)} × {i_bulanan:.6f} = {fmt(bunga1_std)}\n"
-            f" Pokok dibayar = PMT − Bunga standar = {fmt(pmt)} − {fmt(bunga1_std)} = {fmt(pokok1)}\n"
-            f" Tambahan (penyesuaian hari) = {fmt(bunga1_actual)} − {fmt(bunga1_std)} = {fmt(tambahan_bunga)}\n"
-            f" Total angsuran bln-1 = PMT + Tambahan = {fmt(pmt)} + {fmt(tambahan_bunga)} = {fmt(total1)}\n"
-        )
-
-    elif metode == "flat":
-        cicilan_pokok = pokok / tenor
-        # Total bunga target = pokok × bunga_tahunan (sesuai tabel Excel)
-        total_bunga = pokok * bunga_tahunan
-        bunga_flat_bulanan = total_bunga / tenor  # ini yg dibagi rata
-
-        for bulan in range(1, tenor + 1):
-            jatuh = (first_due_date + relativedelta(months=bulan - 1)).strftime(
-                "%d %b %Y"
-            )
-            sisa -= cicilan_pokok
-            bunga = bunga_flat_bulanan
-            total = cicilan_pokok + bunga
-            data.append([bulan, jatuh, cicilan_pokok, bunga, total, sisa])
-
-    else:
-        raise ValueError("Metode tidak dikenal")
-
-    # ----------------------
-    # DataFrame awal
-    # ----------------------
-    df = pd.DataFrame(
-        data,
-        columns=[
-            "Bulan",
-            "Tanggal",
-            "Angsuran Pokok",
-            "Bunga",
-            "Total Angsuran",
-            "Sisa Pokok",
-        ],
+    if metode == "flat":
+        metode = METODE_FLAT
+    return schedule.build_schedule(
+        pokok, bunga_tahunan, tenor, metode, start_date, first_due_date
     )
 
-    # ==========================================================
-    # ADJUSTMENT 1: Sisa pokok dibulatkan ke bunga terakhir
-    # ==========================================================
-    last_idx = len(df) - 1
-    residu_pokok = df.at[last_idx, "Sisa Pokok"]
-    if abs(residu_pokok) > 0.000001:
-        tambah = residu_pokok
-        df.at[last_idx, "Bunga"] += tambah
-        df.at[last_idx, "Total Angsuran"] += tambah
-        df.at[last_idx, "Sisa Pokok"] = 0.0
-
-    # ==========================================================
-    # ADJUSTMENT 2: Sesuaikan agar konsisten dengan Excel rounding
-    # ==========================================================
-    total_angsuran_rounded = df["Total Angsuran"].apply(rupiah_round).sum()
-    total_bunga_rounded = df["Bunga"].apply(rupiah_round).sum()
-    target_bunga = total_angsuran_rounded - rupiah_round(pokok)
-    selisih = target_bunga - total_bunga_rounded
-
-    if selisih != 0:
-        df.at[last_idx, "Bunga"] += selisih
-        df.at[last_idx, "Total Angsuran"] += selisih
-        # Sisa Pokok tetap 0
-
-    # ----------------------
-    # Summary (pakai angka rounded)
-    # ----------------------
-    summary = {
-        "total_pokok": df["Angsuran Pokok"].apply(rupiah_round).sum(),
-        "total_bunga": df["Bunga"].apply(rupiah_round).sum(),
-        "total_angsuran": df["Total Angsuran"].apply(rupiah_round).sum(),
-    }
-
-    return df, penjelasan, summary
-
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -0,0 +1,269 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Job "running" yang tidak di-update selama ini dianggap milik worker yang
+# sudah mati, dan diantrekan ulang saat resume
+JOB_LEASE = 300
+# Job selesai/gagal beserta file hasilnya dihapus setelah tidak di-update
+# selama ini
+JOB_RETENTION = 24 * 3600
+# Sapuan retensi dari klaim job paling sering sekali per interval ini
+_SWEEP_INTERVAL = 60
+# Progress ditulis ke database paling sering sekali per interval ini
+_PROGRESS_INTERVAL = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    filename TEXT NOT NULL,
+    mimetype TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (status, updated);
+"""
+
+
+class JobQueue:
+    """Antrean job ekspor berat dengan status di SQLite dan hasil di disk.
+
+    Job dijalankan thread pool di proses ini; karena antrean tersimpan di
+    database, job yang masih "queued" (atau "running" tapi worker-nya mati)
+    dijalankan lagi oleh `resume()` setelah restart. Beberapa proses boleh
+    memakai database yang sama: job diklaim atomik sebelum dijalankan.
+
+    Handler per jenis job didaftarkan lewat `register(kind, fn)`;
+    `fn(params, path, progress)` menulis hasil ke `path` dan boleh
+    memanggil `progress(done, total)`.
+
+    Job "done"/"failed" yang lebih tua dari JOB_RETENTION dibuang oleh
+    `sweep()`, yang jalan saat resume dan (paling sering sekali per
+    _SWEEP_INTERVAL) setiap kali job diklaim.
+    """
+
+    def __init__(self, directory: str, workers: int = 2):
+        self.directory = directory
+        self.workers = workers
+        self.handlers = {}
+        self._pool = None
+        self._started = False
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    @property
+    def db_path(self) -> str:
+        return os.path.join(self.directory, "jobs.sqlite3")
+
+    def result_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, "results", job_id)
+
+    def register(self, kind: str, fn):
+        self.handlers[kind] = fn
+
+    def _connect(self):
+        os.makedirs(os.path.join(self.directory, "results"), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _execute(self, sql, args=()):
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, args).rowcount
+        finally:
+            conn.close()
+
+    def _submit_pool(self, job_id):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="job"
+                )
+        self._pool.submit(self._run, job_id)
+
+    def submit(self, kind: str, params, filename: str, mimetype: str) -> str:
+        """Simpan job baru (status "queued") lalu jadwalkan; kembalikan id-nya."""
+        if kind not in self.handlers:
+            raise ValueError("Jenis job tidak dikenal")
+        self.start()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, params, status, filename, mimetype,"
+            " created, updated) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), filename, mimetype, now, now),
+        )
+        self._submit_pool(job_id)
+        return job_id
+
+    def start(self):
+        """Resume sekali per proses (idempoten)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.resume()
+
+    def resume(self) -> int:
+        """Antrekan lagi job yang belum selesai dari run sebelumnya."""
+        batas = time.time() - JOB_LEASE
+        self._execute(
+            "UPDATE jobs SET status = 'queued'"
+            " WHERE status = 'running' AND updated < ?",
+            (batas,),
+        )
+        conn = self._connect()
+        try:
+            ids = [
+                r["id"]
+                for r in conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created"
+                )
+            ]
+        finally:
+            conn.close()
+        self.sweep()
+        for job_id in ids:
+            self._submit_pool(job_id)
+        return len(ids)
+
+    def sweep(self) -> int:
+        """Hapus job selesai/gagal yang kedaluwarsa beserta file hasilnya."""
+        now = time.time()
+        batas = now - JOB_RETENTION
+        with self._lock:
+            self._last_sweep = now
+        conn = self._connect()
+        try:
+            with conn:
+                ids = [
+                    r["id"]
+                    for r in conn.execute(
+                        "SELECT id FROM jobs WHERE status IN ('done', 'failed')"
+                        " AND updated < ?",
+                        (batas,),
+                    )
+                ]
+                conn.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+                aktif = {
+                    r["id"]
+                    for r in conn.execute(
+                        "SELECT id FROM jobs WHERE status IN ('queued', 'running')"
+                    )
+                }
+        finally:
+            conn.close()
+
+        # Row dihapus dulu supaya download tidak menemukan job tanpa file.
+        # File yatim (proses mati di antara keduanya, .tmp worker yang mati)
+        # ikut dibuang bila sudah lewat retensi dan job-nya tidak aktif.
+        folder = os.path.join(self.directory, "results")
+        dibuang = set(ids)
+        for nama in os.listdir(folder):
+            job_id = nama.split(".")[0]
+            path = os.path.join(folder, nama)
+            try:
+                if job_id in dibuang or (
+                    job_id not in aktif and os.path.getmtime(path) < batas
+                ):
+                    os.remove(path)
+            except FileNotFoundError:  # sudah dibuang proses lain
+                pass
+        return len(ids)
+
+    def _sweep_berkala(self):
+        with self._lock:
+            if time.time() - self._last_sweep < _SWEEP_INTERVAL:
+                return
+        self.sweep()
+
+    def get(self, job_id: str):
+        """Status job sebagai dict, atau None bila tidak ada."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, kind, status, done, total, error, filename, mimetype,"
+                " created, updated FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job = dict(row)
+        job["progress"] = job["done"] / job["total"] if job["total"] else None
+        if job["status"] == "done":
+            job["progress"] = 1.0
+        return job
+
+    def _run(self, job_id):
+        now = time.time()
+        # Klaim atomik: job yang sama bisa ikut di-resume proses lain
+        diklaim = self._execute(
+            "UPDATE jobs SET status = 'running', updated = ?"
+            " WHERE id = ? AND status = 'queued'",
+            (now, job_id),
+        )
+        if not diklaim:
+            return
+        self._sweep_berkala()
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT kind, params FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        terakhir = [0.0]
+
+        def progress(done, total):
+            now = time.time()
+            if now - terakhir[0] < _PROGRESS_INTERVAL and done < total:
+                return
+            terakhir[0] = now
+            self._execute(
+                "UPDATE jobs SET done = ?, total = ?, updated = ? WHERE id = ?",
+                (done, total, now, job_id),
+            )
+
+        path = self.result_path(job_id)
+        tmp = path + ".tmp"
+        try:
+            self.handlers[row["kind"]](json.loads(row["params"]), tmp, progress)
+            os.replace(tmp, path)
+        except Exception as e:  # noqa: BLE001 - kegagalan dicatat di job
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self._execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated = ?"
+                " WHERE id = ?",
+                (f"{type(e).__name__}: {e}", time.time(), job_id),
+            )
+            return
+        self._execute(
+            "UPDATE jobs SET status = 'done', updated = ? WHERE id = ?",
+            (time.time(), job_id),
+        )
+
+
+job_queue = JobQueue(
+    os.environ.get("JOBS_DIR") or os.path.join(tempfile.gettempdir(), "loan_app_jobs"),
+    int(os.environ.get("JOBS_WORKERS", "2")),
+)
@@ -0,0 +1,136 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Batas bucket histogram (detik), gaya default client Prometheus
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+# Timing tahap untuk request yang sedang berjalan: {tahap: [detik, jumlah]}.
+# ContextVar supaya modul inti (schedule, pdf) tidak perlu tahu soal Flask.
+_timings = ContextVar("timings", default=None)
+
+
+class Histogram:
+    """Histogram kumulatif per label, aman dipakai banyak thread."""
+
+    def __init__(self, name, help_text, label, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._data = {}  # label → [count per bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        with self._lock:
+            data = self._data.get(label_value)
+            if data is None:
+                data = self._data[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+            for idx, batas in enumerate(self.buckets):
+                if seconds <= batas:
+                    data[idx] += 1
+            data[-2] += 1
+            data[-1] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def exposition(self) -> list:
+        """Baris format teks Prometheus (0.0.4)."""
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._data.items())
+        for value, data in items:
+            label = f'{self.label}="{_escape(value)}"'
+            for batas, count in zip(self.buckets, data):
+                lines.append(f'{self.name}_bucket{{{label},le="{batas}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {data[-2]}')
+            lines.append(f"{self.name}_sum{{{label}}} {data[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {data[-2]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+stage_seconds = Histogram(
+    "loan_app_stage_seconds", "Durasi per tahap hot path (detik)", "stage"
+)
+request_seconds = Histogram(
+    "loan_app_request_seconds", "Durasi handler per endpoint (detik)", "endpoint"
+)
+
+
+@contextmanager
+def stage(name):
+    """Ukur satu tahap: masuk histogram dan (bila ada) Server-Timing request ini."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def record(name, seconds):
+    stage_seconds.observe(name, seconds)
+    timings = _timings.get()
+    if timings is not None:
+        item = timings.get(name)
+        if item is None:
+            timings[name] = [seconds, 1]
+        else:
+            item[0] += seconds
+            item[1] += 1
+
+
+def timed_iter(name, iterable):
+    """Bungkus generator (mis. template yang di-stream); total waktunya dicatat
+    sebagai satu tahap saat iterasi selesai. Waktu menunggu client tidak ikut."""
+    total = 0.0
+    it = iter(iterable)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            record(name, total + time.perf_counter() - t0)
+            return
+        total += time.perf_counter() - t0
+        yield item
+
+
+def start_request():
+    """Mulai pengumpulan timing untuk request saat ini."""
+    _timings.set({})
+
+
+def end_request() -> dict:
+    """Ambil timing request saat ini dan hentikan pengumpulan."""
+    timings = _timings.get()
+    _timings.set(None)
+    return timings or {}
+
+
+def server_timing(timings: dict) -> str:
+    """Nilai header Server-Timing (milidetik); tahap berulang dijumlahkan."""
+    bagian = []
+    for name, (seconds, count) in timings.items():
+        item = f"{name};dur={seconds * 1000:.3f}"
+        if count > 1:
+            item += f';desc="x{count}"'
+        bagian.append(item)
+    return ", ".join(bagian)
+
+
+def exposition(extra_lines=()) -> str:
+    lines = stage_seconds.exposition() + request_seconds.exposition()
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,302 @@
+import io
+import numbers
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle
+
+from metrics import stage
+from schedule import KOLOM, method_label
+
+
+def format_number(val, is_bulan=False):
+    if is_bulan:
+        return str(int(val))
+    if isinstance(val, numbers.Real):
+        if abs(val) < 0.5:
+            val = 0
+        return f"{val:,.0f}"  # tanpa desimal
+    return str(val)
+
+
+def table_rows(kolom) -> list:
+    """Isi tabel PDF (header, baris jadwal, baris total) sebagai string."""
+    data = [list(KOLOM)]
+    baris = zip(
+        kolom["Bulan"].tolist(),
+        kolom["Tanggal"],
+        kolom["Angsuran Pokok"].tolist(),
+        kolom["Bunga"].tolist(),
+        kolom["Total Angsuran"].tolist(),
+        kolom["Sisa Pokok"].tolist(),
+    )
+    for bulan, *nilai in baris:
+        data.append(
+            [format_number(bulan, is_bulan=True)] + [format_number(v) for v in nilai]
+        )
+
+    # Tambah baris total
+    total_row = ["T o t a l", ""]
+    for col in KOLOM[2:]:
+        if col == "Sisa Pokok":
+            total_row.append("")
+        else:
+            total_row.append(format_number(kolom[col].sum()))
+    data.append(total_row)
+    return data
+
+
+# ==========================================================
+# Geometri bersama (A4, margin sama dengan SimpleDocTemplate di bawah)
+# ==========================================================
+COL_WIDTHS = (40, 100, 100, 100, 100, 100)
+TABLE_WIDTH = sum(COL_WIDTHS)
+MARGIN = {"leftMargin": 20, "rightMargin": 30, "topMargin": 20, "bottomMargin": 18}
+
+
+def header_lines(pokok, bunga_tahunan, tenor, metode, namecstm) -> list:
+    jenis = method_label(metode)
+    return [
+        "Perhitungan Tabel Angsuran",
+        f"{namecstm}",
+        "Pembayaran Pokok Pembiayaan dan Tingkat Pengembalian",
+        f"Jumlah Pembiayaan : Rp. {pokok:,.2f}",
+        f"Tingkat Pengembalian : {bunga_tahunan*100:.2f} % {jenis}",
+        f"Periode Pembiayaan : {tenor} bulan",
+    ]
+
+
+# ==========================================================
+# RENDERER PLATYPUS (layout asli: Table + TableStyle + SimpleDocTemplate)
+# ==========================================================
+@lru_cache(maxsize=1)
+def _platypus_styles():
+    # Stylesheet dan ParagraphStyle dibuat sekali per proses
+    styles = getSampleStyleSheet()
+    header_style_big = ParagraphStyle(
+        "header_big",
+        parent=styles["Normal"],
+        fontSize=12,  # ukuran font
+        leading=14,  # jarak antar baris
+        spaceAfter=6,  # jarak bawah tiap paragraf
+        fontName="Helvetica-Bold",
+    )
+
+    header_bold = ParagraphStyle(
+        "header_bold",
+        parent=styles["Normal"],
+        fontSize=12,
+        leading=14,
+        spaceAfter=6,
+        fontName="Helvetica-Bold",
+    )
+
+    header_table_style = TableStyle(
+        [
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+            ("TOPPADDING", (0, 0), (-1, -1), 0),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ]
+    )
+
+    table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),  # header
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+            ("ALIGN", (0, 0), (-1, 0), "CENTER"),  # header rata tengah
+            ("VALIGN", (0, 0), (-1, 0), "MIDDLE"),
+            ("ALIGN", (0, 0), (0, -1), "CENTER"),  # kolom bulan center
+            ("ALIGN", (1, 0), (1, -1), "CENTER"),  # kolom tanggal kiri
+            ("ALIGN", (2, 0), (-1, -1), "RIGHT"),  # angka kanan
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            # Style khusus baris total
+            ("BACKGROUND", (0, -1), (-1, -1), colors.whitesmoke),
+            ("SPAN", (0, -1), (1, -1)),
+            ("ALIGN", (0, -1), (1, -1), "CENTER"),
+            ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ]
+    )
+    return header_bold, header_style_big, header_table_style, table_style
+
+
+def _header_paragraphs(header) -> list:
+    header_bold, header_style_big, _, _ = _platypus_styles()
+    return [Paragraph(f"<b>{header[0]}</b>", header_bold)] + [
+        Paragraph(teks, header_style_big) for teks in header[1:]
+    ]
+
+
+def _build_platypus(data, header, output):
+    _, _, header_table_style, table_style = _platypus_styles()
+    doc = SimpleDocTemplate(output, pagesize=A4, **MARGIN)
+
+    # HEADER pakai Table biar sejajar dengan tabel utama
+    header_data = [[para] for para in _header_paragraphs(header)]
+    header_table = Table(header_data, colWidths=[TABLE_WIDTH])
+    header_table.setStyle(header_table_style)
+
+    # TABEL utama
+    table = Table(data, repeatRows=1, colWidths=list(COL_WIDTHS))
+    table.setStyle(table_style)
+
+    doc.build([header_table, Spacer(1, 12), table])
+
+
+# ==========================================================
+# RENDERER CANVAS: geometri kolom tetap, baris digambar langsung di canvas
+# dengan paginasi manual. Posisi teks, garis dan warna mengikuti hasil
+# renderer platypus di atas (padding sel 6pt, tinggi baris 18pt, tabel di
+# tengah frame, header tabel diulang di setiap halaman).
+# ==========================================================
+_PAGE_W, _PAGE_H = A4
+_FRAME_PAD = 6  # padding bawaan Frame SimpleDocTemplate
+_FRAME_X = MARGIN["leftMargin"] + _FRAME_PAD
+_FRAME_W = _PAGE_W - MARGIN["leftMargin"] - MARGIN["rightMargin"] - 2 * _FRAME_PAD
+_TOP = _PAGE_H - MARGIN["topMargin"] - _FRAME_PAD
+_BOTTOM = MARGIN["bottomMargin"] + _FRAME_PAD
+_X0 = _FRAME_X + (_FRAME_W - TABLE_WIDTH) / 2  # Table platypus rata tengah
+_ROW_H = 18  # font 10, leading 12, padding atas/bawah 3
+_CELL_PAD = 6
+_BASELINE = 5
+
+_COL_X = [_X0]
+for _w in COL_WIDTHS:
+    _COL_X.append(_COL_X[-1] + _w)
+# Titik acuan teks per kolom: tengah untuk Bulan/Tanggal, kanan untuk angka
+_ANCHOR = [_COL_X[0] + 20, _COL_X[1] + 50] + [x - _CELL_PAD for x in _COL_X[3:]]
+_TOTAL_ANCHOR = _X0 + (COL_WIDTHS[0] + COL_WIDTHS[1]) / 2
+
+_FONT, _FONT_BOLD = "Helvetica", "Helvetica-Bold"
+_LIGHTGREY = colors.lightgrey
+_WHITESMOKE = colors.whitesmoke
+
+
+@lru_cache(maxsize=16384)
+def _x_sel(teks, font, idx):
+    """Posisi x teks satu sel (titik acuan kolom dikurangi lebar string).
+
+    Baris jadwal 240–360 bulan berisi ribuan sel dengan string berulang
+    (tanggal, angsuran tetap), jadi lebar string cukup dihitung sekali.
+    """
+    lebar = stringWidth(teks, font, 10)
+    return _ANCHOR[idx] - (lebar / 2 if idx < 2 else lebar)
+
+
+def _draw_rows(c, rows, y, font):
+    """Teks baris-baris tabel mulai dari baris yang sisi bawahnya `y`.
+
+    Semua sel ditulis ke satu text object (satu blok BT..ET) lewat API
+    publik PDFTextObject, bukan drawString per sel yang membuat text object
+    baru setiap kali. Hasil di halaman sama: font, posisi dan isi teks
+    identik.
+    """
+    teks_obj = c.beginText()
+    teks_obj.setFont(font, 10)
+    for row in rows:
+        yb = y + _BASELINE
+        for idx, teks in enumerate(row):
+            if teks:
+                teks_obj.setTextOrigin(_x_sel(teks, font, idx), yb)
+                teks_obj.textOut(teks)
+        y -= _ROW_H
+    c.drawText(teks_obj)
+
+
+def _draw_grid(c, top, bottom, with_total):
+    """GRID 0.5pt untuk satu potongan tabel (dari `top` ke `bottom`)."""
+    c.setLineWidth(0.5)
+    c.setLineCap(1)
+    c.setLineJoin(1)
+    c.setStrokeColor(colors.black)
+    y = top
+    while y >= bottom - 0.001:
+        c.line(_X0, y, _COL_X[-1], y)
+        y -= _ROW_H
+    for idx, x in enumerate(_COL_X):
+        # garis antara Bulan dan Tanggal tidak melewati baris total (SPAN)
+        awal = bottom + _ROW_H if with_total and idx == 1 else bottom
+        c.line(x, awal, x, top)
+
+
+def _build_canvas(data, header, output):
+    c = canvas.Canvas(output, pagesize=A4)
+    c.setTitle("(anonymous)")
+    c.setAuthor("(anonymous)")
+    c.setSubject("(unspecified)")
+    c.setCreator("(unspecified)")
+
+    # Header: Paragraph yang sama dengan renderer platypus (markup dan
+    # pemotongan baris ikut sama), digambar langsung tanpa Table
+    y = _TOP
+    for para in _header_paragraphs(header):
+        _, tinggi = para.wrap(TABLE_WIDTH, _TOP - _BOTTOM)
+        y -= tinggi + 4  # BOTTOMPADDING 4
+        para.drawOn(c, _X0, y + 4)
+    y -= 12  # Spacer
+
+    kepala, isi = data[0], data[1:]
+    mulai = 0
+    while True:
+        muat = int((y - _BOTTOM + 0.001) // _ROW_H) - 1  # minus header tabel
+        if muat < 1:
+            c.showPage()
+            y = _TOP
+            continue
+        potong = isi[mulai : mulai + muat]
+        selesai = mulai + muat >= len(isi)
+        top = y
+        bottom = top - _ROW_H * (len(potong) + 1)
+
+        c.setFillColor(_LIGHTGREY)
+        c.rect(_X0, top - _ROW_H, TABLE_WIDTH, _ROW_H, stroke=0, fill=1)
+        if selesai:
+            c.setFillColor(_WHITESMOKE)
+            c.rect(_X0, bottom, TABLE_WIDTH, _ROW_H, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+
+        _draw_rows(c, [kepala], top - _ROW_H, _FONT_BOLD)
+        n_data = len(potong) - 1 if selesai else len(potong)
+        _draw_rows(c, potong[:n_data], top - 2 * _ROW_H, _FONT)
+        if selesai:
+            # Baris total: kolom Bulan+Tanggal di-SPAN, teks di tengah keduanya
+            total = potong[-1]
+            c.setFont(_FONT_BOLD, 10)
+            c.drawCentredString(_TOTAL_ANCHOR, bottom + _BASELINE, total[0])
+            _draw_rows(c, [["", ""] + total[2:]], bottom, _FONT_BOLD)
+
+        _draw_grid(c, top, bottom, selesai)
+        mulai += muat
+        if selesai:
+            break
+        c.showPage()
+        y = _TOP
+
+    c.showPage()
+    c.save()
+
+
+RENDERERS = {"canvas": _build_canvas, "platypus": _build_platypus}
+
+
+def build_pdf(
+    kolom, pokok, bunga_tahunan, tenor, metode, namecstm, renderer="canvas"
+) -> io.BytesIO:
+    if renderer not in RENDERERS:
+        raise ValueError("Renderer PDF tidak dikenal")
+    with stage("pdf_rows"):
+        data = table_rows(kolom)
+    header = header_lines(pokok, bunga_tahunan, tenor, metode, namecstm)
+
+    output = io.BytesIO()
+    with stage("pdf_build"):
+        RENDERERS[renderer](data, header, output)
+    output.seek(0)
+    return output
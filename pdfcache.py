@@ -0,0 +1,131 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from cache import loan_key
+
+# Naikkan bila layout/isi pdf.py berubah, supaya file lama tidak terpakai lagi
+TEMPLATE_VERSION = "2"
+
+
+def pdf_key(loan, renderer="canvas") -> str:
+    """Hash konten PDF: parameter ternormalisasi + versi template + renderer."""
+    raw = repr((TEMPLATE_VERSION, renderer) + loan_key(loan)).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+class PdfCache:
+    """Cache PDF di disk, content-addressed (`<dir>/<ab>/<hash>.pdf`).
+
+    Ukuran total dibatasi `max_bytes`; bila lewat, file dengan mtime paling
+    lama dihapus sampai ±90% batas (mtime diperbarui setiap hit, jadi
+    perilakunya LRU). File ditulis atomik lewat os.replace sehingga aman
+    dipakai beberapa worker sekaligus. `max_bytes` 0 = cache mati.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # dihitung malas dari isi direktori
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pdf")
+
+    def get(self, key: str):
+        """Path file bila ada di cache, atau None."""
+        if not self.max_bytes:
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, data: bytes):
+        """Simpan PDF; kembalikan path-nya (None bila cache mati)."""
+        if not self.max_bytes:
+            return None
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _files(self):
+        for root, _, files in os.walk(self.directory):
+            for nama in files:
+                if nama.endswith(".pdf"):
+                    full = os.path.join(root, nama)
+                    try:
+                        st = os.stat(full)
+                    except FileNotFoundError:
+                        continue
+                    yield st.st_mtime, st.st_size, full
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def _evict(self, keep=None):
+        files = sorted(self._files())
+        self._size = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, full in files:
+            if self._size <= target:
+                break
+            if full == keep:
+                continue
+            try:
+                os.remove(full)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for _, _, full in list(self._files()):
+                try:
+                    os.remove(full)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self._size is None and self.max_bytes:
+                self._size = self._scan_size()
+            return {
+                "directory": self.directory,
+                "size_bytes": self._size or 0,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+pdf_cache = PdfCache(
+    os.environ.get("PDF_CACHE_DIR")
+    or os.path.join(tempfile.gettempdir(), "loan_app_pdf"),
+    int(float(os.environ.get("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024),
+)
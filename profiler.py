@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Profiler sampling sederhana untuk satu thread (tanpa dependensi).
+
+    Thread latar mengambil stack thread target setiap `interval` detik lewat
+    `sys._current_frames()`; hasilnya stack "collapsed" (format flamegraph:
+    `modul:fungsi;modul:fungsi jumlah`).
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                modul = os.path.splitext(os.path.basename(code.co_filename))[0]
+                stack.append(f"{modul}:{code.co_name}")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+
+def profile_dir():
+    return os.environ.get("PROFILE_DIR") or os.path.join(
+        tempfile.gettempdir(), "loan_app_profiles"
+    )
+
+
+def profile_path(endpoint) -> str:
+    """Nama file .folded unik untuk satu request."""
+    nama = "".join(c if c.isalnum() else "_" for c in endpoint or "request")
+    waktu = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(profile_dir(), f"{waktu}-{nama}-{time.monotonic_ns()}.folded")
+
+
+def save(profiler: SamplingProfiler, path: str):
+    profiler.stop()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(profiler.collapsed())
@@ -0,0 +1,98 @@
+import numpy as np
+
+_TOL = 1e-14
+_MAX_ITER = 60
+
+
+def _faktor_anuitas(i, n):
+    """PMT per 1 rupiah pokok: i / (1 - (1+i)^-n), dengan limit 1/n saat i = 0."""
+    i = np.asarray(i, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = i / -np.expm1(-n * np.log1p(i))
+    return np.where(i == 0, 1.0 / n, f)
+
+
+def _masukan(rate, tenor):
+    """(skalar?, rate, tenor) sebagai array float 1-D+ hasil broadcast."""
+    skalar = np.ndim(rate) == 0 and np.ndim(tenor) == 0
+    rate, tenor = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(rate, dtype=np.float64)),
+        np.atleast_1d(np.asarray(tenor, dtype=np.float64)),
+    )
+    return skalar, rate, tenor
+
+
+def _keluaran(x, skalar):
+    return float(x[0]) if skalar else x
+
+
+def effective_to_flat(rate, tenor):
+    """Rate flat p.a yang total angsurannya sama dengan anuitas `rate` p.a.
+
+    Rumus tertutup: flat = (PMT × n − 1) / n × 12, PMT per rupiah pokok
+    dengan i = rate / 12 seperti di `build_schedule`. Menerima skalar atau
+    array (rate, tenor) yang bisa di-broadcast.
+    """
+    skalar, rate, tenor = _masukan(rate, tenor)
+    if np.any(tenor < 1):
+        raise ValueError("Tenor minimal 1 bulan")
+    pmt = _faktor_anuitas(rate / 12.0, tenor)
+    return _keluaran((pmt * tenor - 1.0) / tenor * 12.0, skalar)
+
+
+def flat_to_effective(rate, tenor):
+    """Rate efektif p.a yang anuitasnya sama dengan angsuran flat `rate` p.a.
+
+    Menyelesaikan i / (1 − (1+i)^−n) = 1/n + flat/12 dengan Newton
+    tervektorisasi (semua pasangan sekaligus), mulai dari pendekatan
+    i ≈ 2n/(n+1) × flat/12 dan dijaga tetap dalam braket [0, a].
+    """
+    skalar, rate, n = _masukan(rate, tenor)
+    if np.any(n < 1):
+        raise ValueError("Tenor minimal 1 bulan")
+    if np.any(rate < 0):
+        raise ValueError("Rate tidak boleh negatif")
+
+    shape = rate.shape
+    rate, n = rate.ravel(), n.ravel()
+    a = 1.0 / n + rate / 12.0  # angsuran flat per rupiah pokok
+    lo = np.zeros_like(a)
+    hi = a.copy()  # i < a karena faktor anuitas > i
+    i = np.clip(2.0 * n / (n + 1.0) * rate / 12.0, lo, hi)
+
+    aktif = rate > 0
+    for _ in range(_MAX_ITER):
+        if not aktif.any():
+            break
+        ia, na = i[aktif], n[aktif]
+        v = np.exp(-na * np.log1p(ia))  # (1+i)^-n
+        g = ia - a[aktif] * (1.0 - v)  # nol di solusi, naik monoton di sekitarnya
+        dg = 1.0 - a[aktif] * na * v / (1.0 + ia)
+
+        # perbarui braket lalu langkah Newton; bila keluar braket pakai bisection
+        lo_a = np.where(g < 0, ia, lo[aktif])
+        hi_a = np.where(g > 0, ia, hi[aktif])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            baru = ia - g / dg
+        luar = ~np.isfinite(baru) | (baru <= lo_a) | (baru >= hi_a)
+        baru = np.where(luar, 0.5 * (lo_a + hi_a), baru)
+
+        lo[aktif], hi[aktif], i[aktif] = lo_a, hi_a, baru
+        selesai = np.abs(baru - ia) <= _TOL * np.maximum(1.0, ia)
+        idx = np.flatnonzero(aktif)
+        aktif[idx[selesai]] = False
+
+    i = np.where(rate > 0, i, 0.0)
+    return _keluaran((i * 12.0).reshape(shape), skalar)
+
+
+def flat_rata_to_effective(rate, tenor):
+    """Rate efektif p.a untuk metode flat_rata dengan bunga `rate` per tenor.
+
+    flat_rata membebankan pokok × rate untuk seluruh tenor (bukan per
+    tahun), jadi setara flat p.a rate × 12 / n.
+    """
+    skalar, rate, n = _masukan(rate, tenor)
+    if np.any(n < 1):
+        raise ValueError("Tenor minimal 1 bulan")
+    return _keluaran(flat_to_effective(rate * 12.0 / n, n), skalar)
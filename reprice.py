@@ -0,0 +1,126 @@
+import os
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+from bulk import map_chunks
+from restructure import LoanSchedule
+from schedule import Schedule
+from store import Book, store_key
+
+# Pinjaman terdampak per tugas worker
+REPRICE_CHUNK = 500
+# Hanya anuitas yang bisa di-reprice: untuk flat, segmen sisa masih butuh
+# rate awal (prorata bulan 1) yang tidak lagi tersimpan setelah repricing
+REPRICE_METHODS = ("efektif",)
+
+_books = {}  # (path, inode meta.json) → Book, dibuka sekali per proses worker
+
+
+def reprice_key(key: bytes, tanggal, bunga_tahunan) -> bytes:
+    """Kunci jadwal hasil repricing: beda dari kunci parameter barunya,
+    karena baris sebelum tanggal efektif tetap memakai rate lama."""
+    return store_key((key, "reprice", str(np.datetime64(tanggal, "D")), bunga_tahunan))
+
+
+def _buka(path) -> Book:
+    # Inode ikut jadi kunci: book yang ditulis ulang di path yang sama
+    # adalah direktori baru, jadi tidak memakai mmap book lama
+    kunci = (path, os.stat(os.path.join(path, "meta.json")).st_ino)
+    book = _books.get(kunci)
+    if book is None:
+        book = _books[kunci] = Book(path)
+    return book
+
+
+def reprice_loan(book: Book, i, bunga_tahunan, bulan) -> Schedule:
+    """Jadwal pinjaman ke-i dengan rate baru mulai `bulan` (1-based).
+
+    Baris 1..bulan-1 diambil dari book apa adanya; hanya sisa periode yang
+    dihitung ulang dari sisa pokok (aturan `LoanSchedule.change_rate`,
+    termasuk ADJUSTMENT 1 dan 2 di baris terakhir).
+    """
+    jadwal = book[i]
+    loan = book.loan(i)
+    lama = LoanSchedule.from_rows(
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        jadwal.tanggal[0].astype("datetime64[us]").astype(datetime),
+        jadwal.tanggal[1].astype("datetime64[us]").astype(datetime),
+        (
+            jadwal.bulan[1:],
+            jadwal.angsuran_pokok[1:],
+            jadwal.bunga[1:],
+            jadwal.total_angsuran[1:],
+            jadwal.sisa_pokok[1:],
+        ),
+    )
+    baru = lama.change_rate(bulan, bunga_tahunan)
+    return Schedule(jadwal.bulan, jadwal.tanggal, *baru.value_columns(), baru.summary)
+
+
+def _reprice_potongan(tugas):
+    path, tanggal, items = tugas
+    book = _buka(path)
+    hasil, errors = [], []
+    for i, rate, bulan in items:
+        try:
+            jadwal = reprice_loan(book, i, rate, bulan)
+        except (ValueError, ZeroDivisionError) as e:
+            errors.append((i, f"{type(e).__name__}: {e}"))
+            continue
+        loan = dict(book.loan(i), bunga_tahunan=rate)
+        hasil.append((i, loan, jadwal, reprice_key(book.key(i), tanggal, rate)))
+    return hasil, errors
+
+
+def reprice_book(book: Book, rates, tanggal, path: str, chunk: int = REPRICE_CHUNK):
+    """Tulis book baru di `path` dengan rate baru berlaku mulai `tanggal`.
+
+    `rates` sepanjang book: rate tahunan baru per pinjaman, NaN = tetap
+    (bukan pinjaman floating). Hanya pinjaman yang rate-nya berubah dan
+    masih punya angsuran ≥ tanggal yang dihitung ulang, paralel per
+    `chunk` lewat `bulk.map_chunks`; sisanya disalin apa adanya (part
+    tanpa perubahan di-hardlink). Yang gagal dihitung juga disalin dan
+    dilaporkan di `errors`.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    if len(rates) != len(book):
+        raise ValueError("Jumlah rate harus sama dengan jumlah pinjaman di book")
+    posisi = book.positions(tanggal)
+    lama = book.column("bunga_tahunan")
+    didukung = np.isin(book.column("metode"), [m.encode() for m in REPRICE_METHODS])
+    berubah = ~np.isnan(rates) & (rates != lama) & (posisi["next_month"] > 0)
+    terdampak = np.flatnonzero(berubah & didukung)
+
+    items = (
+        (int(i), float(rates[i]), int(posisi["next_month"][i])) for i in terdampak
+    )
+    tanggal = str(np.datetime64(tanggal, "D"))
+    potongan = (
+        (book.path, tanggal, p) for p in iter(lambda: list(islice(items, chunk)), [])
+    )
+    errors = [
+        (int(i), "Metode tidak didukung untuk repricing")
+        for i in np.flatnonzero(berubah & ~didukung)
+    ]
+    repriced = [0]
+
+    def updates():
+        # Hasil potongan sudah berurutan menurut indeks pinjaman
+        for hasil, gagal in map_chunks(_reprice_potongan, potongan):
+            errors.extend(gagal)
+            repriced[0] += len(hasil)
+            yield from hasil
+
+    meta = book.write_updated(path, updates())
+    errors.sort()
+    return dict(
+        meta,
+        repriced=repriced[0],
+        unchanged=len(book) - int(berubah.sum()),
+        errors=errors,
+    )
@@ -0,0 +1,287 @@
+import copy
+
+import numpy as np
+
+from duedates import due_date_strings
+from schedule import (
+    ENGINES,
+    KOLOM,
+    MAX_TENOR,
+    anuitas_berjalan,
+    bunga_prorata,
+    fmt,
+    penjelasan_anuitas,
+    pmt_anuitas,
+    rupiah_round,
+    rupiah_round_array,
+    selisih_hari_prorata,
+)
+
+_KOLOM_ANGKA = ("Angsuran Pokok", "Bunga", "Total Angsuran")
+
+
+class LoanSchedule:
+    """Jadwal angsuran yang bisa diberi event di tengah tenor.
+
+    Event di bulan k (pelunasan sebagian, ganti rate, ganti tenor) hanya
+    menghitung ulang baris k..n dari sisa pokok setelah bulan k-1; baris
+    1..k-1 dan jumlah kumulatif rounded-nya dipakai ulang. ADJUSTMENT 1
+    dan 2 diterapkan ke baris terakhir saat `columns()` / `summary`
+    dibaca, dengan aturan yang sama seperti `compute_schedule`.
+
+    Objek tidak diubah oleh `apply`; setiap event menghasilkan objek baru,
+    jadi banyak skenario what-if bisa dicabang dari jadwal yang sama.
+    """
+
+    def __init__(self, pokok, bunga_tahunan, tenor, metode, start_date, first_due_date):
+        self._set_param(pokok, bunga_tahunan, tenor, metode, start_date, first_due_date)
+        kolom = ENGINES["numpy"][metode](
+            self.pokok, self.bunga_tahunan, self.tenor, self.selisih_hari
+        )
+        self._pasang(1, self._bulan_awal(), kolom)
+
+    @classmethod
+    def from_rows(
+        cls, pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, kolom
+    ):
+        """Pulihkan jadwal dari baris tersimpan (mis. book) tanpa menghitung ulang.
+
+        `kolom` = (bulan, angsuran_pokok, bunga, total, sisa) baris 1..n.
+        Baris terakhir yang tersimpan sudah kena ADJUSTMENT; tidak masalah,
+        karena event apa pun menghitung ulang baris k..n termasuk baris itu.
+        Untuk flat, `bunga_tahunan` harus rate awal (prorata bulan 1).
+        """
+        jadwal = cls.__new__(cls)
+        jadwal._set_param(pokok, bunga_tahunan, tenor, metode, start_date, first_due_date)
+        bulan, *nilai = kolom
+        jadwal._pasang(1, bulan, (np.array(c, dtype=np.float64) for c in nilai))
+        return jadwal
+
+    def _set_param(self, pokok, bunga_tahunan, tenor, metode, start_date, first_due_date):
+        if metode not in ENGINES["numpy"]:
+            raise ValueError("Metode tidak dikenal")
+        if metode not in ("efektif", "flat"):
+            raise ValueError("Metode tidak didukung untuk simulasi event")
+        self.pokok = float(pokok)
+        self.bunga_tahunan = float(bunga_tahunan)
+        self.tenor = int(tenor)
+        self.metode = metode
+        self.start_date = start_date
+        self.first_due_date = first_due_date
+        self.selisih_hari = selisih_hari_prorata(start_date, first_due_date)
+        self.events = ()
+        self._awal = (self.bunga_tahunan, self.tenor)
+        self._adj = bunga_prorata(self.pokok, self.bunga_tahunan, self.selisih_hari)
+        # Flat: bunga dihitung dari pokok awal (berkurang hanya oleh pelunasan
+        # sebagian), cicilan pokok tetap sampai rencananya diubah
+        self._dasar_bunga = self.pokok
+        self._cicilan = self.pokok / self.tenor
+
+    # ----------------------
+    # Event
+    # ----------------------
+    def apply(self, k, extra=0.0, bunga_tahunan=None, tenor=None):
+        """Jadwal baru dengan event mulai bulan `k` (1-based).
+
+        `extra`: pelunasan pokok sebagian, dianggap dibayar di awal periode k
+        dan dicatat di baris k. `bunga_tahunan`: rate baru (desimal, p.a).
+        `tenor`: tenor total baru dalam bulan (k..MAX_TENOR).
+        """
+        k = int(k)
+        extra = float(extra)
+        rate = self.bunga_tahunan if bunga_tahunan is None else float(bunga_tahunan)
+        tenor_baru = self.tenor if tenor is None else int(tenor)
+        if not 1 <= k <= min(self.tenor, len(self.bulan)):
+            raise ValueError("Bulan event di luar tenor")
+        if tenor_baru < k:
+            raise ValueError("Tenor baru tidak boleh sebelum bulan event")
+        if tenor_baru > MAX_TENOR:
+            raise ValueError(f"Tenor maksimal {MAX_TENOR} bulan")
+        if extra < 0:
+            raise ValueError("Pelunasan sebagian tidak boleh negatif")
+        saldo = self.pokok if k == 1 else float(self.sisa[k - 2])
+        if extra > max(saldo, 0.0):
+            raise ValueError("Pelunasan sebagian melebihi sisa pokok")
+
+        baru = copy.copy(self)
+        baru.bunga_tahunan, baru.tenor = rate, tenor_baru
+        baru.events = self.events + ((k, extra, rate, tenor_baru),)
+
+        if k == 1:
+            # Dari awal: prorata periode pertama ikut dihitung ulang
+            kolom = ENGINES["numpy"][self.metode](
+                self.pokok - extra, rate, tenor_baru, self.selisih_hari
+            )
+            baru._adj = bunga_prorata(self.pokok - extra, rate, self.selisih_hari)
+            baru._dasar_bunga = self.pokok - extra
+            baru._cicilan = baru._dasar_bunga / tenor_baru
+            bulan = baru._bulan_awal()
+        else:
+            baru._dasar_bunga = self._dasar_bunga - extra
+            if extra or tenor_baru != self.tenor:
+                # Rencana berubah: sisa + adj dibagi rata ke bulan tersisa
+                baru._cicilan = (saldo - extra + self._adj) / (tenor_baru - k + 1)
+            kolom = baru._segmen(saldo - extra, k)
+            bulan = np.arange(k, tenor_baru + 1)
+
+        angsuran_pokok, bunga, total, _ = (np.array(c, dtype=np.float64) for c in kolom)
+        angsuran_pokok[0] += extra
+        total[0] += extra
+        sisa = np.subtract.accumulate(np.concatenate(([saldo], angsuran_pokok)))[1:]
+        baru._pasang(k, bulan, (angsuran_pokok, bunga, total, sisa))
+        return baru
+
+    def prepay(self, k, jumlah):
+        return self.apply(k, extra=jumlah)
+
+    def change_rate(self, k, bunga_tahunan):
+        return self.apply(k, bunga_tahunan=bunga_tahunan)
+
+    def change_tenor(self, k, tenor):
+        return self.apply(k, tenor=tenor)
+
+    def _bulan_awal(self):
+        if self.metode == "flat":
+            # tenor 1 tetap dua baris (bulan 1 dan bulan n), sama dengan kernel
+            return np.concatenate(([1], np.arange(2, self.tenor), [self.tenor]))
+        return np.arange(1, self.tenor + 1)
+
+    def _segmen(self, saldo, k):
+        """Kolom mentah baris k..n dari `saldo` dengan rate dan tenor saat ini."""
+        m = self.tenor - k + 1
+        if self.metode == "efektif":
+            i = self.bunga_tahunan / 12.0
+            pmt = pmt_anuitas(saldo, i, m)
+            angsuran_pokok, bunga, _ = anuitas_berjalan(saldo, i, pmt, m)
+            return angsuran_pokok, bunga, np.full(m, pmt), None
+
+        # Flat: prorata bulan 1 masih dikembalikan lewat bunga bulan n (pokok
+        # terjadwal = saldo + adj = m × cicilan). Bunga flat tetap dari pokok
+        # awal dikurangi pelunasan sebagian, bukan dari sisa pokok.
+        adj = self._adj
+        cicilan_pokok = self._cicilan
+        bunga_bulanan = self._dasar_bunga * (self.bunga_tahunan / 12.0)
+        angsuran_pokok = np.full(m, cicilan_pokok)
+        angsuran_pokok[-1] = max(0.0, cicilan_pokok - adj)
+        bunga = np.full(m, bunga_bulanan)
+        bunga[-1] = bunga_bulanan + adj
+        return angsuran_pokok, bunga, np.full(m, cicilan_pokok + bunga_bulanan), None
+
+    # ----------------------
+    # Penyimpanan kolom + jumlah kumulatif rounded
+    # ----------------------
+    def _pasang(self, k, bulan, kolom):
+        """Ganti baris k..n dengan `kolom`, prefix 1..k-1 dipakai ulang."""
+        p = k - 1
+        angsuran_pokok, bunga, total, sisa = (np.asarray(c, dtype=np.float64) for c in kolom)
+        if p == 0:
+            self.bulan = np.asarray(bulan, dtype=np.int64)
+            self.angsuran_pokok, self.bunga, self.total, self.sisa = (
+                angsuran_pokok, bunga, total, sisa
+            )
+            self._kumulatif = {
+                nama: np.cumsum(rupiah_round_array(kol))
+                for nama, kol in zip(_KOLOM_ANGKA, (angsuran_pokok, bunga, total))
+            }
+            return
+
+        self.bulan = np.concatenate((self.bulan[:p], bulan)).astype(np.int64)
+        self.angsuran_pokok = np.concatenate((self.angsuran_pokok[:p], angsuran_pokok))
+        self.bunga = np.concatenate((self.bunga[:p], bunga))
+        self.total = np.concatenate((self.total[:p], total))
+        self.sisa = np.concatenate((self.sisa[:p], sisa))
+        self._kumulatif = {
+            nama: np.concatenate(
+                (
+                    self._kumulatif[nama][:p],
+                    self._kumulatif[nama][p - 1] + np.cumsum(rupiah_round_array(kol)),
+                )
+            )
+            for nama, kol in zip(_KOLOM_ANGKA, (angsuran_pokok, bunga, total))
+        }
+
+    # ----------------------
+    # Hasil (format sama dengan compute_schedule)
+    # ----------------------
+    def _rekonsiliasi(self):
+        """(bunga_akhir, total_akhir, sisa_akhir, summary) setelah ADJUSTMENT 1 dan 2.
+
+        Hanya baris terakhir yang berubah, jadi jumlah rounded baris lain
+        diambil dari kumulatif tanpa membulatkan ulang seluruh kolom.
+        """
+        bunga_akhir, total_akhir, sisa_akhir = (
+            float(self.bunga[-1]),
+            float(self.total[-1]),
+            float(self.sisa[-1]),
+        )
+        # ADJUSTMENT 1: sisa pokok ke bunga terakhir
+        if abs(sisa_akhir) > 0.000001:
+            bunga_akhir += sisa_akhir
+            total_akhir += sisa_akhir
+            sisa_akhir = 0.0
+
+        def tanpa_akhir(nama):
+            kum = self._kumulatif[nama]
+            return int(kum[-2]) if len(kum) > 1 else 0
+
+        # ADJUSTMENT 2: samakan dengan pembulatan gaya Excel
+        total_rounded = tanpa_akhir("Total Angsuran") + rupiah_round(total_akhir)
+        bunga_rounded = tanpa_akhir("Bunga") + rupiah_round(bunga_akhir)
+        selisih = total_rounded - rupiah_round(self.pokok) - bunga_rounded
+        if selisih != 0:
+            bunga_akhir += selisih
+            total_akhir += selisih
+
+        summary = {
+            "total_pokok": int(self._kumulatif["Angsuran Pokok"][-1]),
+            "total_bunga": tanpa_akhir("Bunga") + rupiah_round(bunga_akhir),
+            "total_angsuran": tanpa_akhir("Total Angsuran") + rupiah_round(total_akhir),
+        }
+        return bunga_akhir, total_akhir, sisa_akhir, summary
+
+    @property
+    def summary(self) -> dict:
+        return self._rekonsiliasi()[3]
+
+    @property
+    def penjelasan(self) -> str:
+        teks = ""
+        if self.metode == "efektif":
+            # penjelasan anuitas mengikuti jadwal awal (sebelum event)
+            rate, tenor = self._awal
+            teks = penjelasan_anuitas(self.pokok, rate, tenor, self.selisih_hari)
+        for k, extra, rate, tenor in self.events:
+            teks += (
+                f"\n🔹 Event bulan {k}: pelunasan sebagian {fmt(extra)}, "
+                f"rate {rate:.2%} p.a, tenor {tenor} bulan\n"
+            )
+        return teks
+
+    def value_columns(self) -> tuple:
+        """(angsuran_pokok, bunga, total, sisa) termasuk baris 0, tanpa tanggal."""
+        bunga_akhir, total_akhir, sisa_akhir, _ = self._rekonsiliasi()
+        bunga, total, sisa = self.bunga.copy(), self.total.copy(), self.sisa.copy()
+        bunga[-1], total[-1], sisa[-1] = bunga_akhir, total_akhir, sisa_akhir
+        return (
+            np.concatenate(([0.0], self.angsuran_pokok)),
+            np.concatenate(([0.0], bunga)),
+            np.concatenate(([0.0], total)),
+            np.concatenate(([float(rupiah_round(self.pokok))], sisa)),
+        )
+
+    def columns(self) -> dict:
+        """Kolom tabel seperti `compute_schedule` (termasuk baris 0 pencairan)."""
+        jatuh_tempo = due_date_strings(self.first_due_date, self.tenor)
+        tanggal = [self.start_date.strftime("%d %b %Y")] + [
+            jatuh_tempo[b - 1] for b in self.bulan.tolist()
+        ]
+        kolom = {
+            "Bulan": np.concatenate(([0], self.bulan)).astype(np.int64),
+            "Tanggal": tanggal,
+        }
+        kolom.update(zip(KOLOM[2:], self.value_columns()))
+        return kolom
+
+    def result(self):
+        """(kolom, penjelasan, summary), sama dengan hasil `compute_schedule`."""
+        return self.columns(), self.penjelasan, self.summary
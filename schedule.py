@@ -0,0 +1,805 @@
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+import os
+import numpy as np
+
+from duedates import due_date_strings, due_dates, format_dates
+from metrics import stage
+
+KOLOM = [
+    "Bulan",
+    "Tanggal",
+    "Angsuran Pokok",
+    "Bunga",
+    "Total Angsuran",
+    "Sisa Pokok",
+]
+
+# Tenor maksimum (bulan) untuk input dari luar. Kernel sendiri tidak
+# membatasi, tapi memori dan loop per bulan tumbuh linear dengan tenor.
+MAX_TENOR = 600
+
+
+def fmt(x: float) -> str:
+    if abs(x) < 0.5:  # toleransi setengah rupiah
+        x = 0
+    # Format ",.0f" tidak pernah menghasilkan titik desimal, jadi cukup
+    # satu replace (dulu tukar "," ↔ "." lewat tiga replace)
+    return f"{x:,.0f}".replace(",", ".")
+
+
+def rupiah_round(x: float) -> int:
+    """Pembulatan ke rupiah (0 desimal) dengan ROUND_HALF_UP (gaya Excel)."""
+    return int(Decimal(str(x)).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def rupiah_round_array(x) -> np.ndarray:
+    """Versi vektor dari `rupiah_round` (hasil identik, tanpa Decimal per sel).
+
+    Bagian pecahan |x| - floor(|x|) selalu eksak di float, jadi pembandingan
+    dengan 0.5 sama dengan ROUND_HALF_UP atas repr desimal `str(x)`.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    pecahan = np.abs(x)
+    r = np.floor(pecahan)
+    pecahan -= r
+    r += pecahan >= 0.5
+    return np.copysign(r, x, out=r).astype(np.int64)
+
+
+def selisih_hari_prorata(start_date, first_due_date) -> int:
+    if start_date.day == first_due_date.day:
+        # Sama tanggal → pakai 30/360 (anggap 1 bulan penuh)
+        return 30
+    # Beda tanggal → pakai selisih aktual
+    return max(0, (first_due_date - start_date).days)
+
+
+def bunga_prorata(pokok, bunga_tahunan, selisih_hari):
+    return pokok * bunga_tahunan * (selisih_hari / 360.0)
+
+
+def pmt_anuitas(pokok, i_bulanan, tenor):
+    return (
+        pokok
+        * (i_bulanan * (1 + i_bulanan) ** tenor)
+        / ((1 + i_bulanan) ** tenor - 1)
+    )
+
+
+def penjelasan_anuitas(pokok, bunga_tahunan, tenor, selisih_hari) -> str:
+    i_bulanan = bunga_tahunan / 12.0
+    pmt = pmt_anuitas(pokok, i_bulanan, tenor)
+    bunga1_actual = bunga_prorata(pokok, bunga_tahunan, selisih_hari)
+    bunga1_std = pokok * i_bulanan
+    pokok1 = pmt - bunga1_std
+    tambahan_bunga = bunga1_actual - bunga1_std
+    total1 = pmt + tambahan_bunga
+    return (
+        "🔹 Metode Anuitas\n"
+        f"i bulanan = {bunga_tahunan:.2%} / 12 = {i_bulanan:.6f}\n"
+        f"PMT = P × [ i(1+i)^n / ((1+i)^n - 1) ] = {fmt(pmt)}\n\n"
+        f"Periode pertama (selisih {selisih_hari} hari):\n"
+        f" Bunga actual = {fmt(pokok)} × {bunga_tahunan:.2%} × ({selisih_hari}/360) = {fmt(bunga1_actual)}\n"
+        f" Bunga standar = {fmt(pokok)} × {i_bulanan:.6f} = {fmt(bunga1_std)}\n"
+        f" Pokok dibayar = PMT − Bunga standar = {fmt(pmt)} − {fmt(bunga1_std)} = {fmt(pokok1)}\n"
+        f" Tambahan (penyesuaian hari) = {fmt(bunga1_actual)} − {fmt(bunga1_std)} = {fmt(tambahan_bunga)}\n"
+        f" Total angsuran bln-1 = PMT + Tambahan = {fmt(pmt)} + {fmt(tambahan_bunga)} = {fmt(total1)}\n"
+    )
+
+
+# ==========================================================
+# KERNEL: masing-masing menerima (pokok, bunga_tahunan, tenor, selisih_hari)
+# dan mengembalikan kolom (pokok, bunga, total, sisa) untuk baris 1..n
+# (baris 0 = pencairan ditambahkan terpisah)
+# ==========================================================
+def _efektif_python(pokok, bunga_tahunan, tenor, selisih_hari):
+    # Loop referensi (perilaku asli baris per baris)
+    i_bulanan = bunga_tahunan / 12.0
+    pmt = pmt_anuitas(pokok, i_bulanan, tenor)
+    bunga1_actual = bunga_prorata(pokok, bunga_tahunan, selisih_hari)
+    sisa = pokok
+    bunga1_std = sisa * i_bulanan
+    pokok1 = pmt - bunga1_std
+    total1 = pmt + (bunga1_actual - bunga1_std)
+    sisa -= pokok1
+    rows = [(pokok1, bunga1_actual, total1, sisa)]
+    for _ in range(2, tenor + 1):
+        bunga = sisa * i_bulanan
+        pokok_bayar = pmt - bunga
+        sisa -= pokok_bayar
+        rows.append((pokok_bayar, bunga, pmt, sisa))
+    return tuple(np.array(c, dtype=np.float64) for c in zip(*rows))
+
+
+def anuitas_berjalan(pokok, i_bulanan, pmt, tenor):
+    """(angsuran_pokok, bunga, sisa) anuitas per bulan tanpa prorata.
+
+    Tidak tervektorisasi: rekurensi sisa tetap loop Python per bulan,
+    karena pembulatan float berurutan tidak bisa direproduksi operasi
+    vektor. Rumus tertutup pokok_1 × (1+i)^(k-1) (versi vektor awal) selisih
+    1 rupiah dari loop referensi di ±0,5% jadwal (lihat tools/fuzz.py).
+    Hanya kolom bunga dan pokok yang diturunkan dari sisa secara vektor.
+    Di 360 bulan kernel ini ±2x lebih cepat dari `_efektif_python`; yang
+    membuat jadwal efektif jauh lebih cepat dari baseline adalah pipeline
+    sisanya (tanpa DataFrame/Decimal per sel), bukan kernel ini.
+    """
+    sisa_list = []
+    s = pokok
+    for _ in range(tenor):
+        s -= pmt - s * i_bulanan
+        sisa_list.append(s)
+    sisa = np.array(sisa_list, dtype=np.float64)
+    bunga = np.concatenate(([pokok], sisa[:-1])) * i_bulanan
+    return pmt - bunga, bunga, sisa
+
+
+def _efektif_numpy(pokok, bunga_tahunan, tenor, selisih_hari):
+    # Engine "numpy" untuk efektif: loop sisa per bulan (anuitas_berjalan),
+    # kolom lain dan keluaran berupa array NumPy
+    i_bulanan = bunga_tahunan / 12.0
+    pmt = pmt_anuitas(pokok, i_bulanan, tenor)
+    bunga1_actual = bunga_prorata(pokok, bunga_tahunan, selisih_hari)
+    bunga1_std = pokok * i_bulanan
+    angsuran_pokok, bunga, sisa = anuitas_berjalan(pokok, i_bulanan, pmt, tenor)
+    bunga[0] = bunga1_actual
+    total = np.full(tenor, pmt)
+    total[0] = pmt + (bunga1_actual - bunga1_std)
+    return angsuran_pokok, bunga, total, sisa
+
+
+def _flat_python(pokok, bunga_tahunan, tenor, selisih_hari):
+    adj = bunga_prorata(pokok, bunga_tahunan, selisih_hari)
+    cicilan_pokok = pokok / tenor
+    bunga_bulanan = pokok * (bunga_tahunan / 12.0)
+    sisa = pokok
+
+    pokok1 = cicilan_pokok + adj
+    sisa -= pokok1
+    rows = [(pokok1, bunga_bulanan, pokok1 + bunga_bulanan, sisa)]
+    for _ in range(2, tenor):
+        sisa -= cicilan_pokok
+        rows.append((cicilan_pokok, bunga_bulanan, cicilan_pokok + bunga_bulanan, sisa))
+
+    pokokN = max(0.0, cicilan_pokok - adj)
+    sisa -= pokokN
+    rows.append((pokokN, bunga_bulanan + adj, cicilan_pokok + bunga_bulanan, sisa))
+    return tuple(np.array(c, dtype=np.float64) for c in zip(*rows))
+
+
+def _flat_numpy(pokok, bunga_tahunan, tenor, selisih_hari):
+    # Bulan 1 dan bulan n saja yang berbeda; sisanya konstan.
+    # Catatan: tenor 1 tetap menghasilkan dua baris (bulan 1 dan bulan n),
+    # sama seperti loop referensi.
+    adj = bunga_prorata(pokok, bunga_tahunan, selisih_hari)
+    cicilan_pokok = pokok / tenor
+    bunga_bulanan = pokok * (bunga_tahunan / 12.0)
+    n = max(tenor - 2, 0) + 2
+
+    angsuran_pokok = np.full(n, cicilan_pokok)
+    angsuran_pokok[0] = cicilan_pokok + adj
+    angsuran_pokok[-1] = max(0.0, cicilan_pokok - adj)
+    bunga = np.full(n, bunga_bulanan)
+    bunga[-1] = bunga_bulanan + adj
+    total = np.full(n, cicilan_pokok + bunga_bulanan)
+    total[0] = angsuran_pokok[0] + bunga_bulanan
+    sisa = _sisa_berjalan(pokok, angsuran_pokok)
+    return angsuran_pokok, bunga, total, sisa
+
+
+def _sisa_berjalan(pokok, angsuran_pokok):
+    # subtract.accumulate = pengurangan berurutan, sama persis dengan `sisa -= x`
+    return np.subtract.accumulate(np.concatenate(([pokok], angsuran_pokok)))[1:]
+
+
+def _rate_pecahan(bunga_tahunan):
+    # Satu Decimal per pinjaman: 0.105 → 21/200 persis, bukan pecahan biner float
+    return Fraction(Decimal(str(bunga_tahunan)))
+
+
+def _bagi_half_up(a: int, b: int) -> int:
+    """a / b dibulatkan ROUND_HALF_UP (menjauhi nol), b > 0, murni integer."""
+    if a >= 0:
+        return (2 * a + b) // (2 * b)
+    return -((-2 * a + b) // (2 * b))
+
+
+def _bulat_pecahan(x: Fraction) -> int:
+    return _bagi_half_up(x.numerator, x.denominator)
+
+
+def _efektif_rupiah(pokok, bunga_tahunan, tenor, selisih_hari):
+    # Semua akrual dalam rupiah bulat; pokok bulan terakhir = sisa, jadi
+    # sisa akhir tepat 0 tanpa residu.
+    P = rupiah_round(pokok)
+    r = _rate_pecahan(bunga_tahunan)
+    i = r / 12
+    faktor = (1 + i) ** tenor
+    pmt = _bulat_pecahan(P * i * faktor / (faktor - 1))
+    i_num, i_den = i.numerator, i.denominator
+
+    bunga1_std = _bagi_half_up(P * i_num, i_den)
+    bunga1_actual = _bulat_pecahan(P * r * selisih_hari / 360)
+    pokok1 = pmt - bunga1_std
+    sisa = P - pokok1
+    rows = [(pokok1, bunga1_actual, pokok1 + bunga1_actual, sisa)]
+    for bulan in range(2, tenor + 1):
+        bunga = _bagi_half_up(sisa * i_num, i_den)
+        pokok_bayar = sisa if bulan == tenor else pmt - bunga
+        sisa -= pokok_bayar
+        rows.append((pokok_bayar, bunga, pokok_bayar + bunga, sisa))
+    return tuple(np.array(c, dtype=np.int64) for c in zip(*rows))
+
+
+def _flat_rupiah(pokok, bunga_tahunan, tenor, selisih_hari):
+    P = rupiah_round(pokok)
+    r = _rate_pecahan(bunga_tahunan)
+    cicilan_pokok = _bagi_half_up(P, tenor)
+    bunga_bulanan = _bulat_pecahan(P * r / 12)
+    adj = _bulat_pecahan(P * r * selisih_hari / 360)
+    n = max(tenor - 2, 0) + 2
+
+    angsuran_pokok = np.full(n, cicilan_pokok, dtype=np.int64)
+    angsuran_pokok[0] = cicilan_pokok + adj
+    bunga = np.full(n, bunga_bulanan, dtype=np.int64)
+
+    # Bulan n mengambil seluruh sisa (termasuk selisih pembulatan cicilan);
+    # bila sisa negatif (adj > cicilan), kelebihannya dikurangkan dari bunga
+    sisa_sebelum = P - int(angsuran_pokok[:-1].sum())
+    angsuran_pokok[-1] = max(0, sisa_sebelum)
+    bunga[-1] = bunga_bulanan + adj + (sisa_sebelum - angsuran_pokok[-1])
+
+    total = angsuran_pokok + bunga
+    sisa = P - np.cumsum(angsuran_pokok)
+    sisa[-1] = 0
+    return angsuran_pokok, bunga, total, sisa
+
+
+# Flat "rata" (varian holder.py): bunga pokok × rate dibagi rata ke semua
+# bulan, tanpa penyesuaian prorata periode pertama.
+def _flat_rata_python(pokok, bunga_tahunan, tenor, selisih_hari):
+    cicilan_pokok = pokok / tenor
+    bunga_bulanan = pokok * bunga_tahunan / tenor
+    sisa = pokok
+    rows = []
+    for _ in range(tenor):
+        sisa -= cicilan_pokok
+        rows.append((cicilan_pokok, bunga_bulanan, cicilan_pokok + bunga_bulanan, sisa))
+    return tuple(np.array(c, dtype=np.float64) for c in zip(*rows))
+
+
+def _flat_rata_numpy(pokok, bunga_tahunan, tenor, selisih_hari):
+    cicilan_pokok = pokok / tenor
+    bunga_bulanan = pokok * bunga_tahunan / tenor
+    angsuran_pokok = np.full(tenor, cicilan_pokok)
+    bunga = np.full(tenor, bunga_bulanan)
+    total = np.full(tenor, cicilan_pokok + bunga_bulanan)
+    return angsuran_pokok, bunga, total, _sisa_berjalan(pokok, angsuran_pokok)
+
+
+def _flat_rata_rupiah(pokok, bunga_tahunan, tenor, selisih_hari):
+    # Bulan terakhir mengambil sisa pokok dan sisa pembulatan bunga, jadi
+    # total bunga tepat P × rate (dibulatkan sekali)
+    P = rupiah_round(pokok)
+    total_bunga = _bulat_pecahan(P * _rate_pecahan(bunga_tahunan))
+    angsuran_pokok = np.full(tenor, _bagi_half_up(P, tenor), dtype=np.int64)
+    bunga = np.full(tenor, _bagi_half_up(total_bunga, tenor), dtype=np.int64)
+    angsuran_pokok[-1] = P - int(angsuran_pokok[:-1].sum())
+    bunga[-1] = total_bunga - int(bunga[:-1].sum())
+    sisa = P - np.cumsum(angsuran_pokok)
+    return angsuran_pokok, bunga, angsuran_pokok + bunga, sisa
+
+
+def _bulan_penuh(tenor):
+    return np.arange(1, tenor + 1)
+
+
+def _bulan_flat(tenor):
+    return np.concatenate(([1], np.arange(2, tenor), [tenor]))
+
+
+# ==========================================================
+# REGISTRY METODE: kernel per engine, nomor bulan tiap baris, label dan
+# teks penjelasan. Metode baru cukup didaftarkan lewat `register_method`.
+# ==========================================================
+ENGINES = {}  # engine → {metode: kernel}
+METHODS = {}  # metode → {"label", "bulan", "penjelasan"}
+ENGINE_EKSAK = {"rupiah"}
+DEFAULT_ENGINE = os.environ.get("SCHEDULE_ENGINE", "numpy")
+
+
+def register_method(nama, kernels, label, bulan=_bulan_penuh, penjelasan=None):
+    """Daftarkan metode `nama`.
+
+    `kernels`: {engine: kernel} (lihat KERNEL di atas); `bulan(tenor)`:
+    nomor bulan untuk baris 1..n; `penjelasan(pokok, bunga_tahunan, tenor,
+    selisih_hari)`: teks penjelasan (opsional); `label`: jenis rate di
+    header PDF/Excel.
+    """
+    METHODS[nama] = {"label": label, "bulan": bulan, "penjelasan": penjelasan}
+    for engine, kernel in kernels.items():
+        ENGINES.setdefault(engine, {})[nama] = kernel
+
+
+def method_label(metode) -> str:
+    return METHODS[metode]["label"]
+
+
+register_method(
+    "efektif",
+    {"numpy": _efektif_numpy, "python": _efektif_python, "rupiah": _efektif_rupiah},
+    label="effective p.a",
+    penjelasan=penjelasan_anuitas,
+)
+# Flat: pokok dicicil rata; bunga flat per bulan konstan. Penyesuaian
+# prorata periode pertama ditaruh ke POKOK bulan 1 dan dikembalikan lewat
+# BUNGA bulan n.
+register_method(
+    "flat",
+    {"numpy": _flat_numpy, "python": _flat_python, "rupiah": _flat_rupiah},
+    label="flat p.a",
+    bulan=_bulan_flat,
+)
+register_method(
+    "flat_rata",
+    {
+        "numpy": _flat_rata_numpy,
+        "python": _flat_rata_python,
+        "rupiah": _flat_rata_rupiah,
+    },
+    label="flat p.a",
+)
+
+
+def build_schedule(
+    pokok: float,
+    bunga_tahunan: float,
+    tenor: int,
+    metode: str,
+    start_date: datetime,
+    first_due_date: datetime,
+    engine: str = None,
+):
+    """Jadwal angsuran sebagai `ScheduleResult` yang tabelnya DataFrame.
+
+    `df, penjelasan, summary = build_schedule(...)` tetap bisa dipakai;
+    pandas baru di-import saat DataFrame pertama kali diakses.
+    """
+    hasil = compute_schedule(
+        pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, engine
+    )
+    hasil.tabel = "frame"
+    return hasil
+
+
+def compute_schedule(
+    pokok: float,
+    bunga_tahunan: float,
+    tenor: int,
+    metode: str,
+    start_date: datetime,
+    first_due_date: datetime,
+    engine: str = None,
+):
+    """Inti `build_schedule` tanpa pandas.
+
+    Mengembalikan `ScheduleResult`; di-unpack menjadi (kolom, penjelasan,
+    summary) dengan `kolom` dict nama kolom (lihat KOLOM) → array NumPy /
+    list tanggal, termasuk baris 0.
+    """
+    return compute_methods(
+        pokok, bunga_tahunan, tenor, (metode,), start_date, first_due_date, engine
+    )[metode]
+
+
+def compute_methods(
+    pokok: float,
+    bunga_tahunan: float,
+    tenor: int,
+    metodes,
+    start_date: datetime,
+    first_due_date: datetime,
+    engine: str = None,
+) -> dict:
+    """{metode: ScheduleResult} untuk beberapa metode sekaligus.
+
+    Input yang sama hanya diproses sekali: validasi engine dan semua
+    metode (sebelum kernel mana pun jalan), prorata, dan kolom
+    Bulan/Tanggal (list tanggal yang sama dipakai bersama oleh metode
+    dengan nomor bulan yang sama). Per metode tinggal kernel dan
+    ADJUSTMENT-nya, jadi perbandingan beberapa metode hampir semurah satu
+    jadwal.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError("Engine tidak dikenal")
+    metodes = tuple(metodes)
+    for metode in metodes:
+        if metode not in ENGINES[engine]:
+            raise ValueError("Metode tidak dikenal")
+
+    # --- bunga prorata untuk periode pertama ---
+    selisih_hari = selisih_hari_prorata(start_date, first_due_date)
+
+    kolom_tanggal = {}  # nomor bulan → (kolom Bulan, kolom Tanggal)
+    return {
+        metode: _hitung(
+            (pokok, bunga_tahunan, tenor, metode, start_date, first_due_date),
+            engine,
+            selisih_hari,
+            kolom_tanggal,
+        )
+        for metode in metodes
+    }
+
+
+def _hitung(params, engine, selisih_hari, kolom_tanggal):
+    """Kernel + ADJUSTMENT satu metode sebagai `ScheduleResult`.
+
+    Engine dan metode sudah divalidasi `compute_methods`. Tanggal,
+    penjelasan dan DataFrame belum dibuat.
+    """
+    pokok, bunga_tahunan, tenor, metode = params[:4]
+
+    # ----------------------
+    # PERHITUNGAN ANGSURAN
+    # ----------------------
+    with stage("kernel"):
+        kolom = ENGINES[engine][metode](pokok, bunga_tahunan, tenor, selisih_hari)
+    bulan = METHODS[metode]["bulan"](tenor)
+
+    if engine in ENGINE_EKSAK:
+        # Semua sel sudah rupiah bulat dan sisa akhir 0: tidak ada residu
+        # yang perlu dipindah, jadi ADJUSTMENT 1 dan 2 tidak diperlukan.
+        angsuran_pokok, bunga, total, sisa = kolom
+        summary = {
+            "total_pokok": int(angsuran_pokok.sum()),
+            "total_bunga": int(bunga.sum()),
+            "total_angsuran": int(total.sum()),
+        }
+        nol, sisa_awal = 0, rupiah_round(pokok)
+    else:
+        angsuran_pokok, bunga, total, sisa = (
+            np.array(c, dtype=np.float64) for c in kolom
+        )
+        with stage("adjustment"):
+            summary = _rekonsiliasi(pokok, angsuran_pokok, bunga, total, sisa)
+        nol, sisa_awal = 0.0, float(rupiah_round(pokok))
+
+    nilai = (
+        np.concatenate(([nol], angsuran_pokok)),
+        np.concatenate(([nol], bunga)),
+        np.concatenate(([nol], total)),
+        np.concatenate(([sisa_awal], sisa)),
+    )
+    return ScheduleResult(params, selisih_hari, bulan, nilai, summary, kolom_tanggal)
+
+
+def _rekonsiliasi(pokok, angsuran_pokok, bunga, total, sisa) -> dict:
+    """ADJUSTMENT 1 dan 2 (in-place pada kolom float).
+
+    Mengembalikan total_bunga dan total_angsuran rounded; total_pokok
+    dihitung `ScheduleResult.summary` bila dibutuhkan.
+    """
+    # ==========================================================
+    # ADJUSTMENT 1: Sisa pokok dibulatkan ke bunga terakhir
+    # ==========================================================
+    residu_pokok = sisa[-1]
+    if abs(residu_pokok) > 0.000001:
+        bunga[-1] += residu_pokok
+        total[-1] += residu_pokok
+        sisa[-1] = 0.0
+
+    # ==========================================================
+    # ADJUSTMENT 2: Sesuaikan agar konsisten dengan Excel rounding
+    # ==========================================================
+    total_angsuran_rounded = int(rupiah_round_array(total).sum())
+    total_bunga_rounded = int(rupiah_round_array(bunga).sum())
+    target_bunga = total_angsuran_rounded - rupiah_round(pokok)
+    selisih = target_bunga - total_bunga_rounded
+
+    if selisih != 0:
+        # Hanya sel terakhir yang berubah: jumlah rounded cukup dikoreksi
+        # selisih pembulatan sel itu, tanpa membulatkan ulang seluruh kolom
+        total_bunga_rounded -= rupiah_round(bunga[-1])
+        total_angsuran_rounded -= rupiah_round(total[-1])
+        bunga[-1] += selisih
+        total[-1] += selisih
+        total_bunga_rounded += rupiah_round(bunga[-1])
+        total_angsuran_rounded += rupiah_round(total[-1])
+        # Sisa Pokok tetap 0
+
+    # ----------------------
+    # Summary (pakai angka rounded)
+    # ----------------------
+    return {
+        "total_bunga": total_bunga_rounded,
+        "total_angsuran": total_angsuran_rounded,
+    }
+
+
+class _memo:
+    """Seperti `functools.cached_property`, tanpa lock bersama antar objek
+    (di Python 3.11 lock itu menyerialkan akses pertama semua objek).
+    Hasil disimpan di `__dict__` objek; bila dua thread menghitung
+    bersamaan, hasilnya sama dan salah satunya dipakai."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.nama = fn.__name__
+        self.__doc__ = fn.__doc__
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        nilai = obj.__dict__[self.nama] = self.fn(obj)
+        return nilai
+
+
+# ==========================================================
+# HASIL MALAS: angka dihitung sekali; tabel, penjelasan, summary dan
+# tampilan terformat baru dibuat saat pertama dipakai.
+# ==========================================================
+class ScheduleResult:
+    """Hasil `compute_schedule` / `build_schedule`.
+
+    Kolom nilai (`values`) sudah dihitung; kolom Tanggal (`columns`),
+    `penjelasan`, `summary`, `frame` (DataFrame) dan `formatted_summary`
+    dibuat saat pertama diakses lalu disimpan di objek. Baris terformat
+    (`iter_formatted_rows`) tidak disimpan. Iterasi memberi (tabel, penjelasan, summary) seperti tuple
+    lama, dengan tabel = `columns` atau `frame` (lihat `tabel`).
+
+    Objek ini dipakai bersama lewat cache: jangan ubah array-nya.
+    """
+
+    def __init__(
+        self, params, selisih_hari, bulan, nilai, summary, kolom_tanggal=None
+    ):
+        # (pokok, bunga_tahunan, tenor, metode, start_date, first_due_date)
+        self.params = params
+        self.metode = params[3]
+        self.selisih_hari = selisih_hari
+        self.bulan = bulan  # nomor bulan 1..n (tanpa baris 0)
+        self.nilai = nilai  # 4 kolom nilai termasuk baris 0
+        self.tabel = "columns"
+        self._kolom_tanggal = {} if kolom_tanggal is None else kolom_tanggal
+        if "total_pokok" in summary:
+            self.__dict__["summary"] = summary
+        else:
+            self._jumlah = summary
+
+    @_memo
+    def values(self) -> dict:
+        """Kolom nilai (tanpa Bulan/Tanggal) sebagai dict nama → array."""
+        return dict(zip(KOLOM[2:], self.nilai))
+
+    @_memo
+    def columns(self) -> dict:
+        """Dict kolom lengkap (lihat KOLOM), termasuk baris 0."""
+        kunci = self.bulan.tobytes()
+        if kunci not in self._kolom_tanggal:
+            _, _, tenor, _, start_date, first_due_date = self.params
+            with stage("dates"):
+                jatuh_tempo = due_date_strings(first_due_date, tenor)
+                tanggal = [start_date.strftime("%d %b %Y")] + [
+                    jatuh_tempo[b - 1] for b in self.bulan.tolist()
+                ]
+            self._kolom_tanggal[kunci] = (
+                np.concatenate(([0], self.bulan)).astype(np.int64),
+                tanggal,
+            )
+        kolom = dict(zip(KOLOM[:2], self._kolom_tanggal[kunci]))
+        kolom.update(self.values)
+        return kolom
+
+    @_memo
+    def penjelasan(self) -> str:
+        buat = METHODS[self.metode]["penjelasan"]
+        if buat is None:
+            return ""
+        pokok, bunga_tahunan, tenor = self.params[:3]
+        return buat(pokok, bunga_tahunan, tenor, self.selisih_hari)
+
+    @_memo
+    def summary(self) -> dict:
+        return {
+            "total_pokok": int(rupiah_round_array(self.nilai[0]).sum()),
+            **self._jumlah,
+        }
+
+    @_memo
+    def frame(self):
+        """Tabel sebagai DataFrame (pandas di-import di sini)."""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns, columns=KOLOM)
+
+    def iter_formatted_rows(self):
+        """Generator baris tabel siap tampil (angka gaya Indonesia).
+
+        Tidak disimpan: string per baris jauh lebih besar dari array-nya,
+        dan halaman hasil memformat baris sambil di-stream.
+        """
+        kolom = self.columns
+        baris = zip(
+            kolom["Bulan"].tolist(),
+            kolom["Tanggal"],
+            *(c.tolist() for c in self.nilai),
+        )
+        for bulan, tanggal, pokok, bunga, total, sisa in baris:
+            yield bulan, tanggal, fmt(pokok), fmt(bunga), fmt(total), fmt(sisa)
+
+    @_memo
+    def formatted_summary(self) -> dict:
+        return {k: fmt(v) for k, v in self.summary.items()}
+
+    def __iter__(self):
+        yield getattr(self, self.tabel)
+        yield self.penjelasan
+        yield self.summary
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, i):
+        return (getattr(self, self.tabel), self.penjelasan, self.summary)[i]
+
+    def __repr__(self):
+        return f"ScheduleResult(metode={self.metode!r}, tenor={self.params[2]})"
+
+
+# ==========================================================
+# JADWAL RINGKAS: kolom array bertipe, untuk menyimpan banyak jadwal
+# (satu portofolio) di memori. String baru dibuat saat dirender.
+# ==========================================================
+class ScheduleRow:
+    """View satu baris `Schedule`; nilainya dibaca langsung dari array."""
+
+    __slots__ = ("_jadwal", "_i")
+
+    def __init__(self, jadwal, i):
+        self._jadwal = jadwal
+        self._i = i
+
+    @property
+    def bulan(self) -> int:
+        return int(self._jadwal.bulan[self._i])
+
+    @property
+    def tanggal(self):
+        return self._jadwal.tanggal[self._i].item()
+
+    @property
+    def angsuran_pokok(self):
+        return self._jadwal.angsuran_pokok[self._i].item()
+
+    @property
+    def bunga(self):
+        return self._jadwal.bunga[self._i].item()
+
+    @property
+    def total_angsuran(self):
+        return self._jadwal.total_angsuran[self._i].item()
+
+    @property
+    def sisa_pokok(self):
+        return self._jadwal.sisa_pokok[self._i].item()
+
+    def formatted(self) -> tuple:
+        """Baris siap tampil, sama dengan tabel hasil di halaman."""
+        return (
+            self.bulan,
+            format_dates(self._jadwal.tanggal[self._i : self._i + 1])[0],
+            fmt(self.angsuran_pokok),
+            fmt(self.bunga),
+            fmt(self.total_angsuran),
+            fmt(self.sisa_pokok),
+        )
+
+    def __repr__(self):
+        return f"ScheduleRow(bulan={self.bulan}, tanggal={self.tanggal})"
+
+
+class Schedule:
+    """Jadwal satu pinjaman dalam bentuk kolom bertipe (baris 0 = pencairan).
+
+    Bulan int32, tanggal datetime64[D], nilai float64 (int64 untuk engine
+    rupiah). Total kolom dan summary dihitung sekali saat dibuat. Pakai
+    `Schedule.compute(...)`; `columns()` memberi dict yang sama dengan
+    `compute_schedule` untuk renderer yang sudah ada.
+    """
+
+    __slots__ = (
+        "bulan",
+        "tanggal",
+        "angsuran_pokok",
+        "bunga",
+        "total_angsuran",
+        "sisa_pokok",
+        "summary",
+        "totals",
+    )
+
+    def __init__(
+        self, bulan, tanggal, angsuran_pokok, bunga, total_angsuran, sisa_pokok, summary
+    ):
+        self.bulan = np.asarray(bulan, dtype=np.int32)
+        self.tanggal = np.asarray(tanggal, dtype="datetime64[D]")
+        self.angsuran_pokok = angsuran_pokok
+        self.bunga = bunga
+        self.total_angsuran = total_angsuran
+        self.sisa_pokok = sisa_pokok
+        self.summary = summary
+        # Jumlah mentah per kolom (baris Total di tabel)
+        self.totals = {
+            "angsuran_pokok": angsuran_pokok.sum().item(),
+            "bunga": bunga.sum().item(),
+            "total_angsuran": total_angsuran.sum().item(),
+        }
+
+    @classmethod
+    def compute(
+        cls,
+        pokok: float,
+        bunga_tahunan: float,
+        tenor: int,
+        metode: str,
+        start_date: datetime,
+        first_due_date: datetime,
+        engine: str = None,
+    ):
+        # Tanggal dibuat sendiri sebagai datetime64; kolom Tanggal string di
+        # hasil tidak pernah diakses
+        hasil = compute_schedule(
+            pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, engine
+        )
+        tanggal = np.concatenate(
+            (
+                [np.datetime64(start_date.date(), "D")],
+                due_dates(first_due_date, tenor)[hasil.bulan - 1],
+            )
+        )
+        return cls(
+            np.concatenate(([0], hasil.bulan)), tanggal, *hasil.nilai, hasil.summary
+        )
+
+    def __len__(self):
+        return len(self.bulan)
+
+    def __getitem__(self, i) -> ScheduleRow:
+        n = len(self.bulan)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("Baris di luar jadwal")
+        return ScheduleRow(self, i)
+
+    def __iter__(self):
+        return (ScheduleRow(self, i) for i in range(len(self.bulan)))
+
+    @property
+    def nbytes(self) -> int:
+        """Ukuran data kolom (tanpa overhead objek Python)."""
+        return sum(
+            getattr(self, k).nbytes
+            for k in (
+                "bulan",
+                "tanggal",
+                "angsuran_pokok",
+                "bunga",
+                "total_angsuran",
+                "sisa_pokok",
+            )
+        )
+
+    def columns(self) -> dict:
+        """Dict kolom seperti `compute_schedule` (tanggal diformat sekarang)."""
+        return {
+            "Bulan": self.bulan.astype(np.int64),
+            "Tanggal": format_dates(self.tanggal),
+            "Angsuran Pokok": self.angsuran_pokok,
+            "Bunga": self.bunga,
+            "Total Angsuran": self.total_angsuran,
+            "Sisa Pokok": self.sisa_pokok,
+        }
@@ -0,0 +1,458 @@
+import hashlib
+import json
+import os
+import shutil
+from itertools import islice
+
+import numpy as np
+
+from api import API_VERSION
+from bulk import map_chunks, parse_loan
+from cache import schedule_key
+from schedule import Schedule
+
+# Pinjaman per part; writer hanya menahan satu part di memori
+PART_LOANS = 5000
+FORMAT_VERSION = 1
+
+# Kolom per baris jadwal (panjang = jumlah baris semua pinjaman di part)
+_BARIS = {
+    "bulan": np.int32,
+    "tanggal": "datetime64[D]",
+    "angsuran_pokok": np.float64,
+    "bunga": np.float64,
+    "total_angsuran": np.float64,
+    "sisa_pokok": np.float64,
+}
+_SUMMARY = ("total_pokok", "total_bunga", "total_angsuran")
+
+
+def store_key(key: tuple) -> bytes:
+    """Kunci 16 byte dari tuple `cache.schedule_key`."""
+    return hashlib.sha256(repr(key).encode()).digest()[:16]
+
+
+def _loan_store_key(loan) -> bytes:
+    return store_key(
+        schedule_key(
+            loan["pokok"],
+            loan["bunga_tahunan"],
+            loan["tenor"],
+            loan["metode"],
+            loan["start_date"],
+            loan["first_due_date"],
+            loan["engine"],
+        )
+    )
+
+
+class BookWriter:
+    """Tulis banyak jadwal ke direktori "book" kolumnar (file .npy per kolom).
+
+    Layout::
+
+        <path>/meta.json
+        <path>/part-00000/offsets.npy    awal baris tiap pinjaman (n+1)
+        <path>/part-00000/bulan.npy ...  kolom baris (lihat _BARIS)
+        <path>/part-00000/key.npy ...    kolom per pinjaman (kunci,
+                                         summary_*, parameter, nama customer)
+
+    Ditulis ke direktori sementara lalu di-rename saat `close()`, jadi
+    pembaca tidak pernah melihat book setengah jadi. meta.json mencatat
+    `output_version` (`api.API_VERSION` saat jadwal dihitung).
+    """
+
+    def __init__(
+        self, path: str, part_loans: int = PART_LOANS, output_version=API_VERSION
+    ):
+        self.path = path
+        self.part_loans = part_loans
+        self.output_version = output_version
+        self._tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        os.makedirs(self._tmp)
+        self._parts = []
+        self._buffer = []
+        self.meta = None
+
+    def add(self, loan, jadwal: Schedule, key: bytes = None):
+        """`loan` dari `parse_loan`, `jadwal` hasil `Schedule.compute`.
+
+        `key` menggantikan kunci dari parameter loan, untuk jadwal yang
+        bukan hasil hitung langsung dari parameternya (mis. hasil repricing)
+        atau yang disalin dari book lain.
+        """
+        self._buffer.append((loan, jadwal, key))
+        if len(self._buffer) >= self.part_loans:
+            self._flush()
+
+    def _folder_baru(self):
+        folder = os.path.join(self._tmp, f"part-{len(self._parts):05d}")
+        os.makedirs(folder)
+        return folder
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        loans = [loan for loan, _, _ in self._buffer]
+        jadwal = [j for _, j, _ in self._buffer]
+        folder = self._folder_baru()
+
+        def simpan(nama, array):
+            np.save(os.path.join(folder, nama + ".npy"), array, allow_pickle=False)
+
+        panjang = np.fromiter((len(j) for j in jadwal), np.int64, len(jadwal))
+        simpan("offsets", np.concatenate(([0], np.cumsum(panjang))))
+        for nama, dtype in _BARIS.items():
+            kolom = np.concatenate([getattr(j, nama) for j in jadwal])
+            simpan(nama, kolom.astype(dtype, copy=False))
+        # Engine rupiah menyimpan nilai int64; dikembalikan saat dibaca
+        simpan("eksak", np.array([j.bunga.dtype.kind == "i" for j in jadwal]))
+        for nama in _SUMMARY:
+            simpan(
+                "summary_" + nama,
+                np.array([j.summary[nama] for j in jadwal], dtype=np.int64),
+            )
+
+        key = np.array(
+            [k or _loan_store_key(loan) for loan, _, k in self._buffer], dtype="S16"
+        )
+        simpan("key", key)
+        simpan("key_order", np.argsort(key, kind="stable"))
+        simpan("pokok", np.array([loan["pokok"] for loan in loans], dtype=np.float64))
+        simpan(
+            "bunga_tahunan",
+            np.array([loan["bunga_tahunan"] for loan in loans], dtype=np.float64),
+        )
+        simpan("tenor", np.array([loan["tenor"] for loan in loans], dtype=np.int32))
+        simpan("metode", np.array([loan["metode"] for loan in loans], dtype="S"))
+        simpan(
+            "namecstm",
+            np.array([loan["namecstm"].encode() for loan in loans], dtype="S"),
+        )
+
+        self._parts.append({"loans": len(jadwal), "rows": int(panjang.sum())})
+        self._buffer = []
+
+    def copy_part(self, part, updates=()):
+        """Salin satu part dari book lain, mengganti sebagian pinjamannya.
+
+        `updates` = [(j, loan, Schedule, key)] dengan j indeks di part;
+        jadwal pengganti harus punya jumlah baris yang sama, jadi kolom
+        cukup ditimpa di tempat. Part tanpa perubahan di-hardlink (file
+        book tidak pernah diubah setelah ditulis).
+        """
+        self._flush()
+        folder = self._folder_baru()
+        files = [nama for nama in os.listdir(part.folder) if nama.endswith(".npy")]
+        if not updates:
+            for nama in files:
+                try:
+                    os.link(os.path.join(part.folder, nama), os.path.join(folder, nama))
+                except OSError:
+                    shutil.copyfile(
+                        os.path.join(part.folder, nama), os.path.join(folder, nama)
+                    )
+        else:
+            kolom = {nama[:-4]: np.array(part[nama[:-4]]) for nama in files}
+            offsets = kolom["offsets"]
+            teks = {nama: kolom[nama].tolist() for nama in ("metode", "namecstm")}
+            for j, loan, jadwal, key in updates:
+                awal, akhir = offsets[j], offsets[j + 1]
+                if len(jadwal) != akhir - awal:
+                    raise ValueError("Jumlah baris jadwal pengganti berbeda")
+                for nama in _BARIS:
+                    kolom[nama][awal:akhir] = getattr(jadwal, nama)
+                kolom["eksak"][j] = jadwal.bunga.dtype.kind == "i"
+                for nama in _SUMMARY:
+                    kolom["summary_" + nama][j] = jadwal.summary[nama]
+                kolom["key"][j] = key or _loan_store_key(loan)
+                for nama in ("pokok", "bunga_tahunan", "tenor"):
+                    kolom[nama][j] = loan[nama]
+                teks["metode"][j] = loan["metode"].encode()
+                teks["namecstm"][j] = loan["namecstm"].encode()
+            for nama, nilai in teks.items():
+                kolom[nama] = np.array(nilai, dtype="S")
+            kolom["key_order"] = np.argsort(kolom["key"], kind="stable")
+            for nama, array in kolom.items():
+                np.save(os.path.join(folder, nama + ".npy"), array, allow_pickle=False)
+        self._parts.append({"loans": part.loans, "rows": int(part["offsets"][-1])})
+
+    def close(self):
+        self._flush()
+        self.meta = {
+            "version": FORMAT_VERSION,
+            "output_version": self.output_version,
+            "loans": sum(p["loans"] for p in self._parts),
+            "parts": self._parts,
+        }
+        with open(os.path.join(self._tmp, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+
+        lama = f"{self.path}.old-{os.getpid()}"
+        if os.path.exists(self.path):
+            os.rename(self.path, lama)
+        os.rename(self._tmp, self.path)
+        shutil.rmtree(lama, ignore_errors=True)
+        return self.meta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class _Part:
+    """Satu part book; setiap kolom dibuka malas dengan mmap (read-only)."""
+
+    def __init__(self, folder, loans):
+        self.folder = folder
+        self.loans = loans
+        self._kolom = {}
+
+    def __getitem__(self, nama):
+        array = self._kolom.get(nama)
+        if array is None:
+            path = os.path.join(self.folder, nama + ".npy")
+            # View ndarray biasa (tetap ke mmap yang sama): slicing subclass
+            # np.memmap jauh lebih lambat dan dilakukan per pinjaman
+            array = np.load(path, mmap_mode="r").view(np.ndarray)
+            self._kolom[nama] = array
+        return array
+
+    def find(self, key: bytes):
+        keys, urut = self["key"], self["key_order"]
+        # Dtype S membuang byte nol di akhir saat dibaca; kunci dibandingkan
+        # dalam bentuk yang sama
+        key = key.rstrip(b"\0")
+        pos = np.searchsorted(keys, np.bytes_(key), sorter=urut)
+        if pos < len(urut) and keys[urut[pos]] == key:
+            return int(urut[pos])
+        return None
+
+    def schedule(self, i) -> Schedule:
+        awal, akhir = self["offsets"][i : i + 2]
+        nilai = [
+            self[nama][awal:akhir]
+            for nama in ("angsuran_pokok", "bunga", "total_angsuran", "sisa_pokok")
+        ]
+        if self["eksak"][i]:
+            nilai = [v.astype(np.int64) for v in nilai]
+        summary = {nama: int(self["summary_" + nama][i]) for nama in _SUMMARY}
+        return Schedule(
+            self["bulan"][awal:akhir], self["tanggal"][awal:akhir], *nilai, summary
+        )
+
+
+class Book:
+    """Book hasil `BookWriter`, dibuka dengan memory-mapping.
+
+    Membuka book hanya membaca meta.json; kolom di-mmap saat pertama
+    dipakai dan jadwal yang diambil adalah view ke file (tanpa salinan,
+    kecuali nilai engine rupiah yang dikembalikan ke int64).
+
+    `stale` True bila book dihitung dengan versi output lain (atau sebelum
+    versi dicatat); angkanya mungkin tidak sama dengan hitungan sekarang.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError("Versi book tidak didukung")
+        self._parts = [
+            _Part(os.path.join(path, f"part-{i:05d}"), p["loans"])
+            for i, p in enumerate(self.meta["parts"])
+        ]
+        self._awal = np.cumsum([0] + [p["loans"] for p in self.meta["parts"]])
+
+    def __len__(self):
+        return self.meta["loans"]
+
+    @property
+    def output_version(self):
+        return self.meta.get("output_version")
+
+    @property
+    def stale(self) -> bool:
+        return self.output_version != API_VERSION
+
+    def _lokasi(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Pinjaman di luar book")
+        part = int(np.searchsorted(self._awal, i, side="right")) - 1
+        return self._parts[part], i - int(self._awal[part])
+
+    def __getitem__(self, i) -> Schedule:
+        part, j = self._lokasi(i)
+        return part.schedule(j)
+
+    def __iter__(self):
+        for part in self._parts:
+            for j in range(part.loans):
+                yield part.schedule(j)
+
+    def loan(self, i) -> dict:
+        """Parameter pinjaman ke-i (pokok, bunga_tahunan, tenor, metode, namecstm)."""
+        part, j = self._lokasi(i)
+        return {
+            "pokok": float(part["pokok"][j]),
+            "bunga_tahunan": float(part["bunga_tahunan"][j]),
+            "tenor": int(part["tenor"][j]),
+            "metode": part["metode"][j].decode(),
+            "namecstm": part["namecstm"][j].decode(),
+        }
+
+    def key(self, i) -> bytes:
+        """Kunci `store_key` pinjaman ke-i."""
+        part, j = self._lokasi(i)
+        return bytes(part["key"][j]).ljust(16, b"\0")
+
+    def find(self, loan):
+        """Jadwal untuk parameter `loan` (dict `parse_loan`), atau None."""
+        return self.get(_loan_store_key(loan))
+
+    def get(self, key: bytes):
+        """Jadwal untuk kunci `store_key`, atau None."""
+        for part in self._parts:
+            j = part.find(key)
+            if j is not None:
+                return part.schedule(j)
+        return None
+
+    def cashflow(self):
+        """`CashflowProjection` seluruh book, dihitung per part (tanpa
+        membuat objek per pinjaman)."""
+        from cashflow import CashflowProjection
+
+        proyeksi = CashflowProjection()
+        for part in self._parts:
+            # Lewati baris 0 (pencairan) setiap pinjaman
+            angsuran = np.ones(len(part["bulan"]), dtype=bool)
+            angsuran[part["offsets"][:-1]] = False
+            proyeksi.add_rows(
+                *(
+                    part[nama][angsuran]
+                    for nama in ("tanggal", "angsuran_pokok", "bunga", "total_angsuran")
+                )
+            )
+            proyeksi.loans += part.loans
+        return proyeksi
+
+    def write_updated(self, path: str, updates) -> dict:
+        """Salin book ke `path` dengan sebagian pinjaman diganti.
+
+        `updates`: iterable (i, loan, Schedule, key) urut menurut i, dengan
+        jumlah baris tiap jadwal sama seperti aslinya (lihat
+        `BookWriter.copy_part`). Kembalikan meta book baru.
+        """
+        updates = iter(updates)
+        berikut = next(updates, None)
+        # Part tanpa perubahan disalin apa adanya, jadi versi output ikut
+        # book sumber
+        with BookWriter(path, output_version=self.output_version) as writer:
+            for p, part in enumerate(self._parts):
+                akhir = int(self._awal[p + 1])
+                daftar = []
+                while berikut is not None and berikut[0] < akhir:
+                    i, loan, jadwal, key = berikut
+                    daftar.append((i - int(self._awal[p]), loan, jadwal, key))
+                    berikut = next(updates, None)
+                writer.copy_part(part, daftar)
+        return writer.meta
+
+    def positions(self, tanggal) -> dict:
+        """Posisi setiap pinjaman per `tanggal`, dihitung vektor per part.
+
+        Array sepanjang book:
+          next_month   bulan angsuran pertama yang jatuh tempo ≥ tanggal
+                       (0 = semua angsuran sudah lewat)
+          next_due     tanggal jatuh tempo bulan itu (NaT bila lunas)
+          outstanding  sisa pokok sebelum bulan itu
+          remaining    jumlah bulan tersisa termasuk bulan itu
+        """
+        batas = np.datetime64(tanggal, "D")
+        hasil = {"next_month": [], "next_due": [], "outstanding": [], "remaining": []}
+        for part in self._parts:
+            awal, akhir = part["offsets"][:-1], part["offsets"][1:]
+            jatuh_tempo = part["tanggal"] >= batas
+            jatuh_tempo[awal] = False  # baris 0 = pencairan
+            # Baris pertama yang jatuh tempo di setiap pinjaman
+            idx = np.flatnonzero(jatuh_tempo)
+            pos = np.searchsorted(idx, awal)
+            baris = idx[np.minimum(pos, len(idx) - 1)] if len(idx) else awal
+            ada = (pos < len(idx)) & (baris < akhir)
+            baris = np.where(ada, baris, awal)
+
+            bulan = np.where(ada, part["bulan"][baris], 0)
+            hasil["next_month"].append(bulan)
+            hasil["next_due"].append(
+                np.where(ada, part["tanggal"][baris], np.datetime64("NaT", "D"))
+            )
+            hasil["outstanding"].append(
+                np.where(ada, part["sisa_pokok"][np.maximum(baris - 1, 0)], 0.0)
+            )
+            hasil["remaining"].append(np.where(ada, part["tenor"] - bulan + 1, 0))
+        return {nama: np.concatenate(v) for nama, v in hasil.items()}
+
+    def column(self, nama) -> np.ndarray:
+        """Satu kolom per pinjaman untuk seluruh book: field summary
+        (total_pokok, ...) atau parameter (pokok, tenor, ...)."""
+        if nama in _SUMMARY:
+            nama = "summary_" + nama
+        if len(self._parts) == 1:
+            return self._parts[0][nama]
+        return np.concatenate([part[nama] for part in self._parts])
+
+
+def write_book(path: str, items, part_loans: int = PART_LOANS) -> dict:
+    """Tulis iterable (loan, Schedule) ke book; kembalikan meta-nya."""
+    with BookWriter(path, part_loans) as writer:
+        for loan, jadwal in items:
+            writer.add(loan, jadwal)
+    return writer.meta
+
+
+def _hitung_potongan(items):
+    hasil, errors = [], []
+    for idx, raw in items:
+        try:
+            loan = parse_loan(raw)
+            jadwal = Schedule.compute(
+                loan["pokok"],
+                loan["bunga_tahunan"],
+                loan["tenor"],
+                loan["metode"],
+                loan["start_date"],
+                loan["first_due_date"],
+                engine=loan["engine"],
+            )
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            errors.append((idx, f"{type(e).__name__}: {e}"))
+            continue
+        hasil.append((loan, jadwal))
+    return hasil, errors
+
+
+def build_book(path: str, loans, chunk: int = 2000) -> dict:
+    """Hitung jadwal iterable pinjaman mentah (paralel) lalu tulis ke book.
+
+    Pinjaman yang gagal di-parse/dihitung dilewati dan dilaporkan di
+    `errors` pada meta yang dikembalikan.
+    """
+    it = enumerate(loans)
+    potongan = iter(lambda: list(islice(it, chunk)), [])
+    errors = []
+    with BookWriter(path) as writer:
+        for hasil, gagal in map_chunks(_hitung_potongan, potongan):
+            for loan, jadwal in hasil:
+                writer.add(loan, jadwal)
+            errors.extend(gagal)
+    return dict(writer.meta, errors=errors)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modul aplikasi ada di root repo (tanpa package), sama seperti tools/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Secret tetap untuk link export bertanda tangan di test
+os.environ.setdefault("SECRET_KEY", "test-secret")
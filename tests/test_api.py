@@ -0,0 +1,58 @@
+import pytest
+
+import api
+import app
+
+PARAMS = dict(
+    pokok="100.000.000",
+    bunga="12",
+    tenor="24",
+    metode="efektif",
+    start_date="2024-01-10",
+    first_due_date="2024-02-10",
+)
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_etag_kuat_dan_304(client, monkeypatch):
+    resp = client.get("/api/schedule", query_string=PARAMS)
+    assert resp.status_code == 200
+    etag, lemah = resp.get_etag()
+    assert etag and not lemah
+    assert resp.cache_control.public and resp.cache_control.max_age == 86400
+    assert len(resp.get_json()["rows"]) == 25
+
+    # 304 dijawab dari parameter saja, tanpa menghitung jadwal
+    monkeypatch.setattr(app, "cached_schedule", None)
+    resp = client.get(
+        "/api/schedule", query_string=PARAMS, headers={"If-None-Match": f'"{etag}"'}
+    )
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.get_etag() == (etag, False)
+
+
+def test_etag_ikut_parameter_dan_versi(client, monkeypatch):
+    etag = client.get("/api/schedule", query_string=PARAMS).get_etag()[0]
+    # POST JSON dengan parameter yang sama → representasi yang sama
+    assert client.post("/api/schedule", json=PARAMS).get_etag()[0] == etag
+    lain = client.get("/api/schedule", query_string=dict(PARAMS, tenor="36"))
+    assert lain.get_etag()[0] != etag
+
+    monkeypatch.setattr(api, "API_VERSION", "uji")
+    resp = client.get(
+        "/api/schedule", query_string=PARAMS, headers={"If-None-Match": f'"{etag}"'}
+    )
+    assert resp.status_code == 200
+    assert resp.get_etag()[0] != etag
+
+
+def test_tanpa_start_date_tidak_di_cache_publik(client):
+    params = {k: v for k, v in PARAMS.items() if k != "start_date"}
+    resp = client.get("/api/schedule", query_string=params)
+    assert resp.status_code == 200
+    assert resp.cache_control.no_cache and not resp.cache_control.public
@@ -0,0 +1,62 @@
+import pytest
+
+import app
+from bulk import parse_loan, run_bulk
+from schedule import MAX_TENOR
+
+PINJAMAN = dict(
+    namecstm="A",
+    pokok="10.000.000",
+    bunga="12",
+    tenor="12",
+    metode="efektif",
+    start_date="2024-01-10",
+    first_due_date="2024-02-10",
+)
+TIDAK_VALID = [
+    {"tenor": "0"},
+    {"tenor": "-3"},
+    {"tenor": "601"},
+    {"tenor": "2000000000"},
+    {"pokok": "0"},
+    {"pokok": "-5000000"},
+    {"pokok": "nan"},
+    {"bunga": "inf"},
+]
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("ubah", TIDAK_VALID)
+def test_parse_loan_menolak_input_tidak_valid(ubah):
+    with pytest.raises(ValueError):
+        parse_loan(dict(PINJAMAN, **ubah))
+
+
+@pytest.mark.parametrize("ubah", TIDAK_VALID)
+def test_route_satu_pinjaman_400(client, ubah):
+    data = dict(PINJAMAN, **ubah)
+    assert client.get("/api/schedule", query_string=data).status_code == 400
+    assert client.post("/", data=data).status_code == 400
+
+
+def test_bulk_baris_tidak_valid_jadi_error():
+    hasil = run_bulk([PINJAMAN, dict(PINJAMAN, tenor="-3"), dict(PINJAMAN, pokok="0")])
+    assert "error" not in hasil[0]
+    assert hasil[1]["error"].startswith("ValueError")
+    assert hasil[2]["error"].startswith("ValueError")
+
+
+def test_parse_loan_tenor_maksimal():
+    assert parse_loan(dict(PINJAMAN, tenor=str(MAX_TENOR)))["tenor"] == MAX_TENOR
+    with pytest.raises(ValueError, match="maksimal"):
+        parse_loan(dict(PINJAMAN, tenor=str(MAX_TENOR + 1)))
+
+
+def test_bulk_tenor_terlalu_panjang_jadi_error(client):
+    resp = client.post("/bulk_schedule", json=[dict(PINJAMAN, tenor="100000000")])
+    assert resp.status_code == 200
+    assert resp.get_json()["results"][0]["error"].startswith("ValueError")
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+
+import cache
+from cache import ScheduleCache, cached_schedule, schedule_cache
+
+MULAI, JATUH_TEMPO = datetime(2024, 1, 10), datetime(2024, 2, 10)
+
+
+@pytest.fixture
+def jam(monkeypatch):
+    waktu = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: waktu[0])
+    return waktu
+
+
+def test_lru_membuang_yang_paling_lama_tidak_dipakai(jam):
+    c = ScheduleCache(maxsize=2, ttl=60)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1  # "a" jadi paling baru
+    c.put("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "ttl": 60,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_ttl_kedaluwarsa(jam):
+    c = ScheduleCache(maxsize=4, ttl=60)
+    c.put("a", 1)
+    jam[0] += 60
+    assert c.get("a") == 1  # tepat di batas masih berlaku
+    jam[0] += 0.001
+    assert c.get("a") is None
+    assert c.stats()["size"] == 0 and c.stats()["evictions"] == 1
+
+
+def test_cached_schedule_dipakai_bersama(monkeypatch):
+    schedule_cache.clear()
+    dihitung = []
+    asli = cache.compute_schedule
+    monkeypatch.setattr(
+        cache,
+        "compute_schedule",
+        lambda *a, **k: dihitung.append(a) or asli(*a, **k),
+    )
+    a = cached_schedule(1e8, 0.12, 12, "efektif", MULAI, JATUH_TEMPO)
+    # Parameter ternormalisasi: int/float dan engine default = kunci yang sama
+    b = cached_schedule(
+        100_000_000, 0.12, 12.0, "efektif", MULAI, JATUH_TEMPO, cache.DEFAULT_ENGINE
+    )
+    assert a is b and len(dihitung) == 1
+    cached_schedule(1e8, 0.12, 12, "flat", MULAI, JATUH_TEMPO)
+    assert len(dihitung) == 2
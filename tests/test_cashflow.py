@@ -0,0 +1,88 @@
+import numpy as np
+
+from bulk import parse_loan
+from cashflow import CashflowProjection, project_cashflow
+from schedule import Schedule
+
+KUNCI = (
+    "pokok",
+    "bunga_tahunan",
+    "tenor",
+    "metode",
+    "start_date",
+    "first_due_date",
+    "engine",
+)
+
+
+def test_jumlah_per_bulan_eksak_di_atas_2_pangkat_53():
+    proyeksi = CashflowProjection()
+    tanggal = np.array(["2024-02-10", "2024-02-20", "2024-02-25"], "datetime64[D]")
+    besar = np.array([2.0**53, 1.0, 1.0])
+    proyeksi.add_rows(tanggal, besar, besar, besar)
+    proyeksi.add_rows(tanggal[:1], np.ones(1), np.ones(1), np.ones(1))
+    assert proyeksi.pokok.dtype == np.int64
+    assert proyeksi.rows() == [
+        {
+            "bulan": "2024-02",
+            "pokok": 2**53 + 3,
+            "bunga": 2**53 + 3,
+            "total": 2**53 + 3,
+            "angsuran": 4,
+        }
+    ]
+
+
+def _pinjaman(n):
+    metode = ("efektif", "flat", "flat_rata")
+    return [
+        {
+            "pokok": 10_000_000 + 1_234_567 * i,
+            "bunga": 9.5 + i % 4,
+            "tenor": 6 + 7 * i,
+            "metode": metode[i % 3],
+            "start_date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "engine": "rupiah" if i % 5 == 0 else None,
+        }
+        for i in range(n)
+    ]
+
+
+def test_total_sama_dengan_jumlah_summary_pinjaman():
+    loans = _pinjaman(20)
+    loans[3] = dict(loans[3], tenor=0)
+    loans[11] = dict(loans[11], metode="tidak_ada")
+    proyeksi = project_cashflow(loans)
+
+    assert proyeksi.loans == 18 and proyeksi.error_count == 2
+    assert [idx for idx, _ in proyeksi.errors] == [3, 11]
+    harapan = {"pokok": 0, "bunga": 0, "total": 0}
+    angsuran = 0
+    for i, raw in enumerate(loans):
+        if i in (3, 11):
+            continue
+        loan = parse_loan(raw)
+        jadwal = Schedule.compute(*(loan[k] for k in KUNCI))
+        harapan["pokok"] += jadwal.summary["total_pokok"]
+        harapan["bunga"] += jadwal.summary["total_bunga"]
+        harapan["total"] += jadwal.summary["total_angsuran"]
+        angsuran += len(jadwal) - 1
+    assert proyeksi.totals == harapan
+    assert int(proyeksi.angsuran.sum()) == angsuran
+
+
+def test_potongan_digabung_sama_dengan_sekali_hitung(monkeypatch):
+    monkeypatch.setenv("BULK_WORKERS", "1")  # map_chunks tanpa pool
+    loans = _pinjaman(40)
+    sekali = project_cashflow(loans)
+    bertahap = project_cashflow(iter(loans), chunk=7)
+    assert bertahap.rows() == sekali.rows()
+    assert bertahap.loans == sekali.loans == 40
+    bulan = [b["bulan"] for b in sekali.rows()]
+    assert bulan == sorted(bulan) and len(set(bulan)) == len(bulan)
+
+
+def test_proyeksi_kosong():
+    proyeksi = project_cashflow([])
+    assert proyeksi.rows() == []
+    assert proyeksi.totals == {"pokok": 0, "bunga": 0, "total": 0}
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from duedates import _due_date_strings, due_date_strings, due_dates, format_dates
+
+
+def test_akhir_bulan_dipotong_dan_tidak_berantai():
+    hasil = due_dates(date(2024, 1, 31), 5).tolist()
+    assert hasil == [
+        date(2024, 1, 31),
+        date(2024, 2, 29),  # kabisat
+        date(2024, 3, 31),  # kembali ke tanggal asli, bukan 29
+        date(2024, 4, 30),
+        date(2024, 5, 31),
+    ]
+    assert due_dates(datetime(2023, 1, 31, 9, 30), 2).tolist()[1] == date(2023, 2, 28)
+
+
+@pytest.mark.parametrize(
+    "awal", [date(2024, 1, 10), date(2023, 8, 29), date(2024, 10, 31)]
+)
+def test_sama_dengan_relativedelta(awal):
+    harapan = [awal + relativedelta(months=k) for k in range(360)]
+    assert due_dates(awal, 360).tolist() == harapan
+    teks = [d.strftime("%d %b %Y") for d in harapan]
+    assert format_dates(due_dates(awal, 360)) == teks
+
+
+def test_string_di_memo_per_tanggal_dan_tenor():
+    _due_date_strings.cache_clear()
+    a = due_date_strings(datetime(2024, 1, 31), 3)
+    b = due_date_strings(date(2024, 1, 31), 3)
+    assert a is b
+    assert a == ("31 Jan 2024", "29 Feb 2024", "31 Mar 2024")
+    assert _due_date_strings.cache_info().hits == 1
+    assert format_dates(np.array([], "datetime64[D]")) == []
@@ -0,0 +1,93 @@
+import pytest
+
+import app
+import pdfcache
+
+PARAMS = dict(
+    pokok=10_000_000.0,
+    bunga_tahunan=0.12,
+    tenor=12,
+    metode="efektif",
+    start_date="2024-01-10",
+    first_due_date="2024-02-10",
+    namecstm="Budi",
+    engine=None,
+)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.pdf_cache, "directory", str(tmp_path))
+    return app.app.test_client()
+
+
+def _url(params):
+    """Link tanpa versi (bentuk lama); route mengalihkan ke versi sekarang."""
+    return f"/export/{app._export_signer.dumps(params)}.pdf"
+
+
+def _url_versi(params):
+    with app.app.test_request_context():
+        return app._export_url(app._loan_from_params(params), params)
+
+
+def test_secret_dari_environment():
+    assert app.app.secret_key == "test-secret"
+
+
+def test_export_bertanda_tangan_immutable(client):
+    resp = client.get(_url_versi(PARAMS))
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/pdf"
+    assert resp.data.startswith(b"%PDF")
+    assert resp.cache_control.immutable and resp.cache_control.public
+
+
+def test_export_token_palsu_404(client):
+    assert client.get("/export/bukan-token.pdf").status_code == 404
+    palsu = app.URLSafeSerializer("random-secret", salt="export-pdf").dumps(PARAMS)
+    assert client.get(f"/export/{palsu}.pdf").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "ubah",
+    [
+        {"tenor": 0},
+        {"pokok": -5},
+        {"tenor": 100_000},
+        {"metode": "tidak_ada"},
+        {"metode": "efektif", "bunga_tahunan": 0.0},
+        {"start_date": "bukan-tanggal"},
+    ],
+)
+def test_export_parameter_tidak_valid_400(client, ubah):
+    resp = client.get(_url(dict(PARAMS, **ubah)), follow_redirects=True)
+    assert resp.status_code == 400
+    assert not resp.cache_control.immutable
+
+
+def test_export_bukan_objek_400(client):
+    assert client.get(_url([1, 2, 3])).status_code == 400
+
+
+def test_export_url_berubah_saat_versi_output_berubah(client, monkeypatch):
+    lama = _url_versi(PARAMS)
+    assert client.get(lama).status_code == 200
+
+    monkeypatch.setattr(pdfcache, "TEMPLATE_VERSION", "uji")
+    baru = _url_versi(PARAMS)
+    assert baru != lama
+    resp = client.get(lama)
+    assert resp.status_code == 302 and resp.location.endswith(baru)
+    assert not resp.cache_control.immutable
+    assert client.get(baru).status_code == 200
+
+    monkeypatch.setattr(app, "PDF_RENDERER", "platypus")
+    assert _url_versi(PARAMS) != baru
+    assert _url_versi(dict(PARAMS, engine="rupiah")) != _url_versi(PARAMS)
+
+
+def test_export_tanpa_versi_dialihkan(client):
+    resp = client.get(_url(PARAMS))
+    assert resp.status_code == 302
+    assert resp.location.endswith(_url_versi(PARAMS))
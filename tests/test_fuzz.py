@@ -0,0 +1,79 @@
+import ast
+import os
+import random
+import sys
+from datetime import timedelta
+
+import pytest
+
+import schedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS = os.path.join(ROOT, "tools")
+sys.path.insert(0, TOOLS)
+
+import fuzz  # noqa: E402
+import reference  # noqa: E402
+
+METODE = sorted(schedule.METHODS)
+
+
+def test_referensi_tidak_memakai_kode_aplikasi():
+    with open(os.path.join(TOOLS, "reference.py"), encoding="utf-8") as f:
+        pohon = ast.parse(f.read())
+    modul = set()
+    for node in ast.walk(pohon):
+        if isinstance(node, ast.Import):
+            modul.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modul.add(node.module.split(".")[0])
+    assert modul == {"datetime", "decimal", "pandas", "dateutil"}
+
+
+def test_numpy_sama_dengan_baseline():
+    ref = fuzz._resolve(fuzz.BASELINE)
+    cand = fuzz._resolve("numpy")
+    for i in range(300):
+        case = fuzz.random_case(random.Random(f"test:{i}"), METODE)
+        beda = fuzz.bandingkan(*(fuzz._panggil(f, case)[0] for f in (ref, cand)))
+        assert beda is None, (case, beda)
+
+
+def _tanggal_bergeser(first_due_date, tenor):
+    # Regresi buatan di duedates: jatuh tempo dihitung per 30 hari
+    return [
+        (first_due_date + timedelta(days=30 * k - 1)).strftime("%d %b %Y")
+        for k in range(tenor)
+    ]
+
+
+def _summary_tanpa_adjustment(pokok, angsuran_pokok, bunga, total, sisa):
+    # Regresi buatan: ADJUSTMENT dilewati, summary tetap dihitung
+    return {
+        "total_bunga": int(schedule.rupiah_round_array(bunga).sum()),
+        "total_angsuran": int(schedule.rupiah_round_array(total).sum()),
+    }
+
+
+@pytest.mark.parametrize(
+    "nama,pengganti",
+    [
+        ("due_date_strings", _tanggal_bergeser),
+        ("_rekonsiliasi", _summary_tanpa_adjustment),
+    ],
+)
+def test_baseline_menangkap_regresi_kode_bersama(monkeypatch, nama, pengganti):
+    """Regresi di kode yang dipakai bersama engine numpy dan python tidak
+    terlihat bila referensinya engine python, tapi tertangkap baseline."""
+    monkeypatch.setattr(schedule, nama, pengganti)
+    baseline, python = fuzz._resolve(fuzz.BASELINE), fuzz._resolve("python")
+    cand = fuzz._resolve("numpy")
+    beda = {"baseline": 0, "python": 0}
+    for i in range(50):
+        case = fuzz.random_case(random.Random(f"regresi:{i}"), ["efektif", "flat"])
+        hasil = fuzz._panggil(cand, case)[0]
+        for ref, nama_ref in ((baseline, "baseline"), (python, "python")):
+            if fuzz.bandingkan(fuzz._panggil(ref, case)[0], hasil) is not None:
+                beda[nama_ref] += 1
+    assert beda["python"] == 0
+    assert beda["baseline"] > 0
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import app
+from grid import MAX_CELLS, sensitivity_grid
+from schedule import MAX_TENOR, compute_schedule, rupiah_round
+
+MULAI, JATUH_TEMPO = datetime(2024, 1, 10), datetime(2024, 2, 25)
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_grid_efektif_bunga_nol_ditolak(client):
+    resp = client.post(
+        "/api/grid", json={"pokok": 1e8, "rates": [0, 10], "tenors": [12, 24]}
+    )
+    assert resp.status_code == 400
+    # Jalur satu pinjaman juga menolak input yang sama
+    with pytest.raises(ZeroDivisionError):
+        compute_schedule(1e8, 0.0, 12, "efektif", MULAI, JATUH_TEMPO)
+
+
+def test_grid_bunga_negatif_ditolak(client):
+    resp = client.post(
+        "/api/grid",
+        json={"pokok": 1e8, "rates": [-1], "tenors": [12], "metode": ["flat"]},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize("metode", ["flat", "flat_rata"])
+def test_grid_flat_bunga_nol_sama_dengan_jadwal(metode):
+    hasil = sensitivity_grid(1e8, [0.0], [1, 12], MULAI, JATUH_TEMPO, (metode,))
+    for j, tenor in enumerate((1, 12)):
+        kolom, _, summary = compute_schedule(
+            1e8, 0.0, tenor, metode, MULAI, JATUH_TEMPO
+        )
+        for f, v in summary.items():
+            assert hasil[metode][f][0, j] == v
+        pertama = rupiah_round(kolom["Total Angsuran"][1])
+        assert hasil[metode]["angsuran_pertama"][0, j] == pertama
+    assert (hasil[metode]["total_angsuran"] >= 0).all()
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "rate_min=1&rate_max=1000000000&rate_step=0.001&tenors=12",
+        "rate_min=1&rate_max=inf&tenors=12",
+        "rates=10&tenor_min=1&tenor_max=100000000",
+        "rate_min=1&rate_max=200&rate_step=1&tenor_min=1&tenor_max=200",
+    ],
+)
+def test_grid_rentang_besar_ditolak_sebelum_dibuat(client, query):
+    resp = client.get(f"/api/grid?pokok=100000000&{query}")
+    assert resp.status_code == 400
+
+
+def test_grid_tenor_maksimal(client):
+    resp = client.get(
+        "/api/grid?pokok=100000000&rates=10&tenors=2000000000&metode=flat"
+    )
+    assert resp.status_code == 400
+    with pytest.raises(ValueError):
+        sensitivity_grid(1e8, [0.1], [MAX_TENOR + 1], MULAI, JATUH_TEMPO, ("flat",))
+    hasil = sensitivity_grid(1e8, [0.1], [MAX_TENOR], MULAI, JATUH_TEMPO, ("flat",))
+    _, _, summary = compute_schedule(1e8, 0.1, MAX_TENOR, "flat", MULAI, JATUH_TEMPO)
+    assert hasil["flat"]["total_angsuran"][0, 0] == summary["total_angsuran"]
+
+
+def test_grid_batas_sel_kali_bulan():
+    # Jumlah sel di bawah MAX_CELLS, tapi sel × bulan di atas anggaran
+    rates = np.linspace(0.05, 0.2, MAX_CELLS // 2)
+    with pytest.raises(ValueError):
+        sensitivity_grid(1e8, rates, [12, MAX_TENOR], MULAI, JATUH_TEMPO, ("flat",))
@@ -0,0 +1,71 @@
+import pytest
+
+import app
+import schedule
+from cache import cached_schedule, schedule_cache
+
+FORM = {
+    "namecstm": "Streaming",
+    "pokok": "250.000.000",
+    "bunga": "11.5",
+    "tenor": "360",
+    "metode": "efektif",
+    "start_date": "2024-01-31",
+    "first_due_date": "2024-02-29",
+}
+
+
+@pytest.fixture
+def hitung_fmt(monkeypatch):
+    """Jumlah panggilan `schedule.fmt` (dipakai untuk memformat baris)."""
+    panggilan = [0]
+    asli = schedule.fmt
+
+    def fmt(x):
+        panggilan[0] += 1
+        return asli(x)
+
+    monkeypatch.setattr(schedule, "fmt", fmt)
+    return panggilan
+
+
+def _hasil():
+    loan = app.parse_loan(FORM)
+    return cached_schedule(
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        loan["start_date"],
+        loan["first_due_date"],
+        loan["engine"],
+    )
+
+
+def test_index_memformat_baris_saat_stream(hitung_fmt):
+    schedule_cache.clear()
+    resp = app.app.test_client().post("/", data=FORM)
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    # Sebelum body dibaca paling banyak blok pertama (±16 KB) yang sudah
+    # diformat (test client mengambil satu blok untuk memulai response)
+    assert hitung_fmt[0] < 361 * 4 // 2
+
+    body = resp.get_data(as_text=True)
+    # 361 baris × 4 kolom angka diformat sambil di-stream
+    assert hitung_fmt[0] >= 361 * 4
+    assert body.count("<tr") >= 361
+
+
+def test_index_tidak_menyimpan_baris_dan_penjelasan(hitung_fmt):
+    schedule_cache.clear()
+    client = app.app.test_client()
+    client.post("/", data=FORM).get_data()
+    hasil = _hasil()
+    # result.html tidak menampilkan penjelasan; tidak ada string baris di cache
+    assert "penjelasan" not in vars(hasil)
+    assert not any(isinstance(v, list) for v in vars(hasil).values())
+
+    sebelum = hitung_fmt[0]
+    client.post("/", data=FORM).get_data()
+    assert hitung_fmt[0] - sebelum >= 361 * 4
@@ -0,0 +1,112 @@
+import os
+import time
+
+import jobs
+
+
+def _antrean(tmp_path):
+    q = jobs.JobQueue(str(tmp_path), workers=1)
+
+    def tulis(params, path, progress):
+        if params.get("gagal"):
+            raise ValueError("gagal")
+        with open(path, "w") as f:
+            f.write("isi")
+        progress(1, 1)
+
+    q.register("tulis", tulis)
+    return q
+
+
+def _tunggu(q):
+    q._pool.shutdown(wait=True)
+    q._pool = None
+
+
+def test_sweep_buang_job_kedaluwarsa(tmp_path, monkeypatch):
+    q = _antrean(tmp_path)
+    selesai = q.submit("tulis", {}, "a.txt", "text/plain")
+    gagal = q.submit("tulis", {"gagal": True}, "b.txt", "text/plain")
+    _tunggu(q)
+    assert q.get(selesai)["status"] == "done"
+    assert q.get(gagal)["status"] == "failed"
+    assert os.path.exists(q.result_path(selesai))
+
+    # Masih dalam masa retensi: tidak disentuh
+    assert q.sweep() == 0
+    assert os.path.exists(q.result_path(selesai))
+
+    # .tmp yatim dari worker yang mati
+    yatim = q.result_path("0" * 32) + ".tmp"
+    with open(yatim, "w") as f:
+        f.write("sisa")
+    lama = time.time() - 10
+    os.utime(yatim, (lama, lama))
+
+    monkeypatch.setattr(jobs, "JOB_RETENTION", 0)
+    time.sleep(0.01)
+    assert q.sweep() == 2
+    assert q.get(selesai) is None and q.get(gagal) is None
+    assert os.listdir(tmp_path / "results") == []
+
+
+def test_sweep_jalan_saat_klaim(tmp_path, monkeypatch):
+    q = _antrean(tmp_path)
+    lama = q.submit("tulis", {}, "a.txt", "text/plain")
+    _tunggu(q)
+
+    monkeypatch.setattr(jobs, "JOB_RETENTION", 0.05)
+    monkeypatch.setattr(jobs, "_SWEEP_INTERVAL", 0)
+    time.sleep(0.1)
+    baru = q.submit("tulis", {}, "b.txt", "text/plain")
+    _tunggu(q)
+
+    assert q.get(lama) is None
+    assert not os.path.exists(q.result_path(lama))
+    assert q.get(baru)["status"] == "done"
+    assert os.path.exists(q.result_path(baru))
+
+
+def _params_pdf():
+    return dict(
+        pokok=10_000_000.0,
+        bunga_tahunan=0.12,
+        tenor=12,
+        metode="flat",
+        start_date="2024-01-10",
+        first_due_date="2024-02-10",
+        namecstm="Budi",
+        engine=None,
+    )
+
+
+def test_job_pdf_tanpa_cache(tmp_path, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app.pdf_cache, "max_bytes", 0)
+    path = tmp_path / "hasil.pdf"
+    app._job_pdf(_params_pdf(), str(path), lambda done, total: None)
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+def test_job_pdf_file_cache_hilang(tmp_path, monkeypatch):
+    import app
+
+    # Cache melaporkan hit, tapi file-nya sudah di-evict worker lain
+    monkeypatch.setattr(app.pdf_cache, "get", lambda key: str(tmp_path / "hilang"))
+    monkeypatch.setattr(app.pdf_cache, "put", lambda key, data: None)
+    path = tmp_path / "hasil.pdf"
+    app._job_pdf(_params_pdf(), str(path), lambda done, total: None)
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+def test_route_status_tidak_memanggil_start(monkeypatch):
+    import app
+
+    def start():
+        raise AssertionError("start() dipanggil dari request")
+
+    monkeypatch.setattr(app.job_queue, "start", start)
+    client = app.app.test_client()
+    assert client.get("/jobs/tidak-ada").status_code == 404
+    assert client.get("/jobs/tidak-ada/download").status_code == 404
@@ -0,0 +1,59 @@
+import base64
+import re
+import zlib
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from pdf import RENDERERS, build_pdf
+from schedule import compute_schedule
+
+MULAI, JATUH_TEMPO = datetime(2024, 1, 31), datetime(2024, 2, 29)
+
+
+def _isi_halaman(data: bytes) -> list:
+    """Content stream tiap halaman (ReportLab: ASCII85 + Flate)."""
+    hasil = []
+    for kamus, stream in re.findall(
+        rb"<<([^>]*/Filter[^>]*)>>\s*stream\r?\n(.*?)endstream", data, re.S
+    ):
+        if b"ASCII85Decode" in kamus:
+            stream = base64.a85decode(stream.strip().removesuffix(b"~>"))
+        if b"FlateDecode" in kamus:
+            stream = zlib.decompress(stream)
+        hasil.append(stream.decode("latin-1"))
+    return hasil
+
+
+def _teks(isi: str) -> list:
+    return [
+        re.sub(r"\\(.)", r"\1", t) for t in re.findall(r"\(((?:\\.|[^\\)])*)\) Tj", isi)
+    ]
+
+
+def _render(renderer, tenor, metode="efektif"):
+    kolom = compute_schedule(1e8, 0.115, tenor, metode, MULAI, JATUH_TEMPO).columns
+    data = build_pdf(kolom, 1e8, 0.115, tenor, metode, "Budi (S)", renderer=renderer)
+    return data.getvalue()
+
+
+@pytest.mark.parametrize(
+    "tenor,metode", [(1, "flat"), (12, "efektif"), (360, "efektif")]
+)
+def test_renderer_canvas_sama_dengan_platypus(tenor, metode):
+    canvas = _isi_halaman(_render("canvas", tenor, metode))
+    platypus = _isi_halaman(_render("platypus", tenor, metode))
+    assert len(canvas) == len(platypus)
+    for a, b in zip(canvas, platypus):
+        # Urutan gambar beda (canvas per blok baris), isi teks per halaman sama
+        assert Counter(_teks(a)) == Counter(_teks(b))
+    semua = [t for isi in canvas for t in _teks(isi)]
+    assert "Budi (S)" in semua and "T o t a l" in semua
+    assert semua.count("Bulan") == len(canvas)  # header tabel di setiap halaman
+
+
+def test_renderer_tidak_dikenal():
+    assert set(RENDERERS) == {"canvas", "platypus"}
+    with pytest.raises(ValueError):
+        _render("lain", 12)
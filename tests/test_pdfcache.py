@@ -0,0 +1,47 @@
+import os
+
+from pdfcache import PdfCache, pdf_key
+from bulk import parse_loan
+
+
+def _loan(tenor=12):
+    return parse_loan(
+        dict(
+            pokok="100.000.000",
+            bunga="12",
+            tenor=tenor,
+            metode="efektif",
+            start_date="2024-01-10",
+            first_due_date="2024-02-10",
+        )
+    )
+
+
+def test_put_get_dan_lru_menurut_mtime(tmp_path):
+    c = PdfCache(str(tmp_path), max_bytes=250)
+    a = c.put("aa01", b"x" * 100)
+    assert a == str(tmp_path / "aa" / "aa01.pdf")
+    b = c.put("bb02", b"y" * 100)
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+    assert c.get("aa01") == a  # hit memperbarui mtime → "bb02" jadi paling lama
+    c.put("cc03", b"z" * 100)
+    assert c.get("bb02") is None
+    assert open(c.get("aa01"), "rb").read() == b"x" * 100
+    stats = c.stats()
+    assert stats["size_bytes"] == 200 and stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert not [f for f in os.listdir(tmp_path / "aa") if f.endswith(".tmp")]
+
+
+def test_max_bytes_nol_cache_mati(tmp_path):
+    c = PdfCache(str(tmp_path), max_bytes=0)
+    assert c.put("aa01", b"x") is None
+    assert c.get("aa01") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_kunci_ikut_parameter_dan_renderer():
+    assert pdf_key(_loan()) == pdf_key(_loan())
+    assert pdf_key(_loan()) != pdf_key(_loan(24))
+    assert pdf_key(_loan(), "canvas") != pdf_key(_loan(), "platypus")
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+import app
+import schedule
+from rates import _faktor_anuitas, flat_to_effective
+
+MULAI, JATUH_TEMPO = datetime(2024, 1, 10), datetime(2024, 2, 10)
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("rate,tenor", [(12, 12), (24, 24), (30, 60)])
+def test_convert_rate_flat_rata(client, rate, tenor):
+    resp = client.get(f"/api/convert_rate?from=flat_rata&rate={rate}&tenor={tenor}")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["to"] == "efektif"
+    assert data["rate"] == pytest.approx(
+        flat_to_effective(rate / 100 * 12 / tenor, tenor) * 100
+    )
+    # Angsuran anuitas pada rate hasil = angsuran flat_rata (pokok/n + pokok×rate/n)
+    pmt = _faktor_anuitas(data["rate"] / 100 / 12, tenor)
+    assert pmt == pytest.approx((1 + rate / 100) / tenor)
+
+
+def test_convert_rate_asal_tidak_dikenal(client):
+    resp = client.get("/api/convert_rate?from=anuitas&rate=10&tenor=12")
+    assert resp.status_code == 400
+
+
+def test_compute_methods_validasi_sebelum_kernel(monkeypatch):
+    dipanggil = []
+    kernel = schedule.ENGINES["numpy"]["flat"]
+    monkeypatch.setitem(
+        schedule.ENGINES["numpy"],
+        "flat",
+        lambda *a: dipanggil.append(a) or kernel(*a),
+    )
+    with pytest.raises(ValueError):
+        schedule.compute_methods(
+            1e8, 0.12, 12, ("flat", "tidak_ada"), MULAI, JATUH_TEMPO, "numpy"
+        )
+    assert dipanggil == []
+
+    hasil = schedule.compute_methods(
+        1e8, 0.12, 12, ("flat", "efektif"), MULAI, JATUH_TEMPO, "numpy"
+    )
+    assert len(dipanggil) == 1
+    assert set(hasil) == {"flat", "efektif"}
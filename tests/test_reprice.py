@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from bulk import parse_loan
+from reprice import reprice_book, reprice_key, reprice_loan
+from schedule import Schedule
+from store import Book, write_book
+
+PINJAMAN = [
+    dict(pokok="10.000.000", bunga="12", tenor="12", metode="efektif"),
+    dict(pokok="25.000.000", bunga="9.5", tenor="24", metode="flat"),
+    dict(pokok="5.000.000", bunga="18", tenor="6", metode="efektif"),
+]
+BERLAKU = "2024-06-01"
+KOLOM = ("bulan", "tanggal", "angsuran_pokok", "bunga", "total_angsuran", "sisa_pokok")
+
+
+def _jadwal(loan):
+    return Schedule.compute(
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        loan["start_date"],
+        loan["first_due_date"],
+        engine=loan["engine"],
+    )
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    monkeypatch.setenv("BULK_WORKERS", "1")  # map_chunks tanpa pool
+    loans = [
+        parse_loan(dict(p, start_date="2024-01-10", first_due_date="2024-02-10"))
+        for p in PINJAMAN
+    ]
+    path = str(tmp_path / "lama")
+    write_book(path, [(loan, _jadwal(loan)) for loan in loans], part_loans=2)
+    return Book(path)
+
+
+def test_reprice_hanya_sisa_periode(book, tmp_path):
+    rates = [0.15, 0.15, np.nan]
+    meta = reprice_book(book, rates, BERLAKU, str(tmp_path / "baru"))
+    assert meta["repriced"] == 1 and meta["unchanged"] == 1
+    assert meta["errors"] == [(1, "Metode tidak didukung untuk repricing")]
+
+    baru = Book(str(tmp_path / "baru"))
+    assert len(baru) == 3 and baru.output_version == book.output_version
+    for i in (1, 2):  # flat dan rate NaN disalin apa adanya
+        assert baru.loan(i) == book.loan(i)
+        for nama in KOLOM:
+            asli = getattr(book[i], nama)
+            np.testing.assert_array_equal(getattr(baru[i], nama), asli)
+
+    # Angsuran 10 Jun 2024 = bulan 5: bulan 1..4 tetap, sisanya pakai 15%
+    lama, jadwal = book[0], baru[0]
+    assert baru.loan(0)["bunga_tahunan"] == 0.15
+    np.testing.assert_array_equal(jadwal.tanggal, lama.tanggal)
+    np.testing.assert_array_equal(jadwal.bunga[:5], lama.bunga[:5])
+    np.testing.assert_array_equal(jadwal.sisa_pokok[:5], lama.sisa_pokok[:5])
+    # Baris terakhir memuat ADJUSTMENT pembulatan, jadi tidak ikut dibandingkan
+    bulanan = 0.15 / 12
+    np.testing.assert_allclose(jadwal.bunga[5:-1], jadwal.sisa_pokok[4:-2] * bulanan)
+    assert jadwal.sisa_pokok[-1] == pytest.approx(0, abs=1e-6)
+    assert jadwal.summary["total_pokok"] == lama.summary["total_pokok"]
+    assert jadwal.summary["total_bunga"] > lama.summary["total_bunga"]
+
+    ulang = reprice_loan(book, 0, 0.15, 5)
+    np.testing.assert_array_equal(ulang.bunga, jadwal.bunga)
+    assert baru.get(reprice_key(book.key(0), BERLAKU, 0.15)) is not None
+
+
+def test_rate_sama_atau_sudah_lunas_tidak_dihitung(book, tmp_path):
+    rates = book.column("bunga_tahunan").copy()
+    rates[2] = 0.2  # tenor 6 dari Feb 2024: lunas sebelum 2025
+    meta = reprice_book(book, rates, "2025-01-01", str(tmp_path / "baru"))
+    assert meta["repriced"] == 0 and meta["unchanged"] == 3
+    assert meta["errors"] == []
+
+
+def test_jumlah_rate_harus_sama(book, tmp_path):
+    with pytest.raises(ValueError):
+        reprice_book(book, [0.1], BERLAKU, str(tmp_path / "baru"))
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from restructure import LoanSchedule
+
+# Tanggal sama (30/360) dan beda tanggal (actual/360, prorata ≠ 1 bulan)
+TANGGAL = [
+    (datetime(2024, 1, 10), datetime(2024, 2, 10)),
+    (datetime(2024, 1, 10), datetime(2024, 2, 25)),
+]
+
+
+def _sama(a, b):
+    assert a.summary == b.summary
+    for x, y in zip(a.value_columns(), b.value_columns()):
+        np.testing.assert_array_equal(x, y)
+
+
+@pytest.mark.parametrize("start_date,first_due_date", TANGGAL)
+@pytest.mark.parametrize("k", [1, 2, 10, 24])
+def test_flat_event_kosong_tidak_mengubah_jadwal(k, start_date, first_due_date):
+    jadwal = LoanSchedule(1e8, 0.12, 24, "flat", start_date, first_due_date)
+    _sama(jadwal, jadwal.apply(k))
+    _sama(jadwal, jadwal.change_rate(k, 0.12))
+    _sama(jadwal, jadwal.change_tenor(k, 24))
+
+
+def test_flat_bunga_dari_pokok_awal():
+    jadwal = LoanSchedule(1e8, 0.12, 24, "flat", *TANGGAL[0])
+    assert jadwal.summary["total_bunga"] == 25_000_008
+    # Bulan 1-9 bunga 1.000.000, bulan 10-24 dari pokok 90 juta, + prorata
+    assert jadwal.prepay(10, 1e7).summary["total_bunga"] == 23_500_003
+    # Rate 10% mulai bulan 10: 15 × 833.333,33
+    assert jadwal.change_rate(10, 0.10).summary["total_bunga"] == 22_500_003
+
+
+@pytest.mark.parametrize(
+    "events",
+    [
+        [1, 2],
+        ["bulan"],
+        [None],
+        {"bulan": 12},
+        "bulan=12",
+        [{"bulan": 12, "tenor": 100_000_000}],
+    ],
+)
+def test_simulate_event_tidak_valid_400(events):
+    import app
+
+    data = dict(
+        pokok="100.000.000",
+        bunga="12",
+        tenor="24",
+        metode="flat",
+        start_date="2024-01-10",
+        first_due_date="2024-02-10",
+        events=events,
+    )
+    resp = app.app.test_client().post("/api/simulate", json=data)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from schedule import Schedule, compute_schedule
+
+MULAI, JATUH_TEMPO = datetime(2024, 1, 31), datetime(2024, 2, 29)
+
+
+@pytest.mark.parametrize("engine", ["numpy", "rupiah"])
+@pytest.mark.parametrize(
+    "metode,tenor", [("efektif", 360), ("flat", 1), ("flat", 13), ("flat_rata", 24)]
+)
+def test_sama_dengan_compute_schedule(metode, tenor, engine):
+    args = (1e8, 0.115, tenor, metode, MULAI, JATUH_TEMPO, engine)
+    hasil = compute_schedule(*args)
+    jadwal = Schedule.compute(*args)
+
+    kolom, harapan = jadwal.columns(), hasil.columns
+    assert kolom.keys() == harapan.keys()
+    assert kolom["Tanggal"] == list(harapan["Tanggal"])
+    for nama in kolom.keys() - {"Tanggal"}:
+        np.testing.assert_array_equal(kolom[nama], harapan[nama])
+    assert [b.formatted() for b in jadwal] == list(hasil.iter_formatted_rows())
+    assert jadwal.summary == hasil.summary
+    assert jadwal.totals["bunga"] == harapan["Bunga"].sum().item()
+
+
+def test_tipe_kolom_dan_view_baris():
+    jadwal = Schedule.compute(1e8, 0.12, 12, "efektif", MULAI, JATUH_TEMPO, "rupiah")
+    assert jadwal.bulan.dtype == np.int32
+    assert jadwal.tanggal.dtype == np.dtype("datetime64[D]")
+    assert jadwal.bunga.dtype == np.int64
+    assert len(jadwal) == 13
+    assert jadwal.nbytes == 13 * (4 + 8 + 4 * 8)
+
+    akhir = jadwal[-1]
+    assert (akhir.bulan, akhir.sisa_pokok) == (12, 0)
+    assert akhir.tanggal == datetime(2025, 1, 29).date()  # dari jatuh tempo 29 Feb
+    assert type(akhir.bunga) is int
+    assert jadwal[0].tanggal == MULAI.date()
+    with pytest.raises(IndexError):
+        jadwal[13]
+    with pytest.raises(IndexError):
+        jadwal[-14]
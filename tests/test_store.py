@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import cache
+from api import API_VERSION
+from bulk import parse_loan
+from schedule import Schedule, compute_schedule
+from store import Book, write_book
+
+PINJAMAN = [
+    dict(pokok="10.000.000", bunga="12", tenor="12", metode="efektif"),
+    dict(pokok="25.000.000", bunga="9.5", tenor="24", metode="flat"),
+    dict(pokok="5.000.000", bunga="18", tenor="6", metode="efektif", engine="rupiah"),
+]
+
+
+def _loans():
+    return [
+        parse_loan(dict(p, start_date="2024-01-10", first_due_date="2024-02-25"))
+        for p in PINJAMAN
+    ]
+
+
+def _hitung(loan):
+    return Schedule.compute(
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        loan["start_date"],
+        loan["first_due_date"],
+        engine=loan["engine"],
+    )
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = str(tmp_path / "book")
+    write_book(path, [(loan, _hitung(loan)) for loan in _loans()], part_loans=2)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def lepas_book():
+    yield
+    cache.use_book(None)
+
+
+def test_book_sama_dengan_hitungan(book):
+    b = Book(book)
+    assert len(b) == 3 and not b.stale
+    assert b.output_version == API_VERSION
+    for i, loan in enumerate(_loans()):
+        asli, tersimpan = _hitung(loan), b.find(loan)
+        assert tersimpan.summary == asli.summary
+        for nama in ("bulan", "tanggal", "angsuran_pokok", "bunga", "sisa_pokok"):
+            assert np.array_equal(getattr(tersimpan, nama), getattr(asli, nama))
+        assert tersimpan.bunga.dtype == asli.bunga.dtype
+        assert b.loan(i)["tenor"] == loan["tenor"]
+
+
+def _args(loan):
+    return (
+        loan["pokok"],
+        loan["bunga_tahunan"],
+        loan["tenor"],
+        loan["metode"],
+        loan["start_date"],
+        loan["first_due_date"],
+        loan["engine"],
+    )
+
+
+def test_cached_schedule_membaca_book(book, monkeypatch):
+    cache.use_book(Book(book))
+    monkeypatch.setattr(cache, "compute_schedule", None)  # tidak boleh dipanggil
+    loan = _loans()[0]
+    hasil = cache.cached_schedule(*_args(loan))
+    assert hasil.summary == compute_schedule(*_args(loan)).summary
+
+
+def test_book_versi_lama_diabaikan(book, monkeypatch):
+    meta_path = os.path.join(book, "meta.json")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["output_version"] = "1"
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    b = Book(book)
+    assert b.stale
+    with pytest.warns(UserWarning, match="versi output"):
+        cache.use_book(b)
+    assert cache._book is None
+
+    dihitung = []
+    asli = cache.compute_schedule
+    monkeypatch.setattr(
+        cache, "compute_schedule", lambda *a, **k: dihitung.append(a) or asli(*a, **k)
+    )
+    cache.cached_schedule(*_args(_loans()[1]))
+    assert len(dihitung) == 1
+
+    # Book tanpa cap versi (dibuat sebelum versi dicatat) juga dianggap lama
+    del meta["output_version"]
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    assert Book(book).stale
@@ -0,0 +1,73 @@
+import io
+import os
+import resource
+import tempfile
+
+import pytest
+from openpyxl import load_workbook
+
+import app
+import xlsx
+
+PINJAMAN = dict(
+    pokok=10_000_000,
+    bunga=12,
+    tenor=12,
+    metode="efektif",
+    start_date="2024-01-10",
+    first_due_date="2024-02-10",
+)
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.fixture
+def batas_file_terbuka():
+    """Batas file terbuka rendah: satu file sementara per sheet akan gagal."""
+    lunak, keras = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (256, keras))
+    yield 256
+    resource.setrlimit(resource.RLIMIT_NOFILE, (lunak, keras))
+
+
+def test_bulk_xlsx_banyak_customer(client, batas_file_terbuka):
+    n = 2 * batas_file_terbuka
+    loans = [dict(PINJAMAN, namecstm=f"C{i}") for i in range(n)]
+    resp = client.post("/bulk_export_xlsx", json={"loans": loans})
+    assert resp.status_code == 200
+
+    wb = load_workbook(io.BytesIO(resp.get_data()))
+    assert wb.sheetnames == ["Ringkasan", "Jadwal"]
+    # Header + per customer: baris 0..12 dan baris Total
+    assert wb["Jadwal"].max_row == 1 + n * 14
+    assert wb["Ringkasan"].max_row == 1 + n
+
+
+def test_bulk_xlsx_sheet_per_customer_di_bawah_batas(client):
+    loans = [dict(PINJAMAN, namecstm=f"C{i}") for i in range(3)]
+    resp = client.post("/bulk_export_xlsx", json={"loans": loans})
+    wb = load_workbook(io.BytesIO(resp.get_data()))
+    assert wb.sheetnames == ["Ringkasan", "C0", "C1", "C2"]
+
+
+def test_bulk_xlsx_melebihi_baris_excel(client, monkeypatch):
+    monkeypatch.setattr(xlsx, "XLSX_MAX_SHEETS", 1)
+    monkeypatch.setattr(xlsx, "XLSX_MAX_ROWS", 30)
+    loans = [dict(PINJAMAN, namecstm=f"C{i}") for i in range(3)]
+    resp = client.post("/bulk_export_xlsx", json={"loans": loans})
+    assert resp.status_code == 400
+    assert "baris" in resp.get_json()["error"]
+
+
+def test_export_ditolak_tidak_meninggalkan_file_sementara(
+    client, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(xlsx, "XLSX_MAX_SHEETS", 1)
+    monkeypatch.setattr(xlsx, "XLSX_MAX_ROWS", 30)
+    loans = [dict(PINJAMAN, namecstm=f"C{i}") for i in range(3)]
+    assert client.post("/bulk_export_xlsx", json={"loans": loans}).status_code == 400
+    assert not [p for p in os.listdir(tmp_path) if p.startswith("openpyxl.")]
@@ -0,0 +1,216 @@
+"""Benchmark build_schedule, halaman hasil (POST /) dan export_pdf.
+
+    python tools/bench.py                          # jalankan & tampilkan
+    python tools/bench.py --save base.json         # simpan baseline
+    python tools/bench.py --compare base.json      # gagal bila regresi > threshold
+    python tools/bench.py --filter flat --quick
+
+Waktu per panggilan diukur dengan perf_counter; memori puncak diukur
+terpisah dengan tracemalloc (satu panggilan) supaya tidak mengganggu waktu.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Cache PDF terpisah supaya benchmark tidak mengosongkan cache milik server
+os.environ.setdefault("PDF_CACHE_DIR", tempfile.mkdtemp(prefix="bench_pdf_"))
+
+import app  # noqa: E402
+from cache import schedule_cache  # noqa: E402
+from pdfcache import pdf_cache  # noqa: E402
+from schedule import build_schedule  # noqa: E402
+
+TENORS = (6, 12, 24, 60, 120, 240, 360)
+ROUTE_TENORS = (12, 60, 360)
+POKOK = 250_000_000.0
+BUNGA = 0.115
+START = datetime(2024, 1, 31)
+FIRST_DUE = datetime(2024, 2, 29)
+
+
+def _form(metode, tenor):
+    return {
+        "namecstm": "Bench",
+        "pokok": f"{POKOK:,.0f}".replace(",", "."),
+        "bunga": str(BUNGA * 100),
+        "tenor": str(tenor),
+        "metode": metode,
+        "start_date": START.strftime("%Y-%m-%d"),
+        "first_due_date": FIRST_DUE.strftime("%Y-%m-%d"),
+    }
+
+
+def cases():
+    """(nama, fungsi tanpa argumen) untuk setiap skenario."""
+    client = app.app.test_client()
+
+    for metode in ("efektif", "flat"):
+        for tenor in TENORS:
+            # tuple(): DataFrame, penjelasan dan summary ikut dibuat, seperti
+            # pemanggil yang meng-unpack hasilnya
+            yield f"build_schedule/{metode}/{tenor}", (
+                lambda m=metode, t=tenor: tuple(
+                    build_schedule(POKOK, BUNGA, t, m, START, FIRST_DUE)
+                )
+            )
+
+    def post_index(form):
+        # Cache dikosongkan supaya yang diukur jalur lengkap (hitung + render)
+        schedule_cache.clear()
+        resp = client.post("/", data=form)
+        assert resp.status_code == 200, resp.status_code
+        resp.get_data()
+
+    def export_pdf(form, cached=False):
+        if not cached:
+            # Jalur render penuh: kosongkan cache jadwal dan cache PDF di disk
+            schedule_cache.clear()
+            pdf_cache.clear()
+        with client.session_transaction() as sess:
+            sess["params"] = {
+                "pokok": POKOK,
+                "bunga_tahunan": BUNGA,
+                "tenor": int(form["tenor"]),
+                "metode": form["metode"],
+                "start_date": form["start_date"],
+                "first_due_date": form["first_due_date"],
+                "namecstm": form["namecstm"],
+            }
+        resp = client.get("/export_pdf")
+        assert resp.status_code == 200, resp.status_code
+        resp.get_data()
+
+    for metode in ("efektif", "flat"):
+        for tenor in ROUTE_TENORS:
+            form = _form(metode, tenor)
+            yield f"POST /{metode}/{tenor}", (lambda f=form: post_index(f))
+            yield f"export_pdf/{metode}/{tenor}", (lambda f=form: export_pdf(f))
+            yield f"export_pdf_cached/{metode}/{tenor}", (
+                lambda f=form: export_pdf(f, cached=True)
+            )
+
+
+def _percentile(sorted_values, q):
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_case(fn, min_time, min_iter, warmup):
+    for _ in range(warmup):
+        fn()
+
+    gc.collect()
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_iter or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "iterations": len(times),
+        "throughput": len(times) / elapsed,
+        "mean_ms": statistics.fmean(times) * 1000,
+        "p50_ms": _percentile(times, 0.50) * 1000,
+        "p99_ms": _percentile(times, 0.99) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold, metrics):
+    """Daftar (nama, metrik, lama, baru) yang lebih buruk dari threshold."""
+    regresi = []
+    for name, now in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        for metric in metrics:
+            if old[metric] > 0 and now[metric] > old[metric] * (1 + threshold):
+                regresi.append((name, metric, old[metric], now[metric]))
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="hanya skenario yang memuat teks ini")
+    parser.add_argument("--min-time", type=float, default=0.5, help="detik per skenario")
+    parser.add_argument("--min-iter", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="min-time 0.1, min-iter 5")
+    parser.add_argument("--save", metavar="PATH", help="simpan hasil sebagai baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="bandingkan dengan baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="regresi relatif yang ditoleransi (0.20 = 20%%)",
+    )
+    parser.add_argument(
+        "--metrics",
+        default="p50_ms,peak_kb",
+        help="metrik yang dibandingkan (p99 sensitif noise pada iterasi sedikit)",
+    )
+    args = parser.parse_args()
+    if args.quick:
+        args.min_time, args.min_iter = 0.1, 5
+
+    results = {}
+    print(
+        f"{'scenario':<30}{'iter':>7}{'ops/s':>10}{'p50 ms':>10}"
+        f"{'p99 ms':>10}{'peak KB':>10}"
+    )
+    for name, fn in cases():
+        if args.filter not in name:
+            continue
+        r = run_case(fn, args.min_time, args.min_iter, args.warmup)
+        results[name] = r
+        print(
+            f"{name:<30}{r['iterations']:>7}{r['throughput']:>10.1f}"
+            f"{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['peak_kb']:>10.0f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"baseline disimpan ke {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regresi = compare(results, baseline, args.threshold, args.metrics.split(","))
+        for name, metric, old, new in regresi:
+            print(f"REGRESI {name} {metric}: {old:.3f} → {new:.3f} ({new / old - 1:+.0%})")
+        if regresi:
+            return 1
+        print(f"tidak ada regresi > {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Simpan jadwal satu portofolio ke book kolumnar, lalu buka ulang untuk laporan.
+
+    python tools/book.py build /data/book loans.csv     # hitung & tulis
+    python tools/book.py report /data/book              # ringkasan + arus kas
+    python tools/book.py build /tmp/book --synthetic 50000
+    python tools/book.py reprice /data/book /data/book-2025-07 --date 2025-07-01 --delta 0.25
+
+Book dibuka dengan mmap (lihat store.py); app memakainya sebagai sumber
+jadwal bila SCHEDULE_BOOK menunjuk ke direktori book.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bulk import read_loans  # noqa: E402
+from reprice import REPRICE_METHODS, reprice_book  # noqa: E402
+from store import Book, build_book  # noqa: E402
+
+
+def _synthetic(n, seed=1):
+    rnd = random.Random(seed)
+    for i in range(n):
+        start = date(2024, 1, 1) + timedelta(days=rnd.randint(0, 365))
+        yield {
+            "namecstm": f"Customer {i}",
+            "pokok": str(rnd.randrange(10_000_000, 2_000_000_000, 1000)),
+            "bunga": str(rnd.randrange(500, 2500) / 100),
+            "tenor": str(rnd.choice((12, 24, 36, 60, 120, 240, 360))),
+            "metode": rnd.choice(("efektif", "flat")),
+            "start_date": start.isoformat(),
+            "first_due_date": (start + timedelta(days=rnd.randint(20, 45))).isoformat(),
+        }
+
+
+def _memori():
+    """RSS anonim vs halaman file (mmap book) bila /proc tersedia."""
+    try:
+        with open("/proc/self/status") as f:
+            status = dict(line.split(":", 1) for line in f)
+    except OSError:
+        maks = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return f"RSS maks {maks:.0f} MB"
+    mb = {k: int(status[k].split()[0]) / 1024 for k in ("RssAnon", "RssFile")}
+    return f"RSS anon {mb['RssAnon']:.0f} MB, file/mmap {mb['RssFile']:.0f} MB"
+
+
+def cmd_build(args):
+    if args.synthetic:
+        loans = _synthetic(args.synthetic)
+    else:
+        with open(args.input, "rb") as f:
+            data = f.read()
+        if args.input.endswith(".csv"):
+            loans = read_loans(data, "csv")
+        else:
+            loans = read_loans(json.loads(data), "json")
+
+    t0 = time.perf_counter()
+    meta = build_book(args.book, loans)
+    print(
+        f"{meta['loans']} pinjaman, {sum(p['rows'] for p in meta['parts'])} baris, "
+        f"{len(meta['errors'])} gagal, {time.perf_counter() - t0:.2f} s"
+    )
+    for idx, pesan in meta["errors"][:10]:
+        print(f"  #{idx}: {pesan}")
+
+
+def cmd_report(args):
+    t0 = time.perf_counter()
+    book = Book(args.book)
+    totals = {
+        nama: int(book.column(nama).sum())
+        for nama in ("total_pokok", "total_bunga", "total_angsuran")
+    }
+    proyeksi = book.cashflow()
+    durasi = time.perf_counter() - t0
+
+    print(f"{len(book)} pinjaman dari {args.book}")
+    if book.stale:
+        print(f"  versi output {book.output_version!r} sudah lama, build ulang")
+    for nama, nilai in totals.items():
+        print(f"  {nama:<15} {nilai:>22,}")
+    for baris in proyeksi.rows()[: args.months]:
+        print(f"  {baris['bulan']}  {baris['total']:>20,}  ({baris['angsuran']} angsuran)")
+    print(f"{durasi:.2f} s, {_memori()}")
+
+
+def cmd_reprice(args):
+    t0 = time.perf_counter()
+    book = Book(args.book)
+    lama = book.column("bunga_tahunan")
+    rates = args.rate / 100 if args.rate is not None else lama + args.delta / 100
+    floating = np.isin(book.column("metode"), [m.encode() for m in REPRICE_METHODS])
+    rates = np.where(floating, rates, np.nan)
+    meta = reprice_book(book, rates, args.date, args.out)
+    print(
+        f"{meta['loans']} pinjaman: {meta['repriced']} di-reprice, "
+        f"{meta['unchanged']} tetap, {len(meta['errors'])} gagal, "
+        f"{time.perf_counter() - t0:.2f} s"
+    )
+    for idx, pesan in meta["errors"][:10]:
+        print(f"  #{idx}: {pesan}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("book")
+    build.add_argument("input", nargs="?", help="CSV atau JSON pinjaman")
+    build.add_argument("--synthetic", type=int, help="pakai N pinjaman acak")
+    report = sub.add_parser("report")
+    report.add_argument("book")
+    report.add_argument("--months", type=int, default=12)
+    reprice = sub.add_parser("reprice", help="rate baru untuk pinjaman efektif")
+    reprice.add_argument("book")
+    reprice.add_argument("out", help="path book hasil")
+    reprice.add_argument("--date", required=True, help="tanggal efektif YYYY-MM-DD")
+    rate = reprice.add_mutually_exclusive_group(required=True)
+    rate.add_argument("--rate", type=float, help="rate baru (%% p.a)")
+    rate.add_argument("--delta", type=float, help="perubahan rate (poin %%)")
+    args = parser.parse_args()
+    if args.cmd == "build" and not (args.input or args.synthetic):
+        parser.error("input atau --synthetic wajib diisi")
+    {"build": cmd_build, "report": cmd_report, "reprice": cmd_reprice}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()
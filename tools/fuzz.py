@@ -0,0 +1,321 @@
+"""Fuzzing diferensial: engine kandidat vs `build_schedule` versi awal.
+
+    python tools/fuzz.py                                 # numpy vs baseline, 20k kasus
+    python tools/fuzz.py --reference python              # numpy vs loop python (cepat)
+    python tools/fuzz.py -n 5000000 --workers 8
+    python tools/fuzz.py --candidate mymodule:compute_schedule --methods flat
+    python tools/fuzz.py --engine rupiah --max-failures 3
+
+Input diacak di semua core (multiprocessing), dengan bobot ke kasus tepi:
+cabang prorata 30/360 (tanggal sama) vs actual/360, clamp
+`max(0.0, cicilan_pokok - adj)` di bulan terakhir flat (prorata besar,
+tenor pendek), pokok dengan pecahan .5, tenor 1–3 dan bunga 0. Setiap
+baris dibandingkan pada presisi rupiah (nilai dibulatkan `rupiah_round`),
+begitu juga Bulan, Tanggal dan summary; kalau referensi melempar exception,
+kandidat harus melempar tipe yang sama.
+
+Referensi default ("baseline") adalah salinan beku kode awal di
+tools/reference.py yang tidak berbagi kode apa pun dengan schedule.py,
+jadi regresi di ADJUSTMENT, pembulatan dan tanggal ikut tertangkap;
+referensi engine ("python") hanya membandingkan kernel.
+
+Kasus yang gagal diperkecil (shrink) ke reproducer minimal lalu dicetak
+sebagai panggilan `compute_schedule` yang bisa langsung dijalankan.
+Throughput referensi dan kandidat diukur dari run yang sama.
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from schedule import (  # noqa: E402
+    ENGINES,
+    KOLOM,
+    METHODS,
+    compute_schedule,
+    rupiah_round_array,
+)
+
+# Referensi default: salinan beku build_schedule awal (tools/reference.py)
+BASELINE = "baseline"
+
+# Kasus per tugas worker
+CHUNK = 2000
+_TENOR_UMUM = (6, 12, 24, 36, 48, 60, 120, 180, 240, 360)
+
+# Diisi di setiap worker oleh _init
+_cfg = {}
+
+
+def _tambah_bulan(tanggal, n):
+    bulan = tanggal.month - 1 + n
+    return tanggal.replace(year=tanggal.year + bulan // 12, month=bulan % 12 + 1)
+
+
+def random_case(rnd, methods):
+    """(pokok, bunga_tahunan, tenor, metode, start_date, first_due_date)."""
+    metode = rnd.choice(methods)
+
+    r = rnd.random()
+    if r < 0.15:
+        tenor = rnd.randint(1, 3)
+    elif r < 0.55:
+        tenor = rnd.choice(_TENOR_UMUM)
+    else:
+        tenor = rnd.randint(1, 360)
+
+    r = rnd.random()
+    if r < 0.5:
+        pokok = float(rnd.randrange(1_000_000, 5_000_000_000, 1000))
+    elif r < 0.8:
+        pokok = float(rnd.randrange(1, 5_000_000_000))
+    else:
+        # Pecahan .5: batas pembulatan half-up
+        pokok = rnd.randrange(1, 5_000_000_000) + 0.5
+
+    r = rnd.random()
+    if r < 0.01:
+        bunga_tahunan = 0.0
+    elif r < 0.7:
+        bunga_tahunan = rnd.randrange(1, 3000) / 10000
+    else:
+        bunga_tahunan = rnd.uniform(0.0001, 0.6)
+
+    start = datetime(2020, 1, 1) + timedelta(days=rnd.randint(0, 3650))
+    r = rnd.random()
+    if r < 0.35:
+        # Tanggal sama → cabang 30/360
+        start = start.replace(day=min(start.day, 28))
+        first_due = _tambah_bulan(start, rnd.choice((1, 1, 1, 2, 3)))
+    elif r < 0.9:
+        # Beda tanggal → actual/360; selisih besar memicu clamp flat
+        first_due = start + timedelta(days=rnd.randint(1, 120))
+        if first_due.day == start.day:
+            first_due += timedelta(days=1)
+    else:
+        # Jatuh tempo sebelum/sama dengan pencairan → selisih 0
+        first_due = start - timedelta(days=rnd.randint(0, 40))
+        if first_due.day == start.day and first_due != start:
+            first_due -= timedelta(days=1)
+    return pokok, bunga_tahunan, tenor, metode, start, first_due
+
+
+def _resolve(spec):
+    """Fungsi dari "baseline", engine, atau "modul:fungsi" (seperti compute_schedule)."""
+    if spec == BASELINE:
+        from reference import build_schedule_reference
+
+        return build_schedule_reference
+    if ":" in spec:
+        modul, nama = spec.split(":", 1)
+        return getattr(importlib.import_module(modul), nama)
+    if spec not in ENGINES:
+        raise ValueError(f"engine tidak dikenal: {spec}")
+
+    def fn(pokok, bunga_tahunan, tenor, metode, start_date, first_due_date):
+        return compute_schedule(
+            pokok, bunga_tahunan, tenor, metode, start_date, first_due_date, spec
+        )
+
+    return fn
+
+
+def _panggil(fn, case):
+    t0 = time.perf_counter()
+    try:
+        hasil = fn(*case)
+    except Exception as e:  # noqa: BLE001 - exception ikut dibandingkan
+        hasil = e
+    return hasil, time.perf_counter() - t0
+
+
+def bandingkan(ref, cand):
+    """None bila sama pada presisi rupiah, atau deskripsi perbedaan pertama."""
+    if isinstance(ref, Exception) or isinstance(cand, Exception):
+        if type(ref) is type(cand):
+            return None
+        return f"exception: {ref!r} vs {cand!r}"
+    kolom_ref, _, summary_ref = ref
+    kolom_cand, _, summary_cand = cand
+    for nama in KOLOM:
+        a, b = kolom_ref[nama], kolom_cand[nama]
+        if len(a) != len(b):
+            return f"{nama}: {len(a)} baris vs {len(b)} baris"
+        if nama not in ("Bulan", "Tanggal"):
+            a, b = rupiah_round_array(a), rupiah_round_array(b)
+        for i, (x, y) in enumerate(zip(a, b)):
+            if x != y:
+                return f"baris {i} {nama}: {x} vs {y}"
+    for nama, nilai in summary_ref.items():
+        if int(summary_cand.get(nama, -1)) != int(nilai):
+            return f"summary {nama}: {nilai} vs {summary_cand.get(nama)}"
+    return None
+
+
+def _init(reference, candidate):
+    _cfg["ref"] = _resolve(reference)
+    _cfg["cand"] = _resolve(candidate)
+
+
+def _cek(case):
+    ref, t_ref = _panggil(_cfg["ref"], case)
+    cand, t_cand = _panggil(_cfg["cand"], case)
+    return bandingkan(ref, cand), t_ref, t_cand
+
+
+def _jalankan_potongan(tugas):
+    """Satu potongan kasus; hasil: (jumlah, detik ref, detik kandidat, gagal)."""
+    seed, mulai, jumlah, methods, max_failures = tugas
+    gagal = []
+    total_ref = total_cand = 0.0
+    for i in range(mulai, mulai + jumlah):
+        case = random_case(random.Random(f"{seed}:{i}"), methods)
+        beda, t_ref, t_cand = _cek(case)
+        total_ref += t_ref
+        total_cand += t_cand
+        if beda is not None and len(gagal) < max_failures:
+            gagal.append((i, case, beda))
+    return jumlah, total_ref, total_cand, gagal
+
+
+def _lebih_sederhana(case):
+    """Kandidat kasus yang lebih kecil/sederhana, urut dari yang paling agresif."""
+    pokok, bunga, tenor, metode, start, first_due = case
+    for t in sorted({1, 2, 3, tenor // 2, tenor - 1}):
+        if 1 <= t < tenor:
+            yield pokok, bunga, t, metode, start, first_due
+    for p in (1_000_000.0, round(pokok, -6), round(pokok, -3), float(int(pokok))):
+        if 0 < p < pokok:
+            yield p, bunga, tenor, metode, start, first_due
+    if pokok > 1:
+        yield float(int(pokok / 2)), bunga, tenor, metode, start, first_due
+    for b in (0.1, round(bunga, 2), round(bunga, 3)):
+        if b != bunga and 0 < b:
+            yield pokok, b, tenor, metode, start, first_due
+    # Geser tanggal ke 2024 dengan jarak hari dan hari-bulan yang sama
+    baru = start.replace(year=2024)
+    if baru != start:
+        yield pokok, bunga, tenor, metode, baru, baru + (first_due - start)
+    selisih = (first_due - start).days
+    for d in (selisih // 2, selisih - 1):
+        due = start + timedelta(days=d)
+        if 0 < d < selisih and due.day != start.day:
+            yield pokok, bunga, tenor, metode, start, due
+
+
+def shrink(case, batas_langkah=500):
+    """Perkecil kasus gagal selama kegagalan masih terjadi (greedy)."""
+    beda = _cek(case)[0]
+    for _ in range(batas_langkah):
+        for calon in _lebih_sederhana(case):
+            hasil = _cek(calon)[0]
+            if hasil is not None:
+                case, beda = calon, hasil
+                break
+        else:
+            break
+    return case, beda
+
+
+def reproducer(case, candidate):
+    pokok, bunga, tenor, metode, start, first_due = case
+    tgl = "datetime({0.year}, {0.month}, {0.day})".format
+    args = f"{pokok!r}, {bunga!r}, {tenor}, {metode!r}, {tgl(start)}, {tgl(first_due)}"
+    if ":" in candidate:
+        return f"{candidate.split(':')[1]}({args})"
+    return f"compute_schedule({args}, engine={candidate!r})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20_000, help="jumlah kasus")
+    parser.add_argument("--engine", default="numpy", help="engine kandidat")
+    parser.add_argument("--candidate", help="modul:fungsi kandidat (menggantikan --engine)")
+    parser.add_argument(
+        "--reference", default=BASELINE, help="engine referensi atau baseline"
+    )
+    parser.add_argument("--methods", help="daftar metode dipisah koma (default semua)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    parser.add_argument("--max-failures", type=int, default=10, help="kasus yang di-shrink")
+    args = parser.parse_args()
+
+    candidate = args.candidate or args.engine
+    if args.methods:
+        methods = args.methods.split(",")
+    else:
+        methods = sorted(ENGINES.get(args.reference, METHODS))
+        if not args.candidate:
+            methods = [m for m in methods if m in ENGINES.get(candidate, {})]
+    try:
+        _init(args.reference, candidate)
+    except (ImportError, AttributeError, ValueError) as e:
+        parser.error(str(e))
+
+    tugas = [
+        (args.seed, mulai, min(args.chunk, args.n - mulai), methods, args.max_failures)
+        for mulai in range(0, args.n, args.chunk)
+    ]
+    print(
+        f"{candidate} vs {args.reference}: {args.n} kasus, metode {','.join(methods)}, "
+        f"{args.workers} worker"
+    )
+    t0 = time.perf_counter()
+    selesai, waktu_ref, waktu_cand, gagal = 0, 0.0, 0.0, []
+    if args.workers > 1:
+        pool = multiprocessing.Pool(
+            args.workers, initializer=_init, initargs=(args.reference, candidate)
+        )
+        hasil_iter = pool.imap_unordered(_jalankan_potongan, tugas)
+    else:
+        pool, hasil_iter = None, map(_jalankan_potongan, tugas)
+    try:
+        for jumlah, t_ref, t_cand, g in hasil_iter:
+            selesai += jumlah
+            waktu_ref += t_ref
+            waktu_cand += t_cand
+            gagal.extend(g)
+            print(
+                f"\r{selesai}/{args.n} kasus, {len(gagal)} gagal",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+    finally:
+        if pool is not None:
+            pool.terminate()
+    print(file=sys.stderr)
+    durasi = time.perf_counter() - t0
+
+    print(f"{selesai} kasus dalam {durasi:.1f} s ({selesai / durasi:,.0f} kasus/s total)")
+    print(f"  referensi  {selesai / waktu_ref:>12,.0f} kasus/s per core")
+    print(f"  kandidat   {selesai / waktu_cand:>12,.0f} kasus/s per core")
+    print(f"  speedup    {waktu_ref / waktu_cand:>12.2f}x")
+
+    if not gagal:
+        print("tidak ada perbedaan")
+        return 0
+    gagal.sort()
+    print(f"gagal (setidaknya {len(gagal)}; {args.max_failures} pertama per potongan):")
+    terlihat = set()
+    for idx, case, beda in gagal[: args.max_failures]:
+        kecil, beda_kecil = shrink(case)
+        if kecil in terlihat:
+            continue
+        terlihat.add(kecil)
+        print(f"  #{idx}: {beda}")
+        print(f"    minimal: {reproducer(kecil, candidate)}")
+        print(f"             {beda_kecil}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
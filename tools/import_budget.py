@@ -0,0 +1,134 @@
+"""Ukur biaya cold start (import + request pertama) per route.
+
+Setiap route dijalankan di interpreter baru, seperti instance serverless
+yang baru hidup. Gagal (exit 1) bila melewati anggaran waktu atau bila
+modul berat yang tidak dibutuhkan route ikut ter-import.
+
+    python tools/import_budget.py [--scale 1.5] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORM = {
+    "namecstm": "Budget",
+    "pokok": "150.000.000",
+    "bunga": "11",
+    "tenor": "60",
+    "metode": "efektif",
+    "start_date": "2024-01-15",
+    "first_due_date": "2024-02-15",
+}
+
+# route → (anggaran ms untuk import app + request pertama, modul terlarang)
+BUDGET = {
+    "GET /": (400, ("pandas", "reportlab", "openpyxl")),
+    "POST /": (500, ("pandas", "reportlab", "openpyxl")),
+    "GET /export_pdf": (800, ("pandas", "openpyxl")),
+    "GET /export_xlsx": (800, ("pandas", "reportlab")),
+    "POST /bulk_schedule": (500, ("pandas", "reportlab", "openpyxl")),
+}
+HEAVY = ("numpy", "pandas", "reportlab", "openpyxl")
+
+
+def _request(client, route):
+    if route == "GET /":
+        return client.get("/")
+    if route == "POST /":
+        return client.post("/", data=FORM)
+    if route in ("GET /export_pdf", "GET /export_xlsx"):
+        with client.session_transaction() as sess:
+            sess["params"] = {
+                "pokok": 150_000_000.0,
+                "bunga_tahunan": 0.11,
+                "tenor": 60,
+                "metode": "efektif",
+                "start_date": FORM["start_date"],
+                "first_due_date": FORM["first_due_date"],
+                "namecstm": FORM["namecstm"],
+            }
+        return client.get(route.split()[1])
+    if route == "POST /bulk_schedule":
+        return client.post("/bulk_schedule", json=[FORM])
+    raise ValueError(route)
+
+
+def _child(route):
+    t0 = time.perf_counter()
+    import app
+
+    t1 = time.perf_counter()
+    client = app.app.test_client()
+    resp = _request(client, route)
+    t2 = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "status": resp.status_code,
+                "import_ms": (t1 - t0) * 1000,
+                "request_ms": (t2 - t1) * 1000,
+                "modules": [m for m in HEAVY if m in sys.modules],
+            }
+        )
+    )
+
+
+def _measure(route, repeat):
+    runs = []
+    for _ in range(repeat):
+        # Instance baru = cache PDF di disk masih kosong
+        with tempfile.TemporaryDirectory() as pdf_dir:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", route],
+                cwd=ROOT,
+                env={**os.environ, "PDF_CACHE_DIR": pdf_dir},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    # Ambil run tercepat: noise OS hanya bisa menambah waktu
+    return min(runs, key=lambda r: r["import_ms"] + r["request_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="pengali anggaran (mesin lambat)"
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        _child(args.child)
+        return 0
+
+    gagal = False
+    print(f"{'route (ms)':<22}{'import':>8}{'request':>8}{'total':>8}{'budget':>8}  modules")
+    for route, (budget_ms, terlarang) in BUDGET.items():
+        r = _measure(route, args.repeat)
+        total = r["import_ms"] + r["request_ms"]
+        limit = budget_ms * args.scale
+        bocor = [m for m in terlarang if m in r["modules"]]
+        status = "OK"
+        if r["status"] >= 400 or total > limit or bocor:
+            status = "FAIL"
+            gagal = True
+        print(
+            f"{route:<22}{r['import_ms']:>8.0f}{r['request_ms']:>8.0f}"
+            f"{total:>8.0f}{limit:>8.0f}  {','.join(r['modules'])} {status}"
+            + (f" (import terlarang: {','.join(bocor)})" if bocor else "")
+        )
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Load test route utama (GET/POST / dan /export_pdf) untuk mencari titik jenuh.
+
+    python tools/loadtest.py                                  # test client, 1,2,4,8 worker
+    python tools/loadtest.py --concurrency 1,4,16 --duration 20
+    python tools/loadtest.py --url http://127.0.0.1:5000 --pid 1234 --pid 1235
+    python tools/loadtest.py --mix get=1,post=4,pdf=2 --json hasil.json
+
+Setiap worker adalah proses terpisah yang mengirim request berturut-turut
+(closed loop), jadi concurrency = jumlah request yang sedang berjalan.
+Tanpa --url setiap worker memuat app sendiri lewat Flask test client,
+seperti satu instance serverless; CPU/RSS per worker adalah milik instance
+itu. Dengan --url, CPU/RSS proses server dibaca dari /proc untuk setiap
+--pid (CPU/RSS worker tetap dilaporkan sebagai biaya load generator).
+
+Mix adalah bobot alur: "get" = GET /, "post" = POST / dengan input acak,
+"pdf" = POST / lalu GET /export_pdf dengan session yang sama (dua request,
+masing-masing dicatat per route).
+"""
+import argparse
+import http.cookiejar
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ROUTES = ("GET /", "POST /", "GET /export_pdf")
+# Kenaikan throughput di bawah ini dianggap sudah jenuh (knee)
+KNEE_GAIN = 0.10
+
+
+def random_form(rnd, methods):
+    """Input form realistis: tenor 6–360, pokok log-uniform, tanggal bervariasi."""
+    start = date(2023, 1, 1) + timedelta(days=rnd.randint(0, 730))
+    return {
+        "namecstm": f"Load {rnd.randint(1, 99999)}",
+        "pokok": f"{round(10 ** rnd.uniform(6.7, 9.3), -3):,.0f}".replace(",", "."),
+        "bunga": str(rnd.randrange(400, 2600) / 100),
+        "tenor": str(rnd.randint(6, 360)),
+        "metode": rnd.choice(methods),
+        "start_date": start.isoformat(),
+        "first_due_date": (start + timedelta(days=rnd.randint(20, 45))).isoformat(),
+    }
+
+
+def parse_mix(teks):
+    mix = {}
+    for bagian in teks.split(","):
+        nama, _, bobot = bagian.partition("=")
+        if nama not in ("get", "post", "pdf"):
+            raise ValueError(f"alur tidak dikenal: {nama}")
+        mix[nama] = float(bobot or 1)
+    return mix
+
+
+class _TestClient:
+    def __init__(self):
+        import app
+
+        self.client = app.app.test_client()
+
+    def request(self, method, path, form=None):
+        resp = self.client.open(path, method=method, data=form)
+        resp.get_data()
+        return resp.status_code
+
+
+class _HttpClient:
+    def __init__(self, url, timeout):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, method, path, form=None):
+        data = urllib.parse.urlencode(form).encode() if form is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+def _cpu_self():
+    r = resource.getrusage(resource.RUSAGE_SELF)
+    return r.ru_utime + r.ru_stime
+
+
+def _rss_mb(pid="self"):
+    """RSS saat ini (MB) dari /proc, atau RSS maksimum bila /proc tidak ada."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid == "self":
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return None
+
+
+def _cpu_pid(pid):
+    """CPU (detik) proses lain dari /proc/<pid>/stat, atau None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            bagian = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime, stime = field 14, 15 (bagian[0] adalah field 3)
+    return (int(bagian[11]) + int(bagian[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _worker(idx, concurrency, args, mix, barrier, deadline, hasil):
+    # Seed berbeda per tahap supaya input tidak terulang dari tahap sebelumnya
+    rnd = random.Random(f"{args.seed}/{concurrency}/{idx}")
+    client = _HttpClient(args.url, args.timeout) if args.url else _TestClient()
+    alur, bobot = zip(*mix.items())
+    samples = []  # (route, detik, ok)
+
+    def kirim(route, form=None):
+        method, path = route.split(" ", 1)
+        t0 = time.perf_counter()
+        try:
+            ok = client.request(method, path, form) < 400
+        except Exception:  # noqa: BLE001 - timeout/koneksi dihitung sebagai error
+            ok = False
+        samples.append((route, time.perf_counter() - t0, ok))
+
+    # Pemanasan (import, koneksi pertama) tidak ikut diukur
+    kirim("GET /")
+    samples.clear()
+    barrier.wait()
+    cpu0 = _cpu_self()
+    while time.time() < deadline.value:
+        pilihan = rnd.choices(alur, bobot)[0]
+        if pilihan == "get":
+            kirim("GET /")
+            continue
+        kirim("POST /", random_form(rnd, args.methods))
+        if pilihan == "pdf":
+            kirim("GET /export_pdf")
+    hasil.put(
+        {"worker": idx, "samples": samples, "cpu_s": _cpu_self() - cpu0, "rss_mb": _rss_mb()}
+    )
+
+
+def _percentile(sorted_values, q):
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _ringkas(samples, durasi):
+    latency = sorted(d for _, d, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    if not latency:
+        return {"requests": 0, "rps": 0.0, "error_rate": 0.0}
+    return {
+        "requests": len(latency),
+        "rps": len(latency) / durasi,
+        "p50_ms": _percentile(latency, 0.50) * 1000,
+        "p90_ms": _percentile(latency, 0.90) * 1000,
+        "p99_ms": _percentile(latency, 0.99) * 1000,
+        "max_ms": latency[-1] * 1000,
+        "error_rate": errors / len(latency),
+    }
+
+
+def run_step(concurrency, args, mix):
+    """Jalankan `concurrency` worker selama args.duration detik."""
+    if not args.url:
+        # Cache PDF baru per tahap supaya tahap berikutnya tidak terbantu
+        # hasil tahap sebelumnya; juga tidak mengisi cache milik server
+        os.environ["PDF_CACHE_DIR"] = tempfile.mkdtemp(prefix="loadtest_pdf_")
+    ctx = multiprocessing.get_context("spawn" if args.spawn else None)
+    barrier = ctx.Barrier(concurrency + 1)
+    deadline = ctx.Value("d", float("inf"))
+    hasil = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(i, concurrency, args, mix, barrier, deadline, hasil))
+        for i in range(concurrency)
+    ]
+    for p in procs:
+        p.start()
+    barrier.wait(timeout=args.startup_timeout)
+
+    server0 = {pid: _cpu_pid(pid) for pid in args.pid}
+    mulai = time.time()
+    deadline.value = mulai + args.duration
+    workers = [hasil.get() for _ in procs]
+    durasi = time.time() - mulai
+    for p in procs:
+        p.join()
+
+    samples = [s for w in workers for s in w["samples"]]
+    step = {"concurrency": concurrency, "duration_s": durasi, **_ringkas(samples, durasi)}
+    step["routes"] = {
+        route: _ringkas([s for s in samples if s[0] == route], durasi)
+        for route in ROUTES
+        if any(s[0] == route for s in samples)
+    }
+    step["workers"] = [
+        {
+            "worker": w["worker"],
+            "cpu_s": w["cpu_s"],
+            "cpu_pct": w["cpu_s"] / durasi * 100,
+            "rss_mb": w["rss_mb"],
+        }
+        for w in sorted(workers, key=lambda w: w["worker"])
+    ]
+    step["server"] = []
+    for pid, cpu0 in server0.items():
+        cpu1 = _cpu_pid(pid)
+        step["server"].append(
+            {
+                "pid": pid,
+                "cpu_pct": (cpu1 - cpu0) / durasi * 100 if None not in (cpu0, cpu1) else None,
+                "rss_mb": _rss_mb(pid),
+            }
+        )
+    return step
+
+
+def find_knee(steps):
+    """Concurrency terakhir sebelum tambahan worker tidak lagi menaikkan
+    throughput minimal KNEE_GAIN (atau error mulai muncul)."""
+    for prev, now in zip(steps, steps[1:]):
+        if prev["rps"] <= 0:
+            return prev["concurrency"]
+        if now["rps"] < prev["rps"] * (1 + KNEE_GAIN) or now["error_rate"] > prev["error_rate"]:
+            return prev["concurrency"]
+    return None
+
+
+def _cetak(step):
+    print(
+        f"{step['concurrency']:>5}{step['requests']:>8}{step['rps']:>9.1f}"
+        f"{step.get('p50_ms', 0):>9.1f}{step.get('p90_ms', 0):>9.1f}"
+        f"{step.get('p99_ms', 0):>9.1f}{step.get('max_ms', 0):>9.1f}"
+        f"{step['error_rate']:>8.1%}"
+    )
+    for route, r in step["routes"].items():
+        print(
+            f"{'':>5}  {route:<16}{r['requests']:>6} req  p50 {r.get('p50_ms', 0):.1f}"
+            f"  p99 {r.get('p99_ms', 0):.1f} ms  error {r['error_rate']:.1%}"
+        )
+    cpu = ", ".join(f"{w['cpu_pct']:.0f}%/{w['rss_mb']:.0f}MB" for w in step["workers"])
+    print(f"{'':>5}  worker CPU/RSS: {cpu}")
+    for s in step["server"]:
+        cpu = f"{s['cpu_pct']:.0f}%" if s["cpu_pct"] is not None else "?"
+        rss = f"{s['rss_mb']:.0f}MB" if s["rss_mb"] is not None else "?"
+        print(f"{'':>5}  server pid {s['pid']}: CPU {cpu}, RSS {rss}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL server; default Flask test client")
+    parser.add_argument(
+        "--concurrency", default="1,2,4,8", help="daftar jumlah worker per tahap"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="detik per tahap")
+    parser.add_argument("--mix", default="get=1,post=4,pdf=2", help="bobot alur")
+    parser.add_argument(
+        "--methods", default="efektif,flat", help="metode yang diacak pada input"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="timeout HTTP (detik)")
+    parser.add_argument(
+        "--pid", type=int, action="append", default=[], help="pid server yang dipantau"
+    )
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument(
+        "--spawn", action="store_true", help="worker di interpreter baru (bukan fork)"
+    )
+    parser.add_argument("--json", metavar="PATH", help="simpan hasil sebagai JSON")
+    args = parser.parse_args()
+    args.methods = args.methods.split(",")
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(n) for n in args.concurrency.split(",")]
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"target {args.url or 'test client'}, mix {args.mix}, {args.duration:.0f} s/tahap")
+    print(
+        f"{'conc':>5}{'req':>8}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}{'error':>8}"
+    )
+    steps = []
+    for n in levels:
+        step = run_step(n, args, mix)
+        steps.append(step)
+        _cetak(step)
+
+    knee = find_knee(steps)
+    if knee is not None:
+        print(f"knee ≈ concurrency {knee} (kenaikan throughput < {KNEE_GAIN:.0%} setelahnya)")
+    else:
+        print("belum jenuh pada concurrency yang diuji")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"target": args.url, "mix": mix, "steps": steps, "knee": knee},
+                f,
+                indent=2,
+            )
+        print(f"hasil disimpan ke {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
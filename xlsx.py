@@ -0,0 +1,214 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from duedates import due_dates
+from schedule import KOLOM, method_label
+
+FORMAT_RUPIAH = '"Rp" #,##0'
+FORMAT_TANGGAL = "dd mmm yyyy"
+FORMAT_PERSEN = "0.00%"
+_KARAKTER_TERLARANG = set('[]:*?/\\')
+# Sheet write-only openpyxl memegang satu file sementara yang terbuka sampai
+# workbook disimpan; di atas batas ini semua jadwal ditulis ke satu sheet
+XLSX_MAX_SHEETS = 250
+# Batas baris satu sheet Excel
+XLSX_MAX_ROWS = 1_048_576
+
+_bold = Font(bold=True)
+
+
+def _nama_sheet(nama: str, terpakai: set) -> str:
+    """Nama sheet Excel yang valid (maks 31 karakter) dan unik di workbook."""
+    dasar = "".join("_" if c in _KARAKTER_TERLARANG else c for c in nama).strip()
+    dasar = dasar[:31] or "Customer"
+    kandidat, n = dasar, 1
+    while kandidat.lower() in terpakai:
+        n += 1
+        akhiran = f" ({n})"
+        kandidat = dasar[: 31 - len(akhiran)] + akhiran
+    terpakai.add(kandidat.lower())
+    return kandidat
+
+
+def _cell(ws, value, number_format=None, bold=False):
+    cell = WriteOnlyCell(ws, value=value)
+    if number_format:
+        cell.number_format = number_format
+    if bold:
+        cell.font = _bold
+    return cell
+
+
+def _baris_jadwal(loan, kolom):
+    """(bulan, tanggal, pokok, bunga, total, sisa) per baris, tanggal sebagai date."""
+    bulan = kolom["Bulan"]
+    tanggal = [loan["start_date"].date()] + due_dates(
+        loan["first_due_date"], loan["tenor"]
+    )[bulan[1:] - 1].tolist()
+    return zip(
+        bulan.tolist(),
+        tanggal,
+        kolom["Angsuran Pokok"].tolist(),
+        kolom["Bunga"].tolist(),
+        kolom["Total Angsuran"].tolist(),
+        kolom["Sisa Pokok"].tolist(),
+    )
+
+
+def _baris_total(ws, kolom, depan):
+    return (
+        depan
+        + [_cell(ws, "Total", bold=True), None]
+        + [
+            _cell(ws, kolom[k].sum().item(), FORMAT_RUPIAH, bold=True)
+            for k in ("Angsuran Pokok", "Bunga", "Total Angsuran")
+        ]
+    )
+
+
+def _tulis_jadwal(ws, loan, kolom):
+    ws.append([_cell(ws, "Perhitungan Tabel Angsuran", bold=True)])
+    ws.append([_cell(ws, loan["namecstm"], bold=True)])
+    ws.append(["Jumlah Pembiayaan", _cell(ws, loan["pokok"], FORMAT_RUPIAH)])
+    ws.append(
+        [
+            "Tingkat Pengembalian",
+            _cell(ws, loan["bunga_tahunan"], FORMAT_PERSEN),
+            method_label(loan["metode"]),
+        ]
+    )
+    ws.append(["Periode Pembiayaan", loan["tenor"], "bulan"])
+    ws.append([])
+    ws.append([_cell(ws, k, bold=True) for k in KOLOM])
+
+    for bulan, tanggal, *nilai in _baris_jadwal(loan, kolom):
+        ws.append(
+            [bulan, _cell(ws, tanggal, FORMAT_TANGGAL)]
+            + [_cell(ws, v, FORMAT_RUPIAH) for v in nilai]
+        )
+    ws.append(_baris_total(ws, kolom, []))
+
+
+class _SheetGabungan:
+    """Sheet "Jadwal": semua jadwal berurutan dengan kolom Customer di depan."""
+
+    nama = "Jadwal"
+
+    def __init__(self, wb):
+        self.ws = wb.create_sheet(self.nama)
+        self.ws.column_dimensions["A"].width = 30
+        self.ws.append([_cell(self.ws, k, bold=True) for k in ["Customer"] + KOLOM])
+        self.baris = 1
+
+    def tulis(self, loan, kolom):
+        ws = self.ws
+        self.baris += len(kolom["Bulan"]) + 1
+        if self.baris > XLSX_MAX_ROWS:
+            raise ValueError(
+                f"Jadwal melebihi {XLSX_MAX_ROWS} baris Excel; bagi permintaan"
+            )
+        nama = loan["namecstm"]
+        for bulan, tanggal, *nilai in _baris_jadwal(loan, kolom):
+            ws.append(
+                [nama, bulan, _cell(ws, tanggal, FORMAT_TANGGAL)]
+                + [_cell(ws, v, FORMAT_RUPIAH) for v in nilai]
+            )
+        ws.append(_baris_total(ws, kolom, [nama]))
+
+
+def write_workbook(items, stream, gabung=False):
+    """Tulis workbook write-only: sheet "Ringkasan" + satu sheet per customer.
+
+    `items` boleh berupa generator (loan, kolom, summary, error); setiap
+    jadwal langsung ditulis ke file sementara openpyxl lalu dilepas, jadi
+    memori tidak ikut membesar dengan jumlah baris.
+
+    Dengan `gabung`, semua jadwal masuk ke satu sheet "Jadwal" (untuk lebih
+    dari XLSX_MAX_SHEETS customer). ValueError bila jumlah sheet atau baris
+    melewati batas.
+    """
+    wb = Workbook(write_only=True)
+    try:
+        _isi_workbook(wb, items, gabung)
+    except BaseException:
+        _buang(wb)
+        raise
+    wb.save(stream)
+    return stream
+
+
+def _buang(wb):
+    """Tutup dan hapus file sementara semua sheet (workbook tidak disimpan).
+
+    openpyxl (≤ 3.1) tidak punya API publik untuk membuang sheet write-only
+    tanpa menyimpan workbook. `_writer.cleanup()` (openpyxl 3.1) dipakai
+    bila ada; tanpa itu file sementara baru dihapus atexit openpyxl.
+    """
+    for ws in wb.worksheets:
+        ws.close()
+        cleanup = getattr(getattr(ws, "_writer", None), "cleanup", None)
+        if cleanup is None:
+            continue
+        try:
+            cleanup()
+        except (OSError, ValueError):  # sudah dihapus / internal berubah
+            pass
+
+
+def _isi_workbook(wb, items, gabung):
+    ringkasan = wb.create_sheet("Ringkasan")
+    ringkasan.column_dimensions["A"].width = 30
+    ringkasan.append(
+        [
+            _cell(ringkasan, k, bold=True)
+            for k in (
+                "Customer",
+                "Sheet",
+                "Metode",
+                "Pokok",
+                "Bunga p.a",
+                "Tenor",
+                "Total Pokok",
+                "Total Bunga",
+                "Total Angsuran",
+                "Keterangan",
+            )
+        ]
+    )
+
+    terpakai = {"ringkasan"}
+    gabungan = _SheetGabungan(wb) if gabung else None
+    for loan, kolom, summary, error in items:
+        if error:
+            ringkasan.append([loan.get("namecstm") or "-"] + [None] * 8 + [error])
+            continue
+
+        if gabungan is not None:
+            nama = gabungan.nama
+            gabungan.tulis(loan, kolom)
+        else:
+            if len(terpakai) > XLSX_MAX_SHEETS:
+                raise ValueError(f"Maksimal {XLSX_MAX_SHEETS} sheet customer")
+            nama = _nama_sheet(loan["namecstm"], terpakai)
+            ws = wb.create_sheet(nama)
+            ws.column_dimensions["A"].width = 22
+            for huruf in "BCDEF":
+                ws.column_dimensions[huruf].width = 18
+            _tulis_jadwal(ws, loan, kolom)
+
+        ringkasan.append(
+            [
+                loan["namecstm"],
+                nama,
+                loan["metode"],
+                _cell(ringkasan, loan["pokok"], FORMAT_RUPIAH),
+                _cell(ringkasan, loan["bunga_tahunan"], FORMAT_PERSEN),
+                loan["tenor"],
+            ]
+            + [
+                _cell(ringkasan, summary[k], FORMAT_RUPIAH)
+                for k in ("total_pokok", "total_bunga", "total_angsuran")
+            ]
+        )
+